@@ -1,5 +1,6 @@
 import aiohttp
 
+from api.http_client import get_session
 from api.rate_limiter import throttle
 
 
@@ -27,31 +28,31 @@ async def bump_categories(
     payload = {"gameId": game_id, "categoryIds": category_ids}
     url = "https://starvell.com/api/offers/bump"
     timeout = aiohttp.ClientTimeout(total=20)
-    async with aiohttp.ClientSession(headers=headers, cookies=cookies, timeout=timeout) as session:
-        await throttle()
-        async with session.post(url, json=payload) as resp:
-            txt = await resp.text()
-            ct = resp.headers.get("Content-Type", "").lower()
-            ok = 200 <= resp.status < 300
-            data: dict
-            try:
-                if "application/json" in ct:
-                    parsed = await resp.json()
-                    data = {
-                        "success": ok,
-                        "status": resp.status,
-                        "json": parsed,
-                    }
-                else:
-                    data = {}
-            except Exception:
-                data = {}
-            if not data:
+    session = get_session()
+    await throttle()
+    async with session.post(url, json=payload, headers=headers, cookies=cookies, timeout=timeout) as resp:
+        txt = await resp.text()
+        ct = resp.headers.get("Content-Type", "").lower()
+        ok = 200 <= resp.status < 300
+        data: dict
+        try:
+            if "application/json" in ct:
+                parsed = await resp.json()
                 data = {
                     "success": ok,
                     "status": resp.status,
-                    "raw": (txt or "")[:2000],
+                    "json": parsed,
                 }
+            else:
+                data = {}
+        except Exception:
+            data = {}
+        if not data:
+            data = {
+                "success": ok,
+                "status": resp.status,
+                "raw": (txt or "")[:2000],
+            }
     return {
         "request": {"gameId": game_id, "categoryIds": category_ids},
         "response": data,
@@ -2,6 +2,7 @@ import aiohttp
 from aiohttp import ClientResponseError
 
 from api.next_data import get_build_id, reset_build_id
+from api.http_client import get_session
 from api.rate_limiter import throttle
 
 
@@ -21,18 +22,18 @@ async def fetch_chats(session_cookie: str, my_games_cookie: str | None = None) -
     for attempt in range(2):
         build_id = await get_build_id(session_cookie)
         url = f"https://starvell.com/_next/data/{build_id}/chat.json"
-        async with aiohttp.ClientSession(headers=headers, cookies=cookies, timeout=timeout) as session:
-            try:
-                await throttle()
-                async with session.get(url) as resp:
-                    resp.raise_for_status()
-                    return await resp.json()
-            except ClientResponseError as exc:
-                last_exc = exc
-                if exc.status == 404 and attempt == 0:
-                    reset_build_id()
-                    continue
-                raise
+        session = get_session()
+        try:
+            await throttle()
+            async with session.get(url, headers=headers, cookies=cookies, timeout=timeout) as resp:
+                resp.raise_for_status()
+                return await resp.json()
+        except ClientResponseError as exc:
+            last_exc = exc
+            if exc.status == 404 and attempt == 0:
+                reset_build_id()
+                continue
+            raise
     if last_exc:
         raise last_exc
     raise RuntimeError("Unable to fetch chat list")
@@ -80,6 +80,8 @@ async def find_user_lots(
         if isinstance(game_id, int):
             seen_game_ids.add(game_id)
         game_slug = str((category.get("game") or {}).get("slug") or "").strip() or None
+        game_name = str((category.get("game") or {}).get("name") or "").strip() or None
+        category_name = str(category.get("name") or "").strip() or None
         category_url = None
         if game_slug and category_slug:
             category_url = f"https://starvell.com/{game_slug}/{category_slug}/trade"
@@ -107,6 +109,8 @@ async def find_user_lots(
                     "url": f"https://starvell.com/offers/{offer_id}" if offer_id else None,
                     "category_id": category_id,
                     "game_id": game_id,
+                    "game_name": game_name,
+                    "category_name": category_name,
                     "category_url": category_url,
                 }
             )
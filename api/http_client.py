@@ -0,0 +1,36 @@
+import aiohttp
+
+
+_session: aiohttp.ClientSession | None = None
+
+
+def get_session() -> aiohttp.ClientSession:
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=20),
+            cookie_jar=aiohttp.DummyCookieJar(),
+            connector=aiohttp.TCPConnector(limit=20, ttl_dns_cache=300),
+        )
+    return _session
+
+
+async def close_session() -> None:
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
+
+async def download_bytes(url: str, max_bytes: int = 10 * 1024 * 1024) -> tuple[bytes, str | None]:
+    session = get_session()
+    async with session.get(url) as resp:
+        resp.raise_for_status()
+        chunks: list[bytes] = []
+        size = 0
+        async for chunk in resp.content.iter_chunked(65536):
+            size += len(chunk)
+            if size > max_bytes:
+                raise RuntimeError(f"file too large: {url}")
+            chunks.append(chunk)
+        return b"".join(chunks), resp.headers.get("Content-Type")
@@ -1,5 +1,6 @@
 import aiohttp
 
+from api.http_client import get_session
 from api.rate_limiter import throttle
 
 
@@ -29,28 +30,28 @@ async def fetch_chat_messages(
             "interlocutorId": int(interlocutor_id),
             "messagesListDto": {"chatId": chat_id, "limit": limit},
         }
-        async with aiohttp.ClientSession(headers=headers, cookies=cookies, timeout=timeout) as session:
-            await throttle()
-            async with session.post(url, json=payload) as resp:
-                resp.raise_for_status()
-                data = await resp.json()
-                if isinstance(data, dict):
-                    items = (data.get("messagesListResult") or {}).get("items")
-                    if isinstance(items, list):
-                        return items
-                return []
-
-    url = "https://starvell.com/api/messages/list"
-    payload = {"chatId": chat_id, "limit": limit}
-    async with aiohttp.ClientSession(headers=headers, cookies=cookies, timeout=timeout) as session:
+        session = get_session()
         await throttle()
-        async with session.post(url, json=payload) as resp:
+        async with session.post(url, json=payload, headers=headers, cookies=cookies, timeout=timeout) as resp:
             resp.raise_for_status()
             data = await resp.json()
-            if isinstance(data, list):
-                return data
             if isinstance(data, dict):
                 items = (data.get("messagesListResult") or {}).get("items")
                 if isinstance(items, list):
                     return items
             return []
+
+    url = "https://starvell.com/api/messages/list"
+    payload = {"chatId": chat_id, "limit": limit}
+    session = get_session()
+    await throttle()
+    async with session.post(url, json=payload, headers=headers, cookies=cookies, timeout=timeout) as resp:
+        resp.raise_for_status()
+        data = await resp.json()
+        if isinstance(data, list):
+            return data
+        if isinstance(data, dict):
+            items = (data.get("messagesListResult") or {}).get("items")
+            if isinstance(items, list):
+                return items
+        return []
@@ -0,0 +1,326 @@
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any
+
+
+def norm_id(value: Any) -> str | None:
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, str)):
+        text = str(value).strip()
+        return text or None
+    return None
+
+
+def _maybe_int(value: Any) -> int | None:
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        return int(value)
+    except Exception:
+        try:
+            return int(float(value))
+        except Exception:
+            return None
+
+
+def _parse_ts(value: Any) -> int | None:
+    if not value:
+        return None
+    try:
+        text = str(value)
+        if text.endswith("Z"):
+            text = text[:-1] + "+00:00"
+        dt = datetime.fromisoformat(text)
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        return int(dt.timestamp())
+    except Exception:
+        return None
+
+
+def _image_preview_url(images: Any) -> str | None:
+    if not isinstance(images, list):
+        return None
+    for img in images:
+        if not isinstance(img, dict):
+            continue
+        img_id = str(img.get("id") or "").strip()
+        if not img_id:
+            continue
+        ext = str(img.get("extension") or "png").strip().lstrip(".")
+        return f"https://cdn.starvell.com/messages/{img_id}-preview.{ext or 'png'}"
+    return None
+
+
+class _Identified:
+    __slots__ = ()
+
+    def __eq__(self, other: Any) -> bool:
+        return type(other) is type(self) and other.id == self.id
+
+    def __hash__(self) -> int:
+        return hash((type(self).__name__, self.id))
+
+
+@dataclass(slots=True, eq=False)
+class ChatMessage(_Identified):
+    id: str
+    author_id: str | None = None
+    content: str = ""
+    image_url: str | None = None
+    is_auto: bool = False
+
+    @classmethod
+    def from_api(cls, data: Any) -> "ChatMessage | None":
+        if not isinstance(data, dict):
+            return None
+        mid = norm_id(data.get("id"))
+        if not mid:
+            return None
+        author_id = data.get("authorId")
+        if author_id is None:
+            author_id = (data.get("author") or {}).get("id")
+        return cls(
+            id=mid,
+            author_id=norm_id(author_id),
+            content=str(data.get("content") or "").strip(),
+            image_url=_image_preview_url(data.get("images")),
+            is_auto=bool((data.get("metadata") or {}).get("isAuto")),
+        )
+
+
+@dataclass(slots=True, eq=False)
+class ChatParticipant:
+    id: str | None
+    raw_id: Any
+    username: str = ""
+
+
+@dataclass(slots=True, eq=False)
+class Chat(_Identified):
+    id: str
+    unread: int = 0
+    participants: tuple[ChatParticipant, ...] = ()
+    last_message: ChatMessage | None = None
+
+    @classmethod
+    def from_api(cls, data: Any) -> "Chat | None":
+        if not isinstance(data, dict):
+            return None
+        cid = norm_id(data.get("id"))
+        if not cid:
+            return None
+        participants = tuple(
+            ChatParticipant(id=norm_id(p.get("id")), raw_id=p.get("id"), username=str(p.get("username") or ""))
+            for p in data.get("participants") or []
+            if isinstance(p, dict)
+        )
+        try:
+            unread = int(data.get("unreadMessageCount") or 0)
+        except Exception:
+            unread = 0
+        return cls(
+            id=cid,
+            unread=unread,
+            participants=participants,
+            last_message=ChatMessage.from_api(data.get("lastMessage")),
+        )
+
+    def interlocutor(self, self_id: str | None) -> tuple[str, int | None]:
+        username = ""
+        raw_id: int | None = None
+        for p in self.participants:
+            if self_id and p.id == self_id:
+                continue
+            if p.username:
+                username = p.username
+            if isinstance(p.raw_id, int) and raw_id is None:
+                raw_id = p.raw_id
+        if not username and self.participants:
+            username = self.participants[0].username
+        return username, raw_id
+
+    def username_of(self, user_id: str | None) -> str | None:
+        if not user_id:
+            return None
+        for p in self.participants:
+            if p.id == user_id:
+                return p.username or None
+        return None
+
+
+@dataclass(slots=True, eq=False)
+class Order(_Identified):
+    id: str
+    status: str = ""
+    created_at: int | None = None
+    price: int = 0
+    total: int = 0
+    quantity: int = 1
+    game_id: int | None = None
+    game_name: str | None = None
+    category_id: int | None = None
+    category_name: str | None = None
+    buyer_id: int | None = None
+    buyer_name: str | None = None
+    product_name: str = ""
+    product: str = "-"
+    raw: dict = field(default_factory=dict, repr=False)
+
+    @classmethod
+    def from_api(cls, data: Any) -> "Order | None":
+        if not isinstance(data, dict):
+            return None
+        oid = norm_id(data.get("id"))
+        if not oid:
+            return None
+        offer = data.get("offerDetails") or {}
+        game = offer.get("game") or {}
+        category = offer.get("category") or {}
+        user = data.get("user") or {}
+        offer_obj = offer.get("offer") or {}
+        desc_rus = (offer.get("descriptions") or {}).get("rus") or {}
+        product_name = (
+            str(desc_rus.get("briefDescription") or "").strip()
+            or str(desc_rus.get("description") or "").strip()
+            or str(offer_obj.get("name") or "").strip()
+            or str(offer.get("name") or "").strip()
+            or str(offer.get("title") or "").strip()
+        )
+        product_parts: list[str] = []
+        sub_category_name = str((offer.get("subCategory") or {}).get("name") or "").strip()
+        if sub_category_name:
+            product_parts.append(sub_category_name)
+        attr_values: list[str] = []
+        for attr in offer.get("attributes") or []:
+            value = (attr or {}).get("value") or {} if isinstance(attr, dict) else {}
+            name_ru = str(value.get("nameRu") or value.get("name") or "").strip() if isinstance(value, dict) else ""
+            if name_ru:
+                attr_values.append(name_ru)
+        if attr_values:
+            product_parts.append(", ".join(attr_values))
+        return cls(
+            id=oid,
+            status=str(data.get("status") or "").strip(),
+            created_at=_parse_ts(data.get("createdAt")),
+            price=_maybe_int(data.get("basePrice") or data.get("totalPrice")) or 0,
+            total=_maybe_int(data.get("totalPrice") or data.get("basePrice")) or 0,
+            quantity=_maybe_int(data.get("quantity")) or 1,
+            game_id=_maybe_int(game.get("id")),
+            game_name=game.get("name"),
+            category_id=_maybe_int(category.get("id")),
+            category_name=category.get("name"),
+            buyer_id=_maybe_int(user.get("id")),
+            buyer_name=user.get("username"),
+            product_name=product_name,
+            product=", ".join(product_parts).strip() or product_name or "-",
+            raw=data,
+        )
+
+    @property
+    def buyer_label(self) -> str:
+        return self.buyer_name or (str(self.buyer_id) if self.buyer_id is not None else "-")
+
+
+@dataclass(slots=True, eq=False)
+class Lot(_Identified):
+    id: int | None
+    title: str | None = None
+    url: str | None = None
+    price: Any = None
+    availability: Any = None
+    game_id: int | None = None
+    game_name: str | None = None
+    category_id: int | None = None
+    category_name: str | None = None
+    category_url: str | None = None
+    bump: dict | None = None
+
+    @classmethod
+    def from_api(cls, data: Any) -> "Lot | None":
+        if not isinstance(data, dict):
+            return None
+        return cls(
+            id=_maybe_int(data.get("id")),
+            title=data.get("title"),
+            url=data.get("url"),
+            price=data.get("price"),
+            availability=data.get("availability"),
+            game_id=_maybe_int(data.get("game_id")),
+            game_name=data.get("game_name"),
+            category_id=_maybe_int(data.get("category_id")),
+            category_name=data.get("category_name"),
+            category_url=data.get("category_url"),
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "id": self.id,
+            "title": self.title,
+            "url": self.url,
+            "price": self.price,
+            "availability": self.availability,
+            "game_id": self.game_id,
+            "game_name": self.game_name,
+            "category_id": self.category_id,
+            "category_name": self.category_name,
+            "category_url": self.category_url,
+            "bump": self.bump,
+        }
+
+
+@dataclass(slots=True, eq=False)
+class Offer(_Identified):
+    id: int
+    game_id: int | None = None
+    category_id: int | None = None
+    game_slug: str | None = None
+    category_slug: str | None = None
+    title: str | None = None
+
+    @classmethod
+    def from_detail(cls, data: Any) -> "Offer | None":
+        offer = ((data or {}).get("pageProps") or {}).get("offer") or {}
+        oid = offer.get("id")
+        if not isinstance(oid, int):
+            return None
+        game = offer.get("game") or {}
+        category = offer.get("category") or {}
+        cid = category.get("id") if isinstance(category.get("id"), int) else offer.get("categoryId")
+        gid = offer.get("gameId") if isinstance(offer.get("gameId"), int) else game.get("id")
+        return cls(
+            id=oid,
+            game_id=gid if isinstance(gid, int) else None,
+            category_id=cid if isinstance(cid, int) else None,
+            game_slug=game.get("slug"),
+            category_slug=category.get("slug"),
+            title=offer.get("title") or offer.get("name"),
+        )
+
+    def meta(self) -> dict[str, Any]:
+        return {
+            "game_id": self.game_id,
+            "category_id": self.category_id,
+            "game_slug": self.game_slug,
+            "category_slug": self.category_slug,
+            "title": self.title,
+        }
+
+
+def parse_chats(data: Any) -> list[Chat]:
+    page_props = (data or {}).get("pageProps", {}) if isinstance(data, dict) else {}
+    return [c for c in (Chat.from_api(x) for x in page_props.get("chats") or []) if c is not None]
+
+
+def parse_messages(items: Any) -> list[ChatMessage]:
+    return [m for m in (ChatMessage.from_api(x) for x in items or []) if m is not None]
+
+
+def parse_orders(data: Any) -> list[Order]:
+    page_props = (data or {}).get("pageProps", {}) if isinstance(data, dict) else {}
+    return [o for o in (Order.from_api(x) for x in page_props.get("orders") or []) if o is not None]
+
+
+def parse_lots(items: Any) -> list[Lot]:
+    return [lot for lot in (Lot.from_api(x) for x in items or []) if lot is not None]
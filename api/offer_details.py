@@ -1,6 +1,7 @@
 import aiohttp
 from aiohttp import ClientResponseError
 
+from api.http_client import get_session
 from api.next_data import get_build_id, reset_build_id
 from api.rate_limiter import throttle
 
@@ -28,19 +29,19 @@ async def fetch_offer_detail(
     for attempt in range(2):
         build_id = await get_build_id(session_cookie)
         url = f"https://starvell.com/_next/data/{build_id}/offers/{offer_id}.json?offer_id={offer_id}"
-        async with aiohttp.ClientSession(headers=headers, cookies=cookies, timeout=timeout) as session:
-            try:
-                await throttle()
-                async with session.get(url) as resp:
-                    resp.raise_for_status()
-                    data = await resp.json()
-                    return data
-            except ClientResponseError as exc:
-                last_exc = exc
-                if exc.status == 404 and attempt == 0:
-                    reset_build_id()
-                    continue
-                raise
+        session = get_session()
+        try:
+            await throttle()
+            async with session.get(url, headers=headers, cookies=cookies, timeout=timeout) as resp:
+                resp.raise_for_status()
+                data = await resp.json()
+                return data
+        except ClientResponseError as exc:
+            last_exc = exc
+            if exc.status == 404 and attempt == 0:
+                reset_build_id()
+                continue
+            raise
     if last_exc:
         raise last_exc
     raise RuntimeError("Unable to fetch offer detail")
@@ -1,7 +1,12 @@
+import asyncio
+from datetime import datetime, timezone
+from typing import AsyncIterator, Callable
+
 import aiohttp
 from aiohttp import ClientResponseError, ContentTypeError
 
 from api.next_data import get_build_id, reset_build_id
+from api.http_client import get_session
 from api.rate_limiter import throttle
 
 
@@ -23,48 +28,123 @@ async def fetch_sells(session_cookie: str, page: int | None = None, my_games_coo
         url = f"https://starvell.com/_next/data/{build_id}/account/sells.json"
         if isinstance(page, int) and page > 1:
             url += f"?page={page}"
-        async with aiohttp.ClientSession(headers=headers, cookies=cookies, timeout=timeout) as session:
-            try:
-                await throttle()
-                async with session.get(url) as resp:
-                    resp.raise_for_status()
-                    return await resp.json()
-            except ClientResponseError as exc:
-                last_exc = exc
-                if exc.status == 404 and attempt == 0:
-                    reset_build_id()
-                    continue
-                raise
+        session = get_session()
+        try:
+            await throttle()
+            async with session.get(url, headers=headers, cookies=cookies, timeout=timeout) as resp:
+                resp.raise_for_status()
+                return await resp.json()
+        except ClientResponseError as exc:
+            last_exc = exc
+            if exc.status == 404 and attempt == 0:
+                reset_build_id()
+                continue
+            raise
     if last_exc:
         raise last_exc
     raise RuntimeError("Unable to fetch sells list")
 
 
-async def fetch_sells_all(session_cookie: str, max_pages: int = 200) -> list[dict]:
-    items: list[dict] = []
-    page = 1
-    seen_ids: set[str] = set()
-    while page <= max_pages:
+class SellsPageError(Exception):
+    def __init__(self, page: int, error: Exception):
+        super().__init__(f"sells page {page} failed: {error}")
+        self.page = page
+        self.error = error
+
+
+def _created_ts(order: dict) -> float | None:
+    raw = (order or {}).get("createdAt")
+    if not raw:
+        return None
+    try:
+        text = str(raw)
+        if text.endswith("Z"):
+            text = text[:-1] + "+00:00"
+        dt = datetime.fromisoformat(text)
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        return dt.timestamp()
+    except Exception:
+        return None
+
+
+async def _fetch_sells_page(
+    session_cookie: str,
+    page: int,
+    my_games_cookie: str | None,
+    retries: int,
+    retry_delay: float,
+) -> list[dict]:
+    attempt = 0
+    while True:
         try:
-            data = await fetch_sells(session_cookie, page=page if page > 1 else None)
-        except Exception:
-            break
-        page_props = (data or {}).get("pageProps", {})
-        orders = page_props.get("orders") or []
-        if not orders:
-            break
-        for o in orders:
-            try:
+            data = await fetch_sells(session_cookie, page=page if page > 1 else None, my_games_cookie=my_games_cookie)
+            return list(((data or {}).get("pageProps") or {}).get("orders") or [])
+        except ClientResponseError as exc:
+            if 400 <= exc.status < 500 and exc.status != 429 or attempt >= retries:
+                raise SellsPageError(page, exc) from exc
+        except Exception as exc:
+            if attempt >= retries:
+                raise SellsPageError(page, exc) from exc
+        await asyncio.sleep(retry_delay * (2 ** attempt))
+        attempt += 1
+
+
+async def iter_sells(
+    session_cookie: str,
+    start_page: int = 1,
+    max_pages: int = 200,
+    since: datetime | float | None = None,
+    stop: Callable[[dict], bool] | None = None,
+    retries: int = 2,
+    retry_delay: float = 2.0,
+    prefetch: bool = False,
+    my_games_cookie: str | None = None,
+) -> AsyncIterator[tuple[int, list[dict]]]:
+    if isinstance(since, datetime):
+        since = since.timestamp()
+    page = max(1, int(start_page))
+    last_page = page + max(0, int(max_pages)) - 1
+    seen_ids: set[str] = set()
+    pending: asyncio.Task | None = None
+    try:
+        while page <= last_page:
+            if pending is not None:
+                task, pending = pending, None
+                orders = await task
+            else:
+                orders = await _fetch_sells_page(session_cookie, page, my_games_cookie, retries, retry_delay)
+            if not orders:
+                return
+            if prefetch and page < last_page:
+                pending = asyncio.create_task(
+                    _fetch_sells_page(session_cookie, page + 1, my_games_cookie, retries, retry_delay)
+                )
+            batch: list[dict] = []
+            finished = False
+            for o in orders:
+                if since is not None:
+                    ts = _created_ts(o)
+                    if ts is not None and ts < since:
+                        finished = True
+                        break
+                if stop is not None and stop(o):
+                    finished = True
+                    break
                 oid = str((o or {}).get("id") or "")
-                if oid and oid in seen_ids:
-                    continue
                 if oid:
+                    if oid in seen_ids:
+                        continue
                     seen_ids.add(oid)
-                items.append(o)
-            except Exception:
-                items.append(o)
-        page += 1
-    return items
+                batch.append(o)
+            if batch:
+                yield page, batch
+            if finished:
+                return
+            page += 1
+    finally:
+        if pending is not None and not pending.done():
+            pending.cancel()
 
 
 async def refund_order(
@@ -89,21 +169,21 @@ async def refund_order(
     timeout = aiohttp.ClientTimeout(total=20)
     url = "https://starvell.com/api/orders/refund"
     payload = {"orderId": order_id}
-    async with aiohttp.ClientSession(headers=headers, cookies=cookies, timeout=timeout) as session:
-        await throttle()
-        async with session.post(url, json=payload) as resp:
-            resp.raise_for_status()
+    session = get_session()
+    await throttle()
+    async with session.post(url, json=payload, headers=headers, cookies=cookies, timeout=timeout) as resp:
+        resp.raise_for_status()
+        try:
+            ct = resp.headers.get("Content-Type", "")
+            if "application/json" in ct.lower():
+                return await resp.json()
+            text = await resp.text()
+            return {"status": resp.status, "text": text}
+        except ContentTypeError:
             try:
-                ct = resp.headers.get("Content-Type", "")
-                if "application/json" in ct.lower():
-                    return await resp.json()
                 text = await resp.text()
-                return {"status": resp.status, "text": text}
-            except ContentTypeError:
-                try:
-                    text = await resp.text()
-                except Exception:
-                    text = ""
-                return {"status": resp.status, "text": text}
+            except Exception:
+                text = ""
+            return {"status": resp.status, "text": text}
 
 
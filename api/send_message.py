@@ -1,6 +1,7 @@
 import json
 import aiohttp
 
+from api.http_client import get_session
 from api.rate_limiter import throttle
 
 
@@ -19,16 +20,16 @@ async def send_chat_message(session_cookie: str, chat_id: str, content: str, my_
     payload = {"chatId": chat_id, "content": content}
     url = "https://starvell.com/api/messages/send"
     timeout = aiohttp.ClientTimeout(total=20)
-    async with aiohttp.ClientSession(headers=headers, cookies=cookies, timeout=timeout) as session:
-        await throttle()
-        async with session.post(url, json=payload) as resp:
-            response_text = await resp.text()
-            if resp.status >= 400:
-                raise RuntimeError(f"HTTP {resp.status}: {response_text}")
-            try:
-                return json.loads(response_text)
-            except json.JSONDecodeError as exc:
-                raise RuntimeError("Invalid response from server") from exc
+    session = get_session()
+    await throttle()
+    async with session.post(url, json=payload, headers=headers, cookies=cookies, timeout=timeout) as resp:
+        response_text = await resp.text()
+        if resp.status >= 400:
+            raise RuntimeError(f"HTTP {resp.status}: {response_text}")
+        try:
+            return json.loads(response_text)
+        except json.JSONDecodeError as exc:
+            raise RuntimeError("Invalid response from server") from exc
 
 
 async def send_chat_image(
@@ -62,13 +63,13 @@ async def send_chat_image(
 
     url = f"https://starvell.com/api/messages/send-with-image?chatId={chat_id}"
     timeout = aiohttp.ClientTimeout(total=60)
-    async with aiohttp.ClientSession(headers=headers, cookies=cookies, timeout=timeout) as session:
-        await throttle()
-        async with session.post(url, data=form) as resp:
-            response_text = await resp.text()
-            if resp.status >= 400:
-                raise RuntimeError(f"HTTP {resp.status}: {response_text}")
-            try:
-                return json.loads(response_text)
-            except json.JSONDecodeError as exc:
-                raise RuntimeError("Invalid response from server") from exc
+    session = get_session()
+    await throttle()
+    async with session.post(url, data=form, headers=headers, cookies=cookies, timeout=timeout) as resp:
+        response_text = await resp.text()
+        if resp.status >= 400:
+            raise RuntimeError(f"HTTP {resp.status}: {response_text}")
+        try:
+            return json.loads(response_text)
+        except json.JSONDecodeError as exc:
+            raise RuntimeError("Invalid response from server") from exc
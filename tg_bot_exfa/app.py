@@ -8,6 +8,9 @@ class AppContext:
         self.db = db
         self.monitor_task = None
         self.plugin_manager = None
+        self.loop_health = None
+        self.buyer_chats = None
+        self.seen_messages = None
 
 
 app_context: AppContext | None = None
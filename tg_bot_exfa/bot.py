@@ -7,7 +7,7 @@ from aiogram.fsm.storage.memory import MemoryStorage
 from aiogram.client.default import DefaultBotProperties
 
 import tg_bot_exfa.app as app
-from tg_bot_exfa.config import load_config, save_config, md5_hex
+from tg_bot_exfa.config import load_config, save_config, md5_hex, config_service
 from tg_bot_exfa.storage.db import Database
 from tg_bot_exfa.handlers.start import router as start_router
 from tg_bot_exfa.handlers.callbacks import router as callbacks_router
@@ -15,9 +15,11 @@ from tg_bot_exfa.handlers.plugins import router as plugins_router
 from tg_bot_exfa.handlers.plugin_cmds import router as plugin_cmds_router
 from tg_bot_exfa.monitor import start_monitor, load_config as load_osnova_config
 from api.auth import fetch_homepage_data
+from api.http_client import close_session
 from tg_bot_exfa.logger import setup_logging
+from tg_bot_exfa.loop_health import LoopHealth
 from tg_bot_exfa.handlers.logs import router as logs_router
-from tg_bot_exfa.plugins import PluginManager, PluginContext
+from tg_bot_exfa.plugins import PluginManager
 from pathlib import Path
 
 
@@ -39,25 +41,26 @@ async def run_bot() -> None:
         cfg.default_language = lang
         save_config(cfg)
         try:
-            from pathlib import Path
-            import json
             session_cookie = input("Enter SESSION_COOKIE (optional, press Enter to skip): ").strip()
             if session_cookie:
-                cfg_path = Path(cfg.path)
-                obj = {}
-                if cfg_path.exists():
-                    try:
-                        obj = json.loads(cfg_path.read_text(encoding="utf-8") or "{}")
-                    except Exception:
-                        obj = {}
-                obj["SESSION_COOKIE"] = session_cookie
-                cfg_path.write_text(json.dumps(obj, ensure_ascii=False, indent=4), encoding="utf-8")
+                config_service.update({"SESSION_COOKIE": session_cookie})
         except Exception:
             pass
     db_path = os.path.join(os.path.dirname(__file__), "bot.sqlite3")
-    db = Database(db_path)
+    try:
+        sales_tz_hours = float(load_osnova_config().get("SALES_TZ_OFFSET_HOURS", 3))
+    except Exception:
+        sales_tz_hours = 3.0
+    db = Database(db_path, sales_tz_offset=int(sales_tz_hours * 3600))
     await db.init()
     app.app_context = app.AppContext(cfg, db)
+
+    def _on_config_change(snapshot) -> None:
+        if app.app_context is not None:
+            app.app_context.config = load_config()
+        log.info("config_reloaded version=%s", snapshot.version)
+
+    config_service.subscribe(_on_config_change)
     bot = Bot(token=cfg.token, default=DefaultBotProperties(parse_mode="HTML"))
     dp = Dispatcher(storage=MemoryStorage())
     try:
@@ -65,7 +68,29 @@ async def run_bot() -> None:
         Path("storage/plugins").mkdir(parents=True, exist_ok=True)
     except Exception:
         pass
-    pm = PluginManager(root_dir="plugins", state_path="storage/plugins/state.json")
+    try:
+        plugins_cfg = load_osnova_config()
+    except Exception:
+        plugins_cfg = {}
+    pm = PluginManager(
+        root_dir="plugins",
+        state_path="storage/plugins/state.json",
+        timeout=float(plugins_cfg.get("PLUGIN_TIMEOUT", 15)),
+        breaker_threshold=int(plugins_cfg.get("PLUGIN_BREAKER_THRESHOLD", 3)),
+        background=bool(plugins_cfg.get("PLUGIN_DISPATCH_BACKGROUND", False)),
+        thread_workers=int(plugins_cfg.get("PLUGIN_THREAD_WORKERS", 8)),
+        max_concurrency=int(plugins_cfg.get("PLUGIN_MAX_CONCURRENCY", 4)),
+        process_workers=int(plugins_cfg.get("PLUGIN_PROCESS_WORKERS", 2)),
+        api_per_minute=float(plugins_cfg.get("PLUGIN_API_PER_MINUTE", 20)),
+        api_budgets=plugins_cfg.get("PLUGIN_API_BUDGETS") or {},
+        profile_calls=int(plugins_cfg.get("PLUGIN_PROFILE_CALLS", 20)),
+        profile_every=int(plugins_cfg.get("PLUGIN_PROFILE_EVERY", 1)),
+        kv_flush_interval=float(plugins_cfg.get("PLUGIN_KV_FLUSH_INTERVAL", 1)),
+        kv_cache_size=int(plugins_cfg.get("PLUGIN_KV_CACHE_SIZE", 4096)),
+        scheduler_concurrency=int(plugins_cfg.get("PLUGIN_SCHEDULER_CONCURRENCY", 4)),
+        parallel_import=bool(plugins_cfg.get("PLUGIN_PARALLEL_IMPORT", False)),
+    )
+    pm.bind(db)
     pm.load_all()
     app.app_context.plugin_manager = pm
     try:
@@ -147,14 +172,7 @@ async def run_bot() -> None:
     dp.include_router(plugin_cmds_router)
     dp.include_router(logs_router)
     log.info("Routers loaded. Starting monitor task…")
-    try:
-        osnova_cfg = load_osnova_config()
-    except Exception:
-        osnova_cfg = {}
-    try:
-        session_cookie_init = (osnova_cfg or {}).get("SESSION_COOKIE", "")
-        ctx_init = PluginContext(session_cookie=session_cookie_init, db=db, config=osnova_cfg or {})
-        await pm.dispatch_init(ctx_init)
+    async def _sync_commands() -> None:
         try:
             base_cmds = [
                 BotCommand(command="start", description="Запуск"),
@@ -174,12 +192,43 @@ async def run_bot() -> None:
             await bot.set_my_commands(base_cmds + plugin_cmds)
         except Exception:
             pass
+
+    try:
+        await pm.dispatch_init()
+        await _sync_commands()
     except Exception:
         pass
+    try:
+        reload_interval = float(load_osnova_config().get("PLUGIN_RELOAD_INTERVAL", 2))
+    except Exception:
+        reload_interval = 2.0
+    if reload_interval > 0:
+        asyncio.create_task(pm.watch(reload_interval, on_change=_sync_commands))
+    try:
+        osnova_cfg = load_osnova_config() or {}
+        slow_cb = osnova_cfg.get("LOOP_SLOW_CALLBACK_MS")
+        loop_health = LoopHealth(
+            threshold_ms=float(osnova_cfg.get("LOOP_LAG_THRESHOLD_MS", 1000)),
+            alert_cooldown=float(osnova_cfg.get("LOOP_LAG_ALERT_COOLDOWN", 600)),
+            slow_callback_ms=float(slow_cb) if slow_cb else None,
+        )
+        app.app_context.loop_health = loop_health
+        asyncio.create_task(loop_health.run())
+    except Exception as e:
+        log.warning("Loop health monitor not started: %s", e)
     mt = asyncio.create_task(start_monitor())
     app.app_context.monitor_task = mt
     log.info("Polling started")
-    await dp.start_polling(bot)
+    try:
+        await dp.start_polling(bot)
+    finally:
+        if pm.kv is not None:
+            try:
+                await pm.kv.close()
+            except Exception:
+                pass
+        pm.shutdown()
+        await close_session()
 
 
 def main() -> None:
@@ -0,0 +1,250 @@
+import logging
+import re
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any
+from zoneinfo import ZoneInfo
+
+
+_NEXT_AT_KEYS = ("nextBumpAt", "nextBumpDate", "availableAt", "bumpAvailableAt", "nextAvailableAt", "canBumpAt")
+_SECONDS_KEYS = ("cooldown", "retryAfter", "secondsLeft", "timeLeft", "remaining", "wait")
+_DURATION_RE = re.compile(
+    r"(\d+)\s*(ч|час|h|hour|мин|min|m\b|minute|сек|sec|s\b|second)",
+    re.IGNORECASE,
+)
+_CLOCK_RE = re.compile(r"\b(\d{1,2}):(\d{2})(?::(\d{2}))?\b")
+_SCOPE_MARKERS = ("bump", "cooldown", "error")
+
+try:
+    _SITE_TZ = ZoneInfo("Europe/Moscow")
+except Exception:
+    _SITE_TZ = timezone(timedelta(hours=3))
+
+
+def _parse_instant(value: Any, now: float) -> float | None:
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        if value > 10**11:
+            return float(value) / 1000.0
+        if value >= 10**9:
+            return float(value)
+        return now + max(0.0, float(value))
+    try:
+        text = str(value).strip()
+        if text.endswith("Z"):
+            text = text[:-1] + "+00:00"
+        dt = datetime.fromisoformat(text)
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        return dt.timestamp()
+    except Exception:
+        return None
+
+
+def _parse_seconds(value: Any) -> float | None:
+    if isinstance(value, bool) or value is None:
+        return None
+    try:
+        seconds = float(value)
+    except Exception:
+        return None
+    if seconds > 86400 * 2:
+        seconds /= 1000.0
+    return seconds if seconds >= 0 else None
+
+
+def _walk(obj: Any, depth: int = 0):
+    if depth > 4:
+        return
+    if isinstance(obj, dict):
+        yield obj
+        for v in obj.values():
+            yield from _walk(v, depth + 1)
+    elif isinstance(obj, list):
+        for v in obj[:20]:
+            yield from _walk(v, depth + 1)
+
+
+def _walk_scoped(obj: Any, depth: int = 0, scoped: bool = False):
+    if depth > 4:
+        return
+    if isinstance(obj, dict):
+        if scoped or depth == 0:
+            yield obj
+        for k, v in obj.items():
+            inner = scoped or any(marker in str(k).lower() for marker in _SCOPE_MARKERS)
+            yield from _walk_scoped(v, depth + 1, inner)
+    elif isinstance(obj, list):
+        for v in obj[:20]:
+            yield from _walk_scoped(v, depth + 1, scoped)
+
+
+def _parse_text(text: str, now: float) -> float | None:
+    total = 0.0
+    found = False
+    for amount, unit in _DURATION_RE.findall(text or ""):
+        unit = unit.lower()
+        factor = 1
+        if unit.startswith(("ч", "h")):
+            factor = 3600
+        elif unit.startswith(("мин", "min", "m")):
+            factor = 60
+        total += int(amount) * factor
+        found = True
+    if found:
+        return total
+    match = _CLOCK_RE.search(text or "")
+    if match:
+        h, m = int(match.group(1)), int(match.group(2))
+        if match.group(3) is not None:
+            return float(h * 3600 + m * 60 + int(match.group(3)))
+        if h > 23 or m > 59:
+            return None
+        local = datetime.fromtimestamp(now, _SITE_TZ)
+        target = local.replace(hour=h, minute=m, second=0, microsecond=0)
+        if target <= local:
+            target += timedelta(days=1)
+        return target.timestamp() - now
+    return None
+
+
+def parse_cooldown(response: Any, now: float | None = None) -> float | None:
+    now = time.time() if now is None else now
+    if not isinstance(response, dict):
+        return None
+    for node in _walk(response.get("json")):
+        for key in _NEXT_AT_KEYS:
+            at = _parse_instant(node.get(key), now)
+            if at is not None:
+                return max(0.0, at - now)
+    for node in _walk_scoped(response.get("json")):
+        for key in _SECONDS_KEYS:
+            seconds = _parse_seconds(node.get(key))
+            if seconds is not None:
+                return seconds
+    texts: list[str] = []
+    for node in _walk(response.get("json")):
+        for key in ("message", "error", "detail"):
+            val = node.get(key)
+            if isinstance(val, str):
+                texts.append(val)
+            elif isinstance(val, list):
+                texts.extend(str(v) for v in val)
+    if isinstance(response.get("raw"), str):
+        texts.append(response["raw"])
+    for text in texts:
+        seconds = _parse_text(text, now)
+        if seconds is not None:
+            return seconds
+    return None
+
+
+class BumpScheduler:
+    def __init__(
+        self,
+        db,
+        default_interval: float = 1800,
+        retry_delay: float = 300,
+        late_threshold: float = 120,
+        margin: float = 5,
+    ):
+        self.db = db
+        self.default_interval = max(60.0, float(default_interval))
+        self.retry_delay = max(30.0, float(retry_delay))
+        self.late_threshold = max(1.0, float(late_threshold))
+        self.margin = max(0.0, float(margin))
+        self.entries: dict[str, dict[str, Any]] = {}
+        self._log = logging.getLogger("exfador.bump")
+        self._loaded = False
+
+    @staticmethod
+    def key(game_id: int, category_ids) -> str:
+        return f"{int(game_id)}:{','.join(str(c) for c in sorted(category_ids))}"
+
+    async def load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        now = time.time()
+        for row in await self.db.list_bump_schedule():
+            self.entries[row["key"]] = row
+            overdue = now - float(row.get("next_at") or 0)
+            if row.get("last_bump_at") and overdue > self.default_interval:
+                missed = int(overdue // self.default_interval)
+                row["missed_count"] = int(row.get("missed_count") or 0) + missed
+                self._log.warning(f"bump_missed key={row['key']} missed={missed} overdue_s={int(overdue)}")
+
+    async def sync(self, targets: dict[int, set[int]]) -> None:
+        await self.load()
+        now = time.time()
+        wanted = {self.key(gid, cats): (gid, sorted(cats)) for gid, cats in targets.items() if cats}
+        stale = [k for k in self.entries if k not in wanted]
+        for k in stale:
+            self.entries.pop(k, None)
+        if stale:
+            await self.db.delete_bump_schedule(stale)
+        fresh = []
+        for k, (gid, cats) in wanted.items():
+            if k in self.entries:
+                continue
+            entry = {
+                "key": k,
+                "game_id": gid,
+                "category_ids": cats,
+                "next_at": now,
+                "interval": self.default_interval,
+                "last_bump_at": None,
+                "last_status": None,
+                "late_count": 0,
+                "missed_count": 0,
+            }
+            self.entries[k] = entry
+            fresh.append(entry)
+        if fresh:
+            await self.db.save_bump_schedule(fresh)
+
+    def due(self, now: float | None = None, window: float = 0) -> list[dict[str, Any]]:
+        now = time.time() if now is None else now
+        return [e for e in self.entries.values() if float(e.get("next_at") or 0) <= now + window]
+
+    def next_wakeup(self) -> float | None:
+        if not self.entries:
+            return None
+        return min(float(e.get("next_at") or 0) for e in self.entries.values())
+
+    async def record(self, entry: dict[str, Any], result: Any, fired_at: float) -> dict[str, Any]:
+        due_at = float(entry.get("next_at") or fired_at)
+        late_s = max(0.0, fired_at - due_at)
+        if late_s > self.late_threshold:
+            entry["late_count"] = int(entry.get("late_count") or 0) + 1
+            self._log.warning(f"bump_late key={entry['key']} late_s={int(late_s)}")
+        now = time.time()
+        interval = float(entry.get("interval") or self.default_interval)
+        if isinstance(result, Exception):
+            entry["last_status"] = "error"
+            entry["next_at"] = now + self.retry_delay
+        else:
+            resp = (result or {}).get("response") or {}
+            cooldown = parse_cooldown(resp, now)
+            if resp.get("success"):
+                if cooldown is not None and cooldown > 0:
+                    interval = cooldown
+                else:
+                    interval = max(self.default_interval, interval * 0.97)
+                entry["last_bump_at"] = fired_at
+                entry["last_status"] = "ok"
+                wait = interval
+            else:
+                entry["last_status"] = "rejected"
+                if cooldown is not None and cooldown > 0:
+                    wait = cooldown
+                    if entry.get("last_bump_at"):
+                        interval = max(interval, now + cooldown - float(entry["last_bump_at"]))
+                else:
+                    wait = self.retry_delay
+                    interval = min(self.default_interval * 2, interval * 1.1)
+            entry["next_at"] = now + wait + self.margin
+        entry["interval"] = interval
+        await self.db.save_bump_schedule([entry])
+        return {"key": entry["key"], "game_id": entry.get("game_id"), "late_s": int(late_s)}
@@ -0,0 +1,60 @@
+import logging
+from typing import Any
+
+from api.chats import fetch_chats
+from api.models import norm_id
+
+
+class BuyerChatIndex:
+    def __init__(self, db):
+        self.db = db
+        self._chats: dict[str, str] = {}
+        self._loaded = False
+        self._log = logging.getLogger("exfador.chats")
+
+    async def load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            self._chats.update(await self.db.load_buyer_chats())
+        except Exception as exc:
+            self._log.warning(f"buyer_index_load_failed error={exc}")
+
+    async def update_from_chats(self, chats: list[Any], self_id: Any = None) -> int:
+        await self.load()
+        self_norm = norm_id(self_id)
+        changed: dict[str, str] = {}
+        for chat in chats or []:
+            if not isinstance(chat, dict):
+                continue
+            chat_id = norm_id(chat.get("id"))
+            if not chat_id:
+                continue
+            for participant in chat.get("participants") or []:
+                pid = norm_id((participant or {}).get("id"))
+                if not pid or pid == self_norm:
+                    continue
+                if self._chats.get(pid) != chat_id:
+                    self._chats[pid] = chat_id
+                    changed[pid] = chat_id
+        if changed:
+            try:
+                await self.db.save_buyer_chats(changed)
+            except Exception as exc:
+                self._log.warning(f"buyer_index_save_failed error={exc}")
+        return len(changed)
+
+    def get(self, buyer_id: Any) -> str | None:
+        key = norm_id(buyer_id)
+        return self._chats.get(key) if key else None
+
+    async def lookup(self, session_cookie: str, buyer_id: Any) -> str | None:
+        await self.load()
+        chat_id = self.get(buyer_id)
+        if chat_id:
+            return chat_id
+        data = await fetch_chats(session_cookie)
+        page_props = data.get("pageProps", {}) if isinstance(data, dict) else {}
+        await self.update_from_chats(page_props.get("chats") or [], (page_props.get("user") or {}).get("id"))
+        return self.get(buyer_id)
@@ -1,6 +1,16 @@
+import copy
 import json
 import os
 import hashlib
+import logging
+import threading
+import time
+from collections.abc import Mapping
+from types import MappingProxyType
+from typing import Any, Callable
+
+
+CONFIG_PATH = os.path.normpath(os.path.join(os.path.dirname(__file__), "..", "config", "osnova.json"))
 
 
 class BotConfig:
@@ -36,12 +46,7 @@ def md5_hex(text: str) -> str:
     return hashlib.md5(text.encode("utf-8")).hexdigest()
 
 
-def load_config() -> BotConfig:
-    path = os.path.normpath(os.path.join(os.path.dirname(__file__), "..", "config", "osnova.json"))
-    data = {}
-    if os.path.exists(path):
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+def _build_bot_config(data: Mapping, path: str) -> BotConfig:
     token = os.getenv("BOT_TOKEN") or data.get("BOT_TOKEN", "")
     password_md5 = os.getenv("BOT_PASSWORD_MD5") or data.get("BOT_PASSWORD_MD5", "")
     if not password_md5:
@@ -79,38 +84,165 @@ def load_config() -> BotConfig:
     )
 
 
-def save_config(cfg: BotConfig) -> None:
-    data = {}
-    cfg_dir = os.path.dirname(cfg.path)
+class ConfigSnapshot(Mapping):
+    __slots__ = ("_data", "version")
+
+    def __init__(self, data: dict[str, Any], version: int):
+        self._data = MappingProxyType(dict(data))
+        self.version = version
+
+    def __getitem__(self, key: str) -> Any:
+        return self._data[key]
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __repr__(self) -> str:
+        return f"ConfigSnapshot(version={self.version}, keys={len(self._data)})"
+
+
+class ConfigService:
+    def __init__(self, path: str = CONFIG_PATH, check_interval: float = 1.0):
+        self.path = path
+        self.check_interval = max(0.0, float(check_interval))
+        self._lock = threading.Lock()
+        self._snapshot = ConfigSnapshot({}, 0)
+        self._bot_config: BotConfig | None = None
+        self._stat_key: tuple | None = None
+        self._checked_at = 0.0
+        self._loaded = False
+        self._subscribers: list[Callable[[ConfigSnapshot], None]] = []
+        self._log = logging.getLogger("exfador.config")
+
+    def _stat(self) -> tuple | None:
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_ino, st.st_size)
+
+    def _reload_locked(self, stat_key: tuple | None) -> bool:
+        data: dict[str, Any] = {}
+        if stat_key is not None:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    data = json.load(f) or {}
+            except Exception as exc:
+                self._log.warning(f"config_reload_failed path={self.path} error={exc}")
+                return False
+        self._stat_key = stat_key
+        self._snapshot = ConfigSnapshot(data, self._snapshot.version + 1)
+        self._bot_config = None
+        return True
+
+    def snapshot(self) -> ConfigSnapshot:
+        now = time.monotonic()
+        if self._loaded and now - self._checked_at < self.check_interval:
+            return self._snapshot
+        changed = False
+        with self._lock:
+            self._checked_at = now
+            stat_key = self._stat()
+            if not self._loaded or stat_key != self._stat_key:
+                changed = self._reload_locked(stat_key) and self._loaded
+                self._loaded = True
+            snap = self._snapshot
+        if changed:
+            for callback in list(self._subscribers):
+                try:
+                    callback(snap)
+                except Exception as exc:
+                    self._log.warning(f"config_subscriber_failed error={exc}")
+        return snap
+
+    def bot_config(self) -> BotConfig:
+        snap = self.snapshot()
+        with self._lock:
+            if self._bot_config is None or self._snapshot is not snap:
+                self._bot_config = _build_bot_config(snap, self.path)
+            return copy.copy(self._bot_config)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._checked_at = 0.0
+            self._stat_key = ("invalidated",)
+
+    def subscribe(self, callback: Callable[[ConfigSnapshot], None]) -> None:
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[ConfigSnapshot], None]) -> None:
+        try:
+            self._subscribers.remove(callback)
+        except ValueError:
+            pass
+
+    def update(self, values: dict[str, Any]) -> ConfigSnapshot:
+        with self._lock:
+            data: dict[str, Any] = {}
+            if os.path.exists(self.path):
+                try:
+                    with open(self.path, "r", encoding="utf-8") as f:
+                        data = json.load(f) or {}
+                except Exception:
+                    data = {}
+            data.update(values)
+            _write_json_atomic(self.path, data)
+            self._checked_at = 0.0
+            self._stat_key = ("invalidated",)
+        return self.snapshot()
+
+
+def _write_json_atomic(path: str, data: dict[str, Any]) -> None:
+    cfg_dir = os.path.dirname(path)
     if cfg_dir and not os.path.exists(cfg_dir):
         os.makedirs(cfg_dir, exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=4)
+    os.replace(tmp, path)
+
+
+config_service = ConfigService()
+
+
+def load_config() -> BotConfig:
+    return config_service.bot_config()
+
+
+def get_config() -> ConfigSnapshot:
+    return config_service.snapshot()
 
+
+def save_config(cfg: BotConfig) -> None:
+    values = {
+        "BOT_TOKEN": cfg.token,
+        "BOT_PASSWORD_MD5": cfg.password_md5,
+        "DEFAULT_LANGUAGE": cfg.default_language or "ru",
+        "DEBUG": bool(cfg.debug),
+        "WATERMARK_ON": bool(getattr(cfg, "watermark_on", True)),
+        "WATERMARK_TEXT": str(getattr(cfg, "watermark_text", "[CXH BOT]")),
+        "WELCOME_ENABLED": bool(getattr(cfg, "welcome_enabled", True)),
+        "WELCOME_TEXT": str(
+            getattr(
+                cfg,
+                "welcome_text",
+                "CXH BOT это автоматический бот по заказам / cообщения с сайта starvell, наш бот может многое",
+            )
+        ),
+        "WELCOME_COOLDOWN_MINUTES": int(getattr(cfg, "welcome_cooldown_minutes", 1900)),
+    }
+    if os.path.normpath(cfg.path) == config_service.path:
+        config_service.update(values)
+        return
+    data = {}
     if os.path.exists(cfg.path):
         try:
             with open(cfg.path, "r", encoding="utf-8") as f:
                 data = json.load(f) or {}
         except Exception:
             data = {}
-    data.update(
-        {
-            "BOT_TOKEN": cfg.token,
-            "BOT_PASSWORD_MD5": cfg.password_md5,
-            "DEFAULT_LANGUAGE": cfg.default_language or "ru",
-            "DEBUG": bool(cfg.debug),
-            "WATERMARK_ON": bool(getattr(cfg, "watermark_on", True)),
-            "WATERMARK_TEXT": str(getattr(cfg, "watermark_text", "[CXH BOT]")),
-            "WELCOME_ENABLED": bool(getattr(cfg, "welcome_enabled", True)),
-            "WELCOME_TEXT": str(
-                getattr(
-                    cfg,
-                    "welcome_text",
-                    "CXH BOT это автоматический бот по заказам / cообщения с сайта starvell, наш бот может многое",
-                )
-            ),
-            "WELCOME_COOLDOWN_MINUTES": int(getattr(cfg, "welcome_cooldown_minutes", 1900)),
-        }
-    )
-    with open(cfg.path, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=4)
-
-
+    data.update(values)
+    _write_json_atomic(cfg.path, data)
@@ -69,6 +69,15 @@ class Translations:
                 "auth_fail": "❌ Авторизация неуспешна",
                 "bump_success": "📈 Бамп успешен: {title}",
                 "bump_fail": "⚠️ Бамп не выполнен: {title}",
+                "bump_digest_title": "📈 Отчёт о бампе",
+                "bump_digest_summary": "Категорий: ✅ <code>{ok}</code> | ⚠️ <code>{fail}</code>\nЛотов поднято: <code>{lots}</code>",
+                "bump_digest_game": "🎮 <b>{game}</b>",
+                "bump_digest_category": "{icon} {category} — лотов: <code>{lots}</code>",
+                "bump_digest_lots_title": "📋 Лоты из отчёта",
+                "bump_digest_expired": "Отчёт о бампе больше недоступен",
+                "bump_digest_late": "⏱ С опозданием: <code>{count}</code> (до <code>{late_s}</code> с)",
+                "btn_bump_lots": "📋 Лоты",
+                "btn_bump_summary": "📈 Сводка",
                 "btn_open_link": "🔗 Открыть",
                 "btn_profile": "👤 Профиль",
                 "btn_author": "👤 Автор",
@@ -113,6 +122,14 @@ class Translations:
                 "stats_line_with_sums": "✅ Завершено: <code>{completed}</code> (<code>{sum_completed}</code>) | ↩️ Возвраты: <code>{refund}</code> (<code>{sum_refund}</code>) | 🛒 Создано: <code>{created}</code> (<code>{sum_created}</code>)",
                 "stats_summary_net": "За всё время заработано: <code>{net} ₽</code>",
                 "stats_summary_waiting": "В ожидании: <code>{waiting} ₽</code>",
+                "stats_syncing": "⏳ История заказов ещё загружается, цифры могут быть неполными.",
+                "stats_period_month": "За 30 дней",
+                "stats_games_title": "🎮 Выручка по играм (завершённые заказы)",
+                "stats_game_line": "• {game}: <code>{orders}</code> шт. | <code>{revenue} ₽</code>",
+                "stats_trend_title": "📈 Завершённые заказы за 30 дней (шт. / сумма)",
+                "stats_empty": "Нет данных.",
+                "btn_stats_games": "🎮 По играм",
+                "btn_stats_trend": "📈 30 дней",
                 "plugins_title": "🧩 Плагины",
 				"plugins_wip": "Пока в разработке\nХотите заказать плагин для бота?",
 				"btn_order_plugin": "💡 Заказать плагин",
@@ -137,6 +154,21 @@ class Translations:
 				"plugin_label_uuid": "uuid",
 				"plugin_label_version": "версия",
 				"plugin_label_creator": "создатель",
+				"plugin_label_load_ms": "загрузка",
+				"plugin_stats_calls": "вызовы: <b>{calls}</b> · ошибки: <b>{errors}</b> · таймауты: <b>{timeouts}</b>",
+				"plugin_stats_latency": "время обработки: в среднем <b>{avg}</b> мс · p50 <b>{p50}</b> мс · p95 <b>{p95}</b> мс · макс. <b>{max}</b> мс",
+				"plugin_stats_cpu": "процессорное время: <b>{cpu}</b> мс",
+				"plugin_stats_api": "запросы к Starvell: <b>{requests}</b> · из кэша: <b>{hits}</b>",
+				"plugin_jobs": "задачи по расписанию: <b>{count}</b> · запусков: <b>{runs}</b> · пропущено: <b>{skipped}</b>",
+				"plugin_profiling": "🔬 профилирование: {captured}/{limit}",
+				"btn_plugin_profile": "🔬 Профилировать",
+				"btn_plugin_profile_stop": "⏹ Остановить профилирование",
+				"btn_plugin_profile_report": "📄 Отчёт профилирования",
+				"plugin_profile_started": "Профилирование запущено: {calls} вызовов",
+				"plugin_profile_empty": "Отчёта пока нет",
+				"plugin_stats_last_error": "последняя ошибка: <code>{error}</code>",
+				"plugin_auto_disabled": "⚠️ Плагин выключен автоматически: {timeouts} таймаутов подряд",
+				"plugin_auto_disabled_short": "Выключен (таймауты)",
                 "restart_start": "Перезапуск…",
                 "restart_done": "Готово. Идёт полный перезапуск…",
                 "watermark_status_on": "Водяной знак включен: {text}",
@@ -176,6 +208,9 @@ class Translations:
                 "info_ram": "RAM: <code>{ram_mb} МБ</code>",
                 "info_size": "Размер проекта: <code>{size_mb} МБ</code>",
                 "info_ping": "Пинг: <code>{ping_ms} мс</code>",
+                "info_loop_lag": "Лаг цикла событий: p50 <code>{p50} мс</code> | p99 <code>{p99} мс</code> | макс <code>{max} мс</code>",
+                "info_chat_dedup": "Кэш сообщений: чатов <code>{chats}</code> | id <code>{ids}</code> | вытеснено <code>{evicted}</code>",
+                "loop_lag_alert": "🐢 Цикл событий бота был заблокирован на <code>{lag_ms} мс</code>\np50: <code>{p50} мс</code> | p99: <code>{p99} мс</code>",
                 "info_links_hint": "Полезные ссылки ниже:",
                 "ad_title": "⚡ Автовыдача",
                 "ad_add_prompt_name": "Введите название товара:",
@@ -258,6 +293,15 @@ class Translations:
                 "auth_fail": "❌ Authorization failed",
                 "bump_success": "📈 Bump successful: {title}",
                 "bump_fail": "⚠️ Bump failed: {title}",
+                "bump_digest_title": "📈 Bump report",
+                "bump_digest_summary": "Categories: ✅ <code>{ok}</code> | ⚠️ <code>{fail}</code>\nLots bumped: <code>{lots}</code>",
+                "bump_digest_game": "🎮 <b>{game}</b>",
+                "bump_digest_category": "{icon} {category} — lots: <code>{lots}</code>",
+                "bump_digest_lots_title": "📋 Lots in report",
+                "bump_digest_expired": "This bump report is no longer available",
+                "bump_digest_late": "⏱ Late: <code>{count}</code> (up to <code>{late_s}</code> s)",
+                "btn_bump_lots": "📋 Lots",
+                "btn_bump_summary": "📈 Summary",
                 "btn_open_link": "🔗 Open",
                 "btn_profile": "👤 Profile",
                 "btn_author": "👤 Author",
@@ -302,6 +346,14 @@ class Translations:
                 "stats_line_with_sums": "✅ Completed: <code>{completed}</code> (<code>{sum_completed}</code>) | ↩️ Refunds: <code>{refund}</code> (<code>{sum_refund}</code>) | 🛒 Created: <code>{created}</code> (<code>{sum_created}</code>)",
                 "stats_summary_net": "All-time earned: <code>{net} ₽</code>",
                 "stats_summary_waiting": "Pending: <code>{waiting} ₽</code>",
+                "stats_syncing": "⏳ Order history is still loading, numbers may be incomplete.",
+                "stats_period_month": "Last 30 days",
+                "stats_games_title": "🎮 Revenue by game (completed orders)",
+                "stats_game_line": "• {game}: <code>{orders}</code> pcs | <code>{revenue} ₽</code>",
+                "stats_trend_title": "📈 Completed orders over 30 days (count / total)",
+                "stats_empty": "No data.",
+                "btn_stats_games": "🎮 By game",
+                "btn_stats_trend": "📈 30 days",
                 "plugins_title": "🧩 Plugins",
 				"plugins_wip": "Work in progress\nWant to order a plugin for the bot?",
 				"btn_order_plugin": "💡 Order a plugin",
@@ -326,6 +378,21 @@ class Translations:
 				"plugin_label_uuid": "UUID",
 				"plugin_label_version": "Version",
 				"plugin_label_creator": "Creator",
+				"plugin_label_load_ms": "Load time",
+				"plugin_stats_calls": "calls: <b>{calls}</b> · errors: <b>{errors}</b> · timeouts: <b>{timeouts}</b>",
+				"plugin_stats_latency": "handling time: avg <b>{avg}</b> ms · p50 <b>{p50}</b> ms · p95 <b>{p95}</b> ms · max <b>{max}</b> ms",
+				"plugin_stats_cpu": "CPU time: <b>{cpu}</b> ms",
+				"plugin_stats_api": "Starvell requests: <b>{requests}</b> · from cache: <b>{hits}</b>",
+				"plugin_jobs": "scheduled jobs: <b>{count}</b> · runs: <b>{runs}</b> · skipped: <b>{skipped}</b>",
+				"plugin_profiling": "🔬 profiling: {captured}/{limit}",
+				"btn_plugin_profile": "🔬 Profile",
+				"btn_plugin_profile_stop": "⏹ Stop profiling",
+				"btn_plugin_profile_report": "📄 Profile report",
+				"plugin_profile_started": "Profiling started: {calls} calls",
+				"plugin_profile_empty": "No report yet",
+				"plugin_stats_last_error": "last error: <code>{error}</code>",
+				"plugin_auto_disabled": "⚠️ Plugin was disabled automatically: {timeouts} timeouts in a row",
+				"plugin_auto_disabled_short": "Disabled (timeouts)",
                 "restart_start": "Restarting…",
                 "restart_done": "Done. Full restart in progress…",
                 "watermark_status_on": "Watermark is ON: {text}",
@@ -365,6 +432,9 @@ class Translations:
                 "info_ram": "RAM: <code>{ram_mb} MB</code>",
                 "info_size": "Project size: <code>{size_mb} MB</code>",
                 "info_ping": "Ping: <code>{ping_ms} ms</code>",
+                "info_loop_lag": "Event loop lag: p50 <code>{p50} ms</code> | p99 <code>{p99} ms</code> | max <code>{max} ms</code>",
+                "info_chat_dedup": "Message dedup cache: chats <code>{chats}</code> | ids <code>{ids}</code> | evicted <code>{evicted}</code>",
+                "loop_lag_alert": "🐢 The bot event loop was blocked for <code>{lag_ms} ms</code>\np50: <code>{p50} ms</code> | p99: <code>{p99} ms</code>",
                 "info_links_hint": "Useful links below:",
                 "ad_title": "⚡ Autodelivery",
                 "ad_add_prompt_name": "Enter product name:",
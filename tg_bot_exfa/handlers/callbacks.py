@@ -2,16 +2,15 @@ import html
 import logging
 import math
 import io
+import time
 
 from aiogram import Router, F
 from aiogram.fsm.context import FSMContext
-from aiogram.types import CallbackQuery, Message, InlineKeyboardButton, InlineKeyboardMarkup
+from aiogram.types import CallbackQuery, Message, InlineKeyboardButton, InlineKeyboardMarkup, LinkPreviewOptions
 from aiogram.exceptions import TelegramBadRequest
 
 import tg_bot_exfa.app as app
-from api.auth import fetch_homepage_data
-from api.find_lots_user import find_user_lots
-from api.orders import refund_order, fetch_sells_all
+from api.orders import refund_order
 from api.send_message import send_chat_message, send_chat_image
 from tg_bot_exfa.exf_langue.strings import Translations
 from tg_bot_exfa.keyboards.menus import Keyboards
@@ -21,7 +20,11 @@ from tg_bot_exfa.states.templates import TemplatesFlow
 from tg_bot_exfa.states.orders import OrderRefund
 from tg_bot_exfa.states.autodelivery import AutodeliveryFlow
 from tg_bot_exfa.monitor import load_config as load_osnova_config
-from tg_bot_exfa.config import save_config
+from tg_bot_exfa.config import save_config, config_service
+from tg_bot_exfa.notify import render_bump_digest
+from tg_bot_exfa.utils import github
+from tg_bot_exfa import order_history
+from tg_bot_exfa.session_context import session_context
 
 
 router = Router()
@@ -116,24 +119,8 @@ async def _send_reply_from_state(
     session_cookie = session_cfg.get("SESSION_COOKIE", "")
     if not session_cookie:
         return False, "SESSION_COOKIE missing", chat_id
-    sid_cookie = None
-    my_games_cookie = None
-    try:
-        auth = await fetch_homepage_data(session_cookie)
-        sid_cookie = (auth or {}).get("sid")
-        my_games_cookie = (auth or {}).get("my_games")
-        if not my_games_cookie:
-            uid = ((auth or {}).get("user") or {}).get("id")
-            try:
-                uid_int = int(uid)
-            except Exception:
-                uid_int = None
-            if uid_int:
-                lots_data = await find_user_lots(session_cookie, sid_cookie or "", uid_int)
-                my_games_cookie = (lots_data or {}).get("my_games") or my_games_cookie
-    except Exception:
-        sid_cookie = None
-        my_games_cookie = None
+    snap = await session_context.ensure(session_cookie)
+    my_games_cookie = snap.my_games if snap else None
     try:
         cfg = app.app_context.config
         if getattr(cfg, "watermark_on", True):
@@ -144,6 +131,8 @@ async def _send_reply_from_state(
     try:
         await send_chat_message(session_cookie, chat_id, content, my_games_cookie=my_games_cookie)
     except Exception as exc:
+        if getattr(exc, "status", None) in (401, 403):
+            session_context.invalidate()
         return False, str(exc), chat_id
     notification_chat_id = data.get("notification_chat_id") or default_chat_id
     notification_message_id = data.get("notification_message_id") or default_message_id
@@ -221,24 +210,9 @@ async def _send_reply_image_from_state(
     session_cookie = session_cfg.get("SESSION_COOKIE", "")
     if not session_cookie:
         return False, "SESSION_COOKIE missing", chat_id
-    sid_cookie = None
-    my_games_cookie = None
-    try:
-        auth = await fetch_homepage_data(session_cookie)
-        sid_cookie = (auth or {}).get("sid")
-        my_games_cookie = (auth or {}).get("my_games")
-        if not my_games_cookie:
-            uid = ((auth or {}).get("user") or {}).get("id")
-            try:
-                uid_int = int(uid)
-            except Exception:
-                uid_int = None
-            if uid_int:
-                lots_data = await find_user_lots(session_cookie, sid_cookie or "", uid_int)
-                my_games_cookie = (lots_data or {}).get("my_games") or my_games_cookie
-    except Exception:
-        sid_cookie = None
-        my_games_cookie = None
+    snap = await session_context.ensure(session_cookie)
+    sid_cookie = snap.sid if snap else None
+    my_games_cookie = snap.my_games if snap else None
     try:
         cfg = app.app_context.config
         if caption and getattr(cfg, "watermark_on", True):
@@ -258,6 +232,8 @@ async def _send_reply_image_from_state(
             my_games_cookie=my_games_cookie,
         )
     except Exception as exc:
+        if getattr(exc, "status", None) in (401, 403):
+            session_context.invalidate()
         return False, str(exc), chat_id
     notification_chat_id = data.get("notification_chat_id") or default_chat_id
     notification_message_id = data.get("notification_message_id") or default_message_id
@@ -351,10 +327,15 @@ async def _show_templates_list(callback: CallbackQuery, lang: str, page_index: i
     return total, total_pages
 
 
+def _fmt_rub(value_int: int) -> str:
+    try:
+        return f"{(value_int or 0)/100:.2f}"
+    except Exception:
+        return "0.00"
+
+
 @router.callback_query(F.data == "menu:stats")
 async def open_stats(callback: CallbackQuery):
-    from datetime import datetime, timedelta, timezone
-
     db = app.app_context.db
     cfg = app.app_context.config
     user = await db.get_user(callback.from_user.id)
@@ -364,19 +345,17 @@ async def open_stats(callback: CallbackQuery):
     except Exception:
         pass
     try:
-        await callback.message.edit_text(tr.t(lang, "stats_loading"))
-    except Exception:
-        pass
-    try:
-        session_cfg = load_osnova_config()
-        session_cookie = session_cfg.get("SESSION_COOKIE", "")
-        if not session_cookie:
-            try:
-                await callback.message.edit_text(tr.t(lang, "session_change_failed", error="SESSION_COOKIE missing"))
-            except Exception:
-                pass
-            return
-        orders = await fetch_sells_all(session_cookie)
+        now = int(time.time())
+        periods = {"day": now - 86400, "week": now - 7 * 86400, "all": 0}
+        counts: dict[str, dict[str, int]] = {k: {"COMPLETED": 0, "REFUND": 0, "CREATED": 0} for k in periods.keys()}
+        sums: dict[str, dict[str, int]] = {k: {"COMPLETED": 0, "REFUND": 0, "CREATED": 0} for k in periods.keys()}
+        for key, since in periods.items():
+            totals = await db.sales_totals(since, "d" if since == 0 else "h")
+            for status, (cnt, total) in totals.items():
+                if status in counts[key]:
+                    counts[key][status] = cnt
+                    sums[key][status] = total
+        backfilled = await order_history.is_backfilled(db)
     except Exception as exc:
         try:
             await callback.message.edit_text(tr.t(lang, "reply_failed", error=str(exc)))
@@ -384,52 +363,6 @@ async def open_stats(callback: CallbackQuery):
             pass
         return
 
-    now = datetime.now(timezone.utc)
-
-    def parse_dt(ts: str | None) -> datetime | None:
-        if not ts:
-            return None
-        try:
-            if ts.endswith("Z"):
-                return datetime.fromisoformat(ts.replace("Z", "+00:00")).astimezone(timezone.utc)
-            return datetime.fromisoformat(ts).astimezone(timezone.utc)
-        except Exception:
-            return None
-
-    periods = {
-        "day": now - timedelta(days=1),
-        "week": now - timedelta(days=7),
-        "all": datetime.min.replace(tzinfo=timezone.utc),
-    }
-
-    counts: dict[str, dict[str, int]] = {k: {"COMPLETED": 0, "REFUND": 0, "CREATED": 0} for k in periods.keys()}
-    sums: dict[str, dict[str, int]] = {k: {"COMPLETED": 0, "REFUND": 0, "CREATED": 0} for k in periods.keys()}
-
-    for order in orders:
-        status = (order or {}).get("status") or ""
-        created_at = parse_dt((order or {}).get("createdAt"))
-        price_raw = (order or {}).get("totalPrice") or (order or {}).get("basePrice") or 0
-        try:
-            price_val = int(price_raw)
-        except Exception:
-            try:
-                price_val = int(float(price_raw))
-            except Exception:
-                price_val = 0
-        if created_at is None:
-            continue
-        for key, since in periods.items():
-            if created_at >= since:
-                if status in counts[key]:
-                    counts[key][status] += 1
-                    sums[key][status] += price_val
-
-    def fmt_rub(value_int: int) -> str:
-        try:
-            return f"{(value_int or 0)/100:.2f}"
-        except Exception:
-            return "0.00"
-
     lines: list[str] = [tr.t(lang, "stats_title")]
     lines.append("")
     lines.append(f"<b>{tr.t(lang, 'stats_period_day')}:</b>")
@@ -439,9 +372,9 @@ async def open_stats(callback: CallbackQuery):
         completed=counts["day"]["COMPLETED"],
         refund=counts["day"]["REFUND"],
         created=counts["day"]["CREATED"],
-        sum_completed=fmt_rub(sums["day"]["COMPLETED"]),
-        sum_refund=fmt_rub(sums["day"]["REFUND"]),
-        sum_created=fmt_rub(sums["day"]["CREATED"]),
+        sum_completed=_fmt_rub(sums["day"]["COMPLETED"]),
+        sum_refund=_fmt_rub(sums["day"]["REFUND"]),
+        sum_created=_fmt_rub(sums["day"]["CREATED"]),
     ))
     lines.append("")
     lines.append(f"<b>{tr.t(lang, 'stats_period_week')}:</b>")
@@ -451,9 +384,9 @@ async def open_stats(callback: CallbackQuery):
         completed=counts["week"]["COMPLETED"],
         refund=counts["week"]["REFUND"],
         created=counts["week"]["CREATED"],
-        sum_completed=fmt_rub(sums["week"]["COMPLETED"]),
-        sum_refund=fmt_rub(sums["week"]["REFUND"]),
-        sum_created=fmt_rub(sums["week"]["CREATED"]),
+        sum_completed=_fmt_rub(sums["week"]["COMPLETED"]),
+        sum_refund=_fmt_rub(sums["week"]["REFUND"]),
+        sum_created=_fmt_rub(sums["week"]["CREATED"]),
     ))
     lines.append("")
     lines.append(f"<b>{tr.t(lang, 'stats_period_all')}:</b>")
@@ -463,24 +396,88 @@ async def open_stats(callback: CallbackQuery):
         completed=counts["all"]["COMPLETED"],
         refund=counts["all"]["REFUND"],
         created=counts["all"]["CREATED"],
-        sum_completed=fmt_rub(sums["all"]["COMPLETED"]),
-        sum_refund=fmt_rub(sums["all"]["REFUND"]),
-        sum_created=fmt_rub(sums["all"]["CREATED"]),
+        sum_completed=_fmt_rub(sums["all"]["COMPLETED"]),
+        sum_refund=_fmt_rub(sums["all"]["REFUND"]),
+        sum_created=_fmt_rub(sums["all"]["CREATED"]),
     ))
 
-    net_all = fmt_rub(sums["all"]["COMPLETED"] - sums["all"]["REFUND"]) 
-    waiting_all = fmt_rub(sums["all"]["CREATED"])
+    net_all = _fmt_rub(sums["all"]["COMPLETED"] - sums["all"]["REFUND"])
+    waiting_all = _fmt_rub(sums["all"]["CREATED"])
     lines.append("")
     lines.append(tr.t(lang, "stats_summary_net", net=net_all))
     lines.append(tr.t(lang, "stats_summary_waiting", waiting=waiting_all))
+    if not backfilled:
+        lines.append("")
+        lines.append(tr.t(lang, "stats_syncing"))
 
     text = "\n".join(lines)
-    markup = InlineKeyboardMarkup(inline_keyboard=[[InlineKeyboardButton(text=tr.t(lang, "btn_back"), callback_data="back:main")]])
+    markup = kb.stats_menu(lambda k: tr.t(lang, k)).as_markup()
     try:
         await callback.message.edit_text(text, reply_markup=markup)
     except Exception as exc:
         log.warning("stats_edit_failed user_id=%s error=%s", callback.from_user.id, exc)
 
+
+@router.callback_query(F.data == "stats:games")
+async def open_stats_games(callback: CallbackQuery):
+    db = app.app_context.db
+    cfg = app.app_context.config
+    user = await db.get_user(callback.from_user.id)
+    lang = await _lang_of(user, cfg)
+    try:
+        await callback.answer()
+    except Exception:
+        pass
+    lines: list[str] = [tr.t(lang, "stats_games_title")]
+    try:
+        for label, since in (("stats_period_month", int(time.time()) - 30 * 86400), ("stats_period_all", 0)):
+            lines.append("")
+            lines.append(f"<b>{tr.t(lang, label)}:</b>")
+            games = await db.sales_by_game(since)
+            if not games:
+                lines.append(tr.t(lang, "stats_empty"))
+            for g in games:
+                name = html.escape(str(g.get("game_name") or g.get("game_id") or "-"))
+                lines.append(tr.t(lang, "stats_game_line", game=name, orders=g["orders"], revenue=_fmt_rub(g["revenue"])))
+    except Exception as exc:
+        lines = [tr.t(lang, "reply_failed", error=str(exc))]
+    try:
+        await callback.message.edit_text("\n".join(lines), reply_markup=kb.stats_view(lambda k: tr.t(lang, k)).as_markup())
+    except Exception as exc:
+        log.warning("stats_edit_failed user_id=%s error=%s", callback.from_user.id, exc)
+
+
+@router.callback_query(F.data == "stats:trend")
+async def open_stats_trend(callback: CallbackQuery):
+    from datetime import datetime, timezone
+
+    db = app.app_context.db
+    cfg = app.app_context.config
+    user = await db.get_user(callback.from_user.id)
+    lang = await _lang_of(user, cfg)
+    try:
+        await callback.answer()
+    except Exception:
+        pass
+    lines: list[str] = [tr.t(lang, "stats_trend_title"), ""]
+    try:
+        today = db.sales_bucket(int(time.time()), "d")
+        since = today - 29 * 86400
+        daily = await db.sales_daily(since)
+        peak = max([total for _, total in daily.values()] or [0])
+        for i in range(30):
+            bucket = since + i * 86400
+            cnt, total = daily.get(bucket, (0, 0))
+            bar = "▇" * (round(total / peak * 10) if peak > 0 else 0)
+            day = datetime.fromtimestamp(bucket + db.sales_tz_offset, timezone.utc).strftime("%d.%m")
+            lines.append(f"<code>{day}</code> {bar} {cnt} / {_fmt_rub(total)} ₽")
+    except Exception as exc:
+        lines = [tr.t(lang, "reply_failed", error=str(exc))]
+    try:
+        await callback.message.edit_text("\n".join(lines), reply_markup=kb.stats_view(lambda k: tr.t(lang, k)).as_markup())
+    except Exception as exc:
+        log.warning("stats_edit_failed user_id=%s error=%s", callback.from_user.id, exc)
+
 async def _show_templates_delete(callback: CallbackQuery, lang: str, page_index: int) -> tuple[int, int]:
     db = app.app_context.db
     total = await db.count_templates()
@@ -977,9 +974,6 @@ async def cancel_change(callback: CallbackQuery, state: FSMContext):
 
 @router.message(StartFlow.changing_session, F.text)
 async def on_change_session(message: Message, state: FSMContext):
-    import json
-    from pathlib import Path
-
     db = app.app_context.db
     cfg = app.app_context.config
     user = await db.get_user(message.from_user.id)
@@ -997,12 +991,8 @@ async def on_change_session(message: Message, state: FSMContext):
         await state.clear()
         return
     try:
-        cfg_path = Path("config/osnova.json")
-        obj = {}
-        if cfg_path.exists():
-            obj = json.loads(cfg_path.read_text(encoding="utf-8") or "{}")
-        obj["SESSION_COOKIE"] = new_session
-        cfg_path.write_text(json.dumps(obj, ensure_ascii=False, indent=4), encoding="utf-8")
+        config_service.update({"SESSION_COOKIE": new_session})
+        session_context.invalidate()
     except Exception as exc:
         await message.bot.edit_message_text(
             tr.t(lang, "session_change_failed", error=str(exc)),
@@ -1619,18 +1609,9 @@ async def open_info(callback: CallbackQuery):
 
     latest = "—"
     try:
-        import requests 
-        r = requests.get(
-            "https://api.github.com/repos/exfador/starvell_api/tags?page=1",
-            headers={"accept": "application/vnd.github+json", "X-GitHub-Api-Version": "2022-11-28"},
-            timeout=5,
-        )
-        if r.status_code == 200:
-            for it in (r.json() or []):
-                name = str((it or {}).get("name") or "").strip()
-                if name and name.lower() != "api":
-                    latest = name
-                    break
+        tag_item = await github.fetch_latest_tag()
+        if tag_item:
+            latest = str(tag_item.get("name") or "").strip() or "—"
     except Exception:
         latest = "—"
 
@@ -1656,6 +1637,13 @@ async def open_info(callback: CallbackQuery):
     lines.append(tr.t(lang, "info_ram", ram_mb=f"{ram_mb:.1f}"))
     lines.append(tr.t(lang, "info_size", size_mb=f"{size_mb:.1f}"))
     lines.append(tr.t(lang, "info_ping", ping_ms=ping_ms))
+    loop_health = getattr(app.app_context, "loop_health", None)
+    if loop_health is not None:
+        lag = loop_health.percentiles()
+        lines.append(tr.t(lang, "info_loop_lag", p50=f"{lag['p50']:.1f}", p99=f"{lag['p99']:.1f}", max=f"{lag['max']:.0f}"))
+    seen_messages = getattr(app.app_context, "seen_messages", None)
+    if seen_messages is not None:
+        lines.append(tr.t(lang, "info_chat_dedup", **seen_messages.stats()))
     lines.append("")
     lines.append(tr.t(lang, "info_links_hint"))
     text = "\n".join(lines)
@@ -2265,6 +2253,33 @@ async def back_main(callback: CallbackQuery, state: FSMContext):
 
 
 
+@router.callback_query(F.data.startswith("bumpd:"))
+async def bump_digest_page(callback: CallbackQuery):
+    db = app.app_context.db
+    cfg = app.app_context.config
+    user = await db.get_user(callback.from_user.id)
+    lang = await _lang_of(user, cfg)
+    parts = (callback.data or "").split(":")
+    try:
+        view = parts[1]
+        report_id = int(parts[2])
+        page = int(parts[3]) if len(parts) > 3 else 1
+    except Exception:
+        await callback.answer()
+        return
+    report = await db.get_bump_report(report_id)
+    if not report:
+        await callback.answer(tr.t(lang, "bump_digest_expired"), show_alert=True)
+        return
+    text, page, total_pages = render_bump_digest(report, lang, view, page)
+    markup = kb.bump_digest(lambda k: tr.t(lang, k), report_id, view, page, total_pages).as_markup()
+    try:
+        await callback.message.edit_text(text, reply_markup=markup, link_preview_options=LinkPreviewOptions(is_disabled=True))
+    except Exception as exc:
+        log.warning("bump_digest_edit_failed user_id=%s error=%s", callback.from_user.id, exc)
+    await callback.answer()
+
+
 @router.callback_query(F.data.startswith("update:install:"))
 async def install_update(callback: CallbackQuery):
     import asyncio
@@ -2291,17 +2306,10 @@ async def install_update(callback: CallbackQuery):
         pass
     zip_url = None
     try:
-        import requests
-        r = requests.get(
-            "https://api.github.com/repos/exfador/starvell_api/tags?page=1",
-            headers={"accept": "application/vnd.github+json", "X-GitHub-Api-Version": "2022-11-28"},
-            timeout=10,
-        )
-        if r.status_code == 200:
-            for it in r.json() or []:
-                if str((it or {}).get("name") or "").strip() == tag_name:
-                    zip_url = str((it or {}).get("zipball_url") or "").strip()
-                    break
+        for it in await github.fetch_tags():
+            if str((it or {}).get("name") or "").strip() == tag_name:
+                zip_url = str((it or {}).get("zipball_url") or "").strip()
+                break
     except Exception:
         zip_url = None
     if not zip_url:
@@ -3,13 +3,23 @@ from aiogram.types import Message, CallbackQuery
 from aiogram.fsm.context import FSMContext
 
 import tg_bot_exfa.app as app
-from tg_bot_exfa.monitor import load_config as load_osnova_config
-from tg_bot_exfa.plugins import PluginContext
 
 
 router = Router()
 
 
+def _plugin_callback(callback: CallbackQuery) -> bool:
+    pm = app.app_context.plugin_manager if app.app_context else None
+    return bool(pm and pm.wants_callback(callback.data))
+
+
+async def _plugin_state(message: Message, state: FSMContext) -> bool:
+    pm = app.app_context.plugin_manager if app.app_context else None
+    if not pm:
+        return False
+    return pm.wants_state(await state.get_state())
+
+
 @router.message(F.text.startswith("/"))
 async def handle_plugin_command(message: Message):
     pm = app.app_context.plugin_manager if app.app_context else None
@@ -29,17 +39,11 @@ async def handle_plugin_command(message: Message):
     args = parts[1:]
     if cmd not in pm.commands:
         return
-    cfg = {}
-    try:
-        cfg = load_osnova_config() or {}
-    except Exception:
-        cfg = {}
-    ctx = PluginContext(session_cookie=(cfg or {}).get("SESSION_COOKIE", ""), db=db, config=cfg or {})
-    await pm.dispatch_command(cmd, message, args, ctx)
+    await pm.dispatch_command(cmd, message, args)
 
 
-@router.callback_query(F.data.startswith("stars:"))
-async def handle_stars_callback(callback: CallbackQuery, state: FSMContext):
+@router.callback_query(_plugin_callback)
+async def handle_plugin_callback(callback: CallbackQuery, state: FSMContext):
     pm = app.app_context.plugin_manager if app.app_context else None
     if not pm:
         return
@@ -49,16 +53,10 @@ async def handle_stars_callback(callback: CallbackQuery, state: FSMContext):
     user = await db.get_user(callback.from_user.id)
     if not user.get("authorized"):
         return
-    cfg = {}
-    try:
-        cfg = load_osnova_config() or {}
-    except Exception:
-        cfg = {}
-    ctx = PluginContext(session_cookie=(cfg or {}).get("SESSION_COOKIE", ""), db=db, config=cfg or {})
-    await pm.dispatch_callback(callback, state, ctx)
+    await pm.dispatch_callback(callback, state)
 
 
-@router.message(F.text)
+@router.message(F.text, _plugin_state)
 async def handle_plugin_message(message: Message, state: FSMContext):
     pm = app.app_context.plugin_manager if app.app_context else None
     if not pm:
@@ -66,21 +64,9 @@ async def handle_plugin_message(message: Message, state: FSMContext):
     db = app.app_context.db if app.app_context else None
     if not db:
         return
-    current_state = await state.get_state()
-    if not current_state:
-        return
-    state_name = str(current_state)
-    if not (state_name.startswith("StarsState") or state_name.startswith("GiftStarsState")):
-        return
     user = await db.get_user(message.from_user.id)
     if not user.get("authorized"):
         return
-    cfg = {}
-    try:
-        cfg = load_osnova_config() or {}
-    except Exception:
-        cfg = {}
-    ctx = PluginContext(session_cookie=(cfg or {}).get("SESSION_COOKIE", ""), db=db, config=cfg or {})
-    await pm.dispatch_message(message, state, ctx)
+    await pm.dispatch_message(message, state)
 
 
@@ -1,4 +1,5 @@
 import os
+import html
 import asyncio
 from aiogram import Router, F
 from aiogram.fsm.context import FSMContext
@@ -10,7 +11,6 @@ import tg_bot_exfa.app as app
 from tg_bot_exfa.exf_langue.strings import Translations
 from tg_bot_exfa.keyboards.menus import Keyboards
 from tg_bot_exfa.states.plugins import PluginsFlow
-from tg_bot_exfa.plugins import PluginContext
 
 
 router = Router()
@@ -79,13 +79,7 @@ async def handle_plugin_upload(message: Message, state: FSMContext):
 		pm = app.app_context.plugin_manager
 		meta = pm.load_one(dest_path)
 		pm.enable(meta.uuid)
-		try:
-			from tg_bot_exfa.monitor import load_config as load_osnova_config
-			cfg2 = load_osnova_config()
-		except Exception:
-			cfg2 = {}
-		ctx = PluginContext(session_cookie=(cfg2 or {}).get("SESSION_COOKIE", ""), db=app.app_context.db, config=cfg2 or {})
-		await pm.dispatch_init(ctx)
+		await pm.dispatch_init()
 		try:
 			base_cmds = [
 				BotCommand(command="start", description="Запуск"),
@@ -147,6 +141,8 @@ async def list_plugins(callback: CallbackQuery, state: FSMContext):
 		status = tr.t(lang, "plugin_enabled") if meta.enabled else tr.t(lang, "plugin_disabled")
 		if meta.module is None and meta.load_error:
 			status = tr.t(lang, "plugin_load_failed")
+		elif meta.auto_disabled:
+			status = tr.t(lang, "plugin_auto_disabled_short")
 		items_all.append((meta.uuid, f"{meta.name} v{meta.version} — {status}"))
 	total = len(items_all)
 	PAGE_SIZE = 8
@@ -207,14 +203,59 @@ async def plugin_item(callback: CallbackQuery, state: FSMContext):
 		builder.button(text=tr.t(lang, "btn_plugin_disable"), callback_data=f"plugins:toggle:{uuid}")
 	else:
 		builder.button(text=tr.t(lang, "btn_plugin_enable"), callback_data=f"plugins:toggle:{uuid}")
+	profiling = pm.profiling if pm.profiling is not None and pm.profiling.uuid == uuid else None
+	if profiling:
+		builder.button(text=tr.t(lang, "btn_plugin_profile_stop"), callback_data=f"plugins:profile:{uuid}")
+	elif meta.enabled:
+		builder.button(text=tr.t(lang, "btn_plugin_profile"), callback_data=f"plugins:profile:{uuid}")
+	if uuid in pm.profile_reports:
+		builder.button(text=tr.t(lang, "btn_plugin_profile_report"), callback_data=f"plugins:report:{uuid}")
 	builder.button(text=tr.t(lang, "btn_plugin_remove"), callback_data=f"plugins:remove:{uuid}")
 	builder.button(text=tr.t(lang, "btn_back"), callback_data="plugins:list")
-	builder.adjust(1, 1, 1)
+	builder.adjust(1)
 	lines = []
 	lines.append(f"{tr.t(lang, 'plugin_label_name')}: <code>{meta.name}</code>")
 	lines.append(f"{tr.t(lang, 'plugin_label_uuid')}: <code>{meta.uuid}</code>")
 	lines.append(f"{tr.t(lang, 'plugin_label_version')}: <code>{meta.version}</code>")
 	lines.append(f"{tr.t(lang, 'plugin_label_creator')}: <code>{meta.credits or '-'}</code>")
+	if meta.load_ms is not None:
+		lines.append(f"{tr.t(lang, 'plugin_label_load_ms')}: <code>{meta.load_ms:.0f} ms</code>")
+	stats = pm.stats.get(uuid)
+	if stats and stats.calls:
+		lines.append("")
+		lines.append(tr.t(lang, "plugin_stats_calls", calls=stats.calls, errors=stats.errors, timeouts=stats.timeouts))
+		lines.append(
+			tr.t(
+				lang,
+				"plugin_stats_latency",
+				avg=f"{stats.avg_ms:.0f}",
+				p50=f"{stats.p50_ms:.0f}",
+				p95=f"{stats.p95_ms:.0f}",
+				max=f"{stats.max_ms:.0f}",
+			)
+		)
+		if stats.cpu_ms:
+			lines.append(tr.t(lang, "plugin_stats_cpu", cpu=f"{stats.cpu_ms:.0f}"))
+		requests, hits = pm.api_usage(uuid)
+		if requests or hits:
+			lines.append(tr.t(lang, "plugin_stats_api", requests=requests, hits=hits))
+		if stats.last_error:
+			lines.append(tr.t(lang, "plugin_stats_last_error", error=html.escape(stats.last_error[:200])))
+	jobs = pm.scheduler.jobs.get(uuid) or []
+	if jobs:
+		lines.append(
+			tr.t(
+				lang,
+				"plugin_jobs",
+				count=len(jobs),
+				runs=sum(j.runs for j in jobs),
+				skipped=sum(j.skipped for j in jobs),
+			)
+		)
+	if meta.auto_disabled:
+		lines.append(tr.t(lang, "plugin_auto_disabled", timeouts=stats.consecutive_timeouts if stats else 0))
+	if profiling:
+		lines.append(tr.t(lang, "plugin_profiling", captured=profiling.captured, limit=profiling.limit))
 	desc = (meta.description or "").strip()
 	text = "\n".join(lines) + ("\n\n" + desc if desc else "")
 	await callback.message.edit_text(text, reply_markup=builder.as_markup())
@@ -235,7 +276,10 @@ async def plugin_toggle(callback: CallbackQuery, state: FSMContext):
 		pm.disable(uuid)
 		await callback.message.edit_text(tr.t(lang, "plugin_toggled_off"))
 	else:
+		was_deferred = meta.deferred
 		pm.enable(uuid)
+		if was_deferred:
+			await pm.init_plugin(uuid)
 		await callback.message.edit_text(tr.t(lang, "plugin_toggled_on"))
 	try:
 		base_cmds = [
@@ -290,3 +334,38 @@ async def plugin_remove(callback: CallbackQuery, state: FSMContext):
 	await list_plugins(callback, state)
 
 
+@router.callback_query(F.data.startswith("plugins:profile:"))
+async def plugin_profile(callback: CallbackQuery, state: FSMContext):
+	cfg = app.app_context.config
+	user = await app.app_context.db.get_user(callback.from_user.id)
+	lang = user.get("language") or cfg.default_language
+	uuid = callback.data.split(":")[-1]
+	pm = app.app_context.plugin_manager
+	if uuid not in pm.plugins:
+		await list_plugins(callback, state)
+		return
+	if pm.profiling is not None and pm.profiling.uuid == uuid:
+		pm.stop_profile()
+	else:
+		capture = pm.start_profile(uuid)
+		try:
+			await callback.answer(tr.t(lang, "plugin_profile_started", calls=capture.limit))
+		except Exception:
+			pass
+	await plugin_item(callback, state)
+
+
+@router.callback_query(F.data.startswith("plugins:report:"))
+async def plugin_profile_report(callback: CallbackQuery, state: FSMContext):
+	cfg = app.app_context.config
+	user = await app.app_context.db.get_user(callback.from_user.id)
+	lang = user.get("language") or cfg.default_language
+	uuid = callback.data.split(":")[-1]
+	pm = app.app_context.plugin_manager
+	report = pm.profile_reports.get(uuid)
+	builder = InlineKeyboardBuilder()
+	builder.button(text=tr.t(lang, "btn_back"), callback_data=f"plugins:item:{uuid}")
+	if not report:
+		await callback.message.edit_text(tr.t(lang, "plugin_profile_empty"), reply_markup=builder.as_markup())
+		return
+	await callback.message.edit_text(f"<pre>{html.escape(report[:3800])}</pre>", reply_markup=builder.as_markup())
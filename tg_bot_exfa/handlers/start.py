@@ -13,6 +13,7 @@ from tg_bot_exfa.keyboards.menus import Keyboards
 from tg_bot_exfa.states.auth import StartFlow
 from tg_bot_exfa.config import save_config
 from tg_bot_exfa.notify import send_security_auth_success, send_security_auth_blocked
+from tg_bot_exfa.utils import github
 
 
 router = Router()
@@ -155,7 +156,6 @@ async def on_change_password(message: Message, state: FSMContext):
 
 @router.message(Command("update"))
 async def cmd_update(message: Message):
-    import requests
     from version import VERSION
     db = app.app_context.db
     cfg = app.app_context.config
@@ -165,17 +165,9 @@ async def cmd_update(message: Message):
     lang = user.get("language") or cfg.default_language
     latest = None
     try:
-        r = requests.get(
-            "https://api.github.com/repos/exfador/starvell_api/tags?page=1",
-            headers={"accept": "application/vnd.github+json", "X-GitHub-Api-Version": "2022-11-28"},
-            timeout=10,
-        )
-        if r.status_code == 200:
-            for it in (r.json() or []):
-                name = str((it or {}).get("name") or "").strip()
-                if name and name.lower() != "api":
-                    latest = name
-                    break
+        tag_item = await github.fetch_latest_tag()
+        if tag_item:
+            latest = str(tag_item.get("name") or "").strip() or None
     except Exception:
         latest = None
     lines = [tr.t(lang, "update_title"), tr.t(lang, "update_current", current=VERSION)]
@@ -191,6 +191,40 @@ class Keyboards:
             b.adjust(1)
         return b
 
+    def bump_digest(self, t, report_id: int, view: str, page: int, total_pages: int) -> InlineKeyboardBuilder:
+        b = InlineKeyboardBuilder()
+        sizes: list[int] = []
+        if total_pages > 1:
+            nav = 0
+            if page > 1:
+                b.button(text=t("btn_prev_page"), callback_data=f"bumpd:{view}:{report_id}:{page - 1}")
+                nav += 1
+            if page < total_pages:
+                b.button(text=t("btn_next_page"), callback_data=f"bumpd:{view}:{report_id}:{page + 1}")
+                nav += 1
+            if nav:
+                sizes.append(nav)
+        if view == "lots":
+            b.button(text=t("btn_bump_summary"), callback_data=f"bumpd:sum:{report_id}:1")
+        else:
+            b.button(text=t("btn_bump_lots"), callback_data=f"bumpd:lots:{report_id}:1")
+        sizes.append(1)
+        b.adjust(*sizes)
+        return b
+
+    def stats_menu(self, t) -> InlineKeyboardBuilder:
+        b = InlineKeyboardBuilder()
+        b.button(text=t("btn_stats_games"), callback_data="stats:games")
+        b.button(text=t("btn_stats_trend"), callback_data="stats:trend")
+        b.button(text=t("btn_back"), callback_data="back:main")
+        b.adjust(2, 1)
+        return b
+
+    def stats_view(self, t) -> InlineKeyboardBuilder:
+        b = InlineKeyboardBuilder()
+        b.button(text=t("btn_back"), callback_data="menu:stats")
+        return b
+
     def plugins_menu(self, t) -> InlineKeyboardBuilder:
         b = InlineKeyboardBuilder()
         b.button(text=t("btn_plugins_add"), callback_data="plugins:add")
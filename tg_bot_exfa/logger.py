@@ -1,9 +1,15 @@
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
 import sys
 from datetime import datetime
 
 
+_listener: logging.handlers.QueueListener | None = None
+
+
 class _ColorFormatter(logging.Formatter):
     COLORS = {
         "RESET": "\033[0m",
@@ -22,6 +28,7 @@ class _ColorFormatter(logging.Formatter):
 
     def format(self, record: logging.LogRecord) -> str:
         if self.enable_color:
+            record = logging.makeLogRecord(record.__dict__)
             color = self._color_for(record)
             record.levelname = f"{color}{record.levelname}{self.COLORS['RESET']}"
             record.name = f"{self.COLORS['BLUE']}{record.name}{self.COLORS['RESET']}"
@@ -51,16 +58,78 @@ def _supports_color() -> bool:
         return False
 
 
+class _RecordQueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class _BatchingQueueListener(logging.handlers.QueueListener):
+    def __init__(self, q: queue.Queue, *handlers: logging.Handler, batch_size: int = 256):
+        super().__init__(q, *handlers, respect_handler_level=True)
+        self.batch_size = max(1, int(batch_size))
+
+    def _flush_handlers(self) -> None:
+        for handler in self.handlers:
+            try:
+                handler.flush()
+            except Exception:
+                pass
+
+    def _monitor(self) -> None:
+        q = self.queue
+        has_task_done = hasattr(q, "task_done")
+        while True:
+            record = self.dequeue(True)
+            batch = [record]
+            while len(batch) < self.batch_size and record is not self._sentinel:
+                try:
+                    record = q.get_nowait()
+                except queue.Empty:
+                    break
+                batch.append(record)
+            stop = False
+            for item in batch:
+                if item is self._sentinel:
+                    stop = True
+                else:
+                    self.handle(item)
+                if has_task_done:
+                    q.task_done()
+            self._flush_handlers()
+            if stop:
+                break
+
+
+def stop_logging() -> None:
+    global _listener
+    listener = _listener
+    _listener = None
+    if listener is None:
+        return
+    try:
+        listener.stop()
+    except Exception:
+        pass
+    for handler in listener.handlers:
+        try:
+            handler.close()
+        except Exception:
+            pass
+
+
 def setup_logging(level: int = logging.INFO) -> logging.Logger:
+    global _listener
+    stop_logging()
     logger = logging.getLogger()
     logger.handlers.clear()
-    logger.setLevel(logging.DEBUG)
+    logger.setLevel(level)
+    handlers: list[logging.Handler] = []
 
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(level)
     formatter = _ColorFormatter(fmt="%(asctime)s | %(levelname)s | %(name)s | %(message)s", datefmt="%H:%M:%S")
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
+    handlers.append(console_handler)
 
     try:
         root_dir = os.path.normpath(os.path.join(os.path.dirname(__file__), ".."))
@@ -123,7 +192,7 @@ def setup_logging(level: int = logging.INFO) -> logging.Logger:
                     day_dir = os.path.join(self.logs_root_dir, new_date)
                     os.makedirs(day_dir, exist_ok=True)
                     path = os.path.join(day_dir, self.filename)
-                    self._stream = open(path, mode="a", encoding="utf-8", buffering=1)
+                    self._stream = open(path, mode="a", encoding="utf-8", buffering=64 * 1024)
                     self._current_date = new_date
                     self._cleanup_old()
                 except Exception:
@@ -159,13 +228,18 @@ def setup_logging(level: int = logging.INFO) -> logging.Logger:
                     super().close()
 
         file_handler = _DateFolderFileHandler(logs_root)
-        file_handler.setLevel(logging.DEBUG)
+        file_handler.setLevel(level)
         file_formatter = logging.Formatter("%(asctime)s | %(levelname)s | %(name)s | %(message)s", datefmt="%Y-%m-%d %H:%M:%S")
         file_handler.setFormatter(file_formatter)
-        logger.addHandler(file_handler)
+        handlers.append(file_handler)
     except Exception:
         pass
 
+    log_queue: queue.Queue = queue.Queue(-1)
+    logger.addHandler(_RecordQueueHandler(log_queue))
+    _listener = _BatchingQueueListener(log_queue, *handlers)
+    _listener.start()
+
     try:
         logging.getLogger("aiogram.event").setLevel(logging.WARNING)
     except Exception:
@@ -190,3 +264,4 @@ def setup_logging(level: int = logging.INFO) -> logging.Logger:
     return logger
 
 
+atexit.register(stop_logging)
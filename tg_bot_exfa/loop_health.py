@@ -0,0 +1,109 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+
+from tg_bot_exfa.notify import send_loop_lag_alert
+
+
+class LoopHealth:
+    def __init__(
+        self,
+        interval: float = 0.5,
+        threshold_ms: float = 1000,
+        alert_cooldown: float = 600,
+        window: int = 1200,
+        slow_callback_ms: float | None = None,
+    ):
+        self.interval = max(0.05, float(interval))
+        self.threshold_ms = max(1.0, float(threshold_ms))
+        self.alert_cooldown = max(0.0, float(alert_cooldown))
+        self.slow_callback_ms = slow_callback_ms
+        self._lags: deque[float] = deque(maxlen=max(10, int(window)))
+        self._heartbeat = time.monotonic()
+        self._loop_thread_id: int | None = None
+        self._stall_stack: str | None = None
+        self._stall_reported = False
+        self._last_alert_at = 0.0
+        self._alert_task: asyncio.Task | None = None
+        self._stop = threading.Event()
+        self._log = logging.getLogger("exfador.loop")
+        self.max_lag_ms = 0.0
+        self.stalls = 0
+
+    def percentiles(self) -> dict[str, float]:
+        samples = sorted(self._lags)
+        if not samples:
+            return {"p50": 0.0, "p99": 0.0, "max": self.max_lag_ms, "samples": 0}
+
+        def pick(q: float) -> float:
+            idx = min(len(samples) - 1, max(0, int(round(q * (len(samples) - 1)))))
+            return samples[idx]
+
+        return {"p50": pick(0.50), "p99": pick(0.99), "max": self.max_lag_ms, "samples": len(samples)}
+
+    def _watchdog(self) -> None:
+        limit = self.threshold_ms / 1000.0
+        while not self._stop.wait(min(self.interval, limit / 2)):
+            stalled_for = time.monotonic() - self._heartbeat - self.interval
+            if stalled_for < limit:
+                self._stall_reported = False
+                continue
+            if self._stall_reported or self._loop_thread_id is None:
+                continue
+            self._stall_reported = True
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            stack = "".join(traceback.format_stack(frame))
+            self._stall_stack = stack
+            self._log.warning("loop_stalled for_ms=%d stack=\n%s", int(stalled_for * 1000), stack)
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        if self.slow_callback_ms:
+            loop.slow_callback_duration = float(self.slow_callback_ms) / 1000.0
+            loop.set_debug(True)
+        watchdog = threading.Thread(target=self._watchdog, name="loop-health", daemon=True)
+        watchdog.start()
+        try:
+            while True:
+                start = loop.time()
+                await asyncio.sleep(self.interval)
+                lag_ms = max(0.0, (loop.time() - start - self.interval) * 1000.0)
+                self._heartbeat = time.monotonic()
+                self._lags.append(lag_ms)
+                if lag_ms > self.max_lag_ms:
+                    self.max_lag_ms = lag_ms
+                if lag_ms >= self.threshold_ms:
+                    self.stalls += 1
+                    stack = self._stall_stack
+                    self._stall_stack = None
+                    if self._alert_task is None or self._alert_task.done():
+                        self._alert_task = loop.create_task(self._alert(lag_ms, stack))
+        finally:
+            self._stop.set()
+            if self._alert_task is not None and not self._alert_task.done():
+                self._alert_task.cancel()
+
+    async def _alert(self, lag_ms: float, stack: str | None) -> None:
+        stats = self.percentiles()
+        self._log.warning(
+            "loop_lag lag_ms=%d p50_ms=%.1f p99_ms=%.1f",
+            int(lag_ms),
+            stats["p50"],
+            stats["p99"],
+        )
+        now = time.monotonic()
+        if self._last_alert_at and now - self._last_alert_at < self.alert_cooldown:
+            return
+        self._last_alert_at = now
+        try:
+            await send_loop_lag_alert(lag_ms, stats["p50"], stats["p99"], stack)
+        except Exception as exc:
+            self._log.warning("loop_lag_alert_failed error=%s", exc)
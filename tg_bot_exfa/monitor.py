@@ -13,31 +13,121 @@ from api.chats import fetch_chats
 from api.messages import fetch_chat_messages
 from api.orders import fetch_sells
 from api.send_message import send_chat_message
+from api.models import Lot, Offer, norm_id, parse_chats, parse_lots, parse_messages, parse_orders
 from tg_bot_exfa.notify import send_order_notification
-from tg_bot_exfa.notify import send_auth_notification, send_bump_notification
+from tg_bot_exfa.notify import send_auth_notification, send_bump_notification, send_bump_digest
 from tg_bot_exfa.notify import send_chat_notification, send_order_completed_notification
 from tg_bot_exfa.notify import sync_digest_view
 import tg_bot_exfa.app as app
-import requests
 from version import VERSION
 from tg_bot_exfa.notify import send_update_available
-from tg_bot_exfa.plugins import PluginContext
-from api.rate_limiter import throttle_sync
+from tg_bot_exfa.utils import github
+from tg_bot_exfa import order_history
+from tg_bot_exfa.bump_scheduler import BumpScheduler
+from tg_bot_exfa.chat_index import BuyerChatIndex
+from tg_bot_exfa.seen_messages import SeenMessages
+from tg_bot_exfa.session_context import session_context
+from tg_bot_exfa.config import ConfigSnapshot, get_config
 
 
-def _normalize_id(value):
-    if value is None:
-        return None
-    if isinstance(value, bool):
-        return None
-    if isinstance(value, (int, str)):
-        return str(value).strip()
-    return None
+def _buyer_index(db) -> BuyerChatIndex:
+    ctx = app.app_context
+    if ctx.buyer_chats is None:
+        ctx.buyer_chats = BuyerChatIndex(db)
+    return ctx.buyer_chats
+
 
+def load_config() -> ConfigSnapshot:
+    return get_config()
 
-def load_config() -> dict:
-    with open("config/osnova.json", "r", encoding="utf-8") as f:
-        return json.load(f)
+
+async def _resolve_offer_meta(
+    session_cookie: str,
+    sid_cookie: str,
+    lots: list[Lot],
+    db,
+    my_games_cookie: str | None = None,
+) -> tuple[dict[int, int], dict[int, int], str | None]:
+    log = logging.getLogger("exfador.monitor")
+    category_url = None
+    category_id_by_offer: dict[int, int] = {}
+    game_ids_by_offer: dict[int, int] = {}
+    for lot in lots or []:
+        if not category_url and isinstance(lot.category_url, str) and lot.category_url.strip():
+            category_url = lot.category_url.strip()
+        if lot.id is None:
+            continue
+        if lot.category_id is not None:
+            category_id_by_offer[lot.id] = lot.category_id
+        if lot.game_id is not None:
+            game_ids_by_offer[lot.id] = lot.game_id
+    missing = [
+        lot.id
+        for lot in lots or []
+        if lot.id is not None and (lot.id not in category_id_by_offer or lot.id not in game_ids_by_offer)
+    ]
+    if not missing:
+        return category_id_by_offer, game_ids_by_offer, category_url
+    cached: dict[int, dict[str, Any]] = {}
+    try:
+        cached = await db.get_offer_meta(missing)
+    except Exception as exc:
+        log.warning(f"offer_meta_read_failed error={exc}")
+    to_fetch = [
+        oid
+        for oid in missing
+        if not (isinstance((cached.get(oid) or {}).get("category_id"), int) and isinstance((cached.get(oid) or {}).get("game_id"), int))
+    ]
+    if to_fetch:
+        try:
+            limit = max(1, int(load_config().get("OFFER_DETAIL_CONCURRENCY", 4)))
+        except Exception:
+            limit = 4
+        sem = asyncio.Semaphore(limit)
+
+        async def fetch_one(offer_id: int):
+            async with sem:
+                return await fetch_offer_detail(session_cookie, offer_id, sid_cookie, my_games_cookie=my_games_cookie)
+
+        details = await asyncio.gather(*(fetch_one(oid) for oid in to_fetch), return_exceptions=True)
+        fresh: dict[int, dict[str, Any]] = {}
+        for d in details:
+            if isinstance(d, Exception):
+                continue
+            offer = Offer.from_detail(d)
+            if offer is not None and offer.category_id is not None and offer.game_id is not None:
+                fresh[offer.id] = offer.meta()
+        if fresh:
+            cached.update(fresh)
+            try:
+                await db.set_offer_meta(fresh)
+            except Exception as exc:
+                log.warning(f"offer_meta_write_failed error={exc}")
+        log.info(f"offer_meta_fetched requested={len(to_fetch)} resolved={len(fresh)} cached={len(missing) - len(to_fetch)}")
+    for oid in missing:
+        meta = cached.get(oid) or {}
+        if isinstance(meta.get("category_id"), int):
+            category_id_by_offer[oid] = meta["category_id"]
+        if isinstance(meta.get("game_id"), int):
+            game_ids_by_offer[oid] = meta["game_id"]
+        if not category_url and meta.get("game_slug") and meta.get("category_slug"):
+            category_url = f"https://starvell.com/{meta['game_slug']}/{meta['category_slug']}/trade"
+    return category_id_by_offer, game_ids_by_offer, category_url
+
+
+def _enrich_lots(
+    lots: list[Lot], category_id_by_offer: dict[int, int], game_ids_by_offer: dict[int, int]
+) -> dict[int, set[int]]:
+    game_to_categories: dict[int, set[int]] = {}
+    for lot in lots:
+        if lot.id in category_id_by_offer:
+            lot.category_id = category_id_by_offer[lot.id]
+        gid = game_ids_by_offer.get(lot.id) or lot.game_id
+        if gid is not None:
+            lot.game_id = gid
+        if lot.game_id is not None and lot.category_id is not None:
+            game_to_categories.setdefault(lot.game_id, set()).add(lot.category_id)
+    return game_to_categories
 
 
 async def start_monitor() -> None:
@@ -53,11 +143,13 @@ async def _monitor_once_and_loop() -> None:
     session_cookie = cfg.get("SESSION_COOKIE", "")
     auth = await fetch_homepage_data(session_cookie)
     if not (auth.get("authorized") and auth.get("user")):
+        session_context.invalidate()
         try:
             await send_auth_notification(False)
         except Exception:
             pass
-        logging.getLogger("exfador.monitor").info(json.dumps({"authorized": False, "user": None, "lots": [], "category_url": None}, ensure_ascii=False, indent=4))
+        if logging.getLogger("exfador.monitor").isEnabledFor(logging.DEBUG):
+            logging.getLogger("exfador.monitor").debug(json.dumps({"authorized": False, "user": None, "lots": [], "category_url": None}, ensure_ascii=False))
         return
     user_id = auth["user"].get("id")
     sid_cookie = auth.get("sid") or ""
@@ -66,96 +158,34 @@ async def _monitor_once_and_loop() -> None:
     except Exception:
         pass
     lots_data = await find_user_lots(session_cookie, sid_cookie, user_id)
-    lots = (lots_data or {}).get("lots") or []
+    lots = parse_lots((lots_data or {}).get("lots"))
     my_games_cookie = (lots_data or {}).get("my_games")
-    category_url = None
-    category_id_by_offer: dict[int, int] = {}
-    game_ids_by_offer: dict[int, int] = {}
-    if lots:
-        for lot in lots:
-            oid = lot.get("id")
-            if not category_url:
-                cu = lot.get("category_url")
-                if isinstance(cu, str) and cu.strip():
-                    category_url = cu.strip()
-            if not isinstance(oid, int):
-                continue
-            cid = lot.get("category_id")
-            gid = lot.get("game_id")
-            if isinstance(cid, int):
-                category_id_by_offer[oid] = cid
-            if isinstance(gid, int):
-                game_ids_by_offer[oid] = gid
-
-        need_details = [
-            lot
-            for lot in lots
-            if isinstance(lot.get("id"), int)
-            and (lot["id"] not in category_id_by_offer or lot["id"] not in game_ids_by_offer)
-        ]
-        if need_details:
-            tasks = [fetch_offer_detail(session_cookie, lot.get("id"), sid_cookie, my_games_cookie=my_games_cookie) for lot in need_details]
-            details = await asyncio.gather(*tasks, return_exceptions=True)
-            for d in details:
-                if isinstance(d, Exception):
-                    continue
-                page_props = (d or {}).get("pageProps", {})
-                offer = page_props.get("offer") or {}
-                game = offer.get("game") or {}
-                category = offer.get("category") or {}
-                oid = offer.get("id")
-                cid = None
-                if isinstance(category.get("id"), int):
-                    cid = category.get("id")
-                elif isinstance(offer.get("categoryId"), int):
-                    cid = offer.get("categoryId")
-                if isinstance(oid, int) and isinstance(cid, int):
-                    category_id_by_offer[oid] = cid
-                gid = None
-                if isinstance(offer.get("gameId"), int):
-                    gid = offer.get("gameId")
-                elif isinstance(game.get("id"), int):
-                    gid = game.get("id")
-                if isinstance(oid, int) and isinstance(gid, int):
-                    game_ids_by_offer[oid] = gid
-                gslug = game.get("slug")
-                cslug = category.get("slug")
-                if gslug and cslug and not category_url:
-                    category_url = f"https://starvell.com/{gslug}/{cslug}/trade"
-    enriched_lots = []
-    for lot in lots:
-        if isinstance(lot.get("id"), int) and lot["id"] in category_id_by_offer:
-            new_lot = dict(lot)
-            new_lot["category_id"] = category_id_by_offer[lot["id"]]
-            enriched_lots.append(new_lot)
-        else:
-            enriched_lots.append(lot)
-    if cfg.get("DEBUG", True):
-        logging.getLogger("exfador.monitor").info(
+    session_context.update(session_cookie, sid=sid_cookie, my_games=my_games_cookie or auth.get("my_games"), user_id=user_id)
+    db = app.app_context.db
+    category_id_by_offer, game_ids_by_offer, category_url = await _resolve_offer_meta(
+        session_cookie, sid_cookie, lots, db, my_games_cookie=my_games_cookie
+    )
+    game_to_categories = _enrich_lots(lots, category_id_by_offer, game_ids_by_offer)
+    if cfg.get("DEBUG", True) and logging.getLogger("exfador.monitor").isEnabledFor(logging.DEBUG):
+        logging.getLogger("exfador.monitor").debug(
             json.dumps(
                 {
                     "authorized": True,
                     "user": auth.get("user"),
-                    "lots": enriched_lots,
+                    "lots": [lot.to_dict() for lot in lots],
                     "category_url": category_url,
                 },
                 ensure_ascii=False,
-                indent=4,
             )
         )
-    game_to_categories: dict[int, set[int]] = {}
-    for lot in enriched_lots:
-        oid = lot.get("id")
-        cid = lot.get("category_id")
-        gid = game_ids_by_offer.get(oid) or lot.get("game_id")
-        if isinstance(gid, int) and isinstance(cid, int):
-            game_to_categories.setdefault(gid, set()).add(cid)
-    db = app.app_context.db
     user_id = await _check_chats(session_cookie, db, user_id=user_id)
     poll_interval = cfg.get("CHAT_POLL_INTERVAL", 5)
     asyncio.create_task(_chat_poll_loop(db, user_id=user_id, interval=poll_interval))
     orders_interval = cfg.get("ORDERS_POLL_INTERVAL", 10)
     asyncio.create_task(_orders_poll_loop(db, interval=orders_interval))
+    orders_sync_interval = cfg.get("ORDERS_SYNC_INTERVAL", 900)
+    asyncio.create_task(_orders_sync_loop(db, interval=orders_sync_interval))
+    asyncio.create_task(_session_refresh_loop())
     announce_interval = cfg.get("REMOTE_INFO_INTERVAL", 120)
     asyncio.create_task(_remote_poll_loop(interval=announce_interval))
     asyncio.create_task(_version_poll_loop(interval=300))
@@ -165,7 +195,7 @@ async def _monitor_once_and_loop() -> None:
             sid_cookie,
             game_to_categories,
             category_url,
-            enriched_lots,
+            lots,
             auth.get("user"),
             db,
             my_games_cookie=my_games_cookie,
@@ -174,7 +204,13 @@ async def _monitor_once_and_loop() -> None:
 
 async def _chat_poll_loop(db, user_id, interval: float = 30) -> None:
     log = logging.getLogger("exfador.monitor")
-    seen_messages: dict[str, set[str]] = {}
+    cfg = load_config()
+    seen_messages = SeenMessages(
+        per_chat=int(cfg.get("CHAT_DEDUP_PER_CHAT", 200)),
+        idle_ttl=float(cfg.get("CHAT_DEDUP_IDLE_TTL", 7 * 86400)),
+    )
+    if app.app_context is not None:
+        app.app_context.seen_messages = seen_messages
     while True:
         try:
             cfg = load_config()
@@ -183,6 +219,9 @@ async def _chat_poll_loop(db, user_id, interval: float = 30) -> None:
                 user_id = await _check_chats(session_cookie, db, seen_messages, user_id=user_id)
             else:
                 log.warning("chat_poll_no_session_cookie")
+            evicted = seen_messages.evict()
+            if evicted:
+                log.debug(f"chat_dedup_evicted chats={evicted} stats={seen_messages.stats()}")
         except Exception as exc:
             log.warning(f"chat_poll_failed error={exc}")
         await asyncio.sleep(max(1, float(interval)))
@@ -203,6 +242,31 @@ async def _orders_poll_loop(db, interval: float = 15) -> None:
         await asyncio.sleep(max(1, float(interval)))
 
 
+async def _orders_sync_loop(db, interval: float = 900) -> None:
+    log = logging.getLogger("exfador.monitor")
+    while True:
+        try:
+            cfg = load_config()
+            session_cookie = cfg.get("SESSION_COOKIE", "")
+            if session_cookie:
+                await order_history.sync_orders(session_cookie, db)
+        except Exception as exc:
+            log.warning(f"orders_sync_failed error={exc}")
+        await asyncio.sleep(max(60, float(interval)))
+
+
+async def _session_refresh_loop() -> None:
+    log = logging.getLogger("exfador.monitor")
+    while True:
+        await asyncio.sleep(max(30.0, session_context.ttl / 2))
+        try:
+            session_cookie = load_config().get("SESSION_COOKIE", "")
+            if session_cookie:
+                await session_context.refresh(session_cookie)
+        except Exception as exc:
+            log.warning(f"session_refresh_failed error={exc}")
+
+
 async def _remote_poll_loop(interval: float = 120) -> None:
     log = logging.getLogger("exfador.monitor")
     _last_rev: str | None = None
@@ -225,19 +289,14 @@ async def _remote_poll_loop(interval: float = 120) -> None:
         updated = str((gist_meta or {}).get("updated_at") or "")
         return f"{updated}:{sha}" if updated else sha
 
-    def read_cxh_descriptor(ignore_last_tag: bool = False) -> dict | None:
+    async def read_cxh_descriptor(ignore_last_tag: bool = False) -> dict | None:
         nonlocal _last_rev
-        headers = {"X-GitHub-Api-Version": "2022-11-28", "accept": "application/vnd.github+json"}
         try:
-            throttle_sync()
-            resp = requests.get(
-                "https://api.github.com/gists/89e52dbb3ca81aee82b6a3d8b51b55e2",
-                headers=headers,
-                timeout=10,
-            )
-            if resp.status_code != 200:
+            status, data = await github.get_json("https://api.github.com/gists/89e52dbb3ca81aee82b6a3d8b51b55e2")
+            if status == 304 and not ignore_last_tag and _last_rev is not None:
+                return None
+            if not isinstance(data, dict):
                 return None
-            data = resp.json() or {}
             file_meta = _safe_first_file(data)
             if not isinstance(file_meta, dict):
                 return None
@@ -245,10 +304,9 @@ async def _remote_poll_loop(interval: float = 120) -> None:
             content_text = None
             if raw_url:
                 try:
-                    throttle_sync()
-                    raw = requests.get(raw_url, timeout=10)
-                    if raw.status_code == 200:
-                        content_text = raw.text
+                    raw_status, raw_text = await github.get_text(raw_url)
+                    if raw_status in (200, 304):
+                        content_text = raw_text
                 except Exception:
                     content_text = None
             if not content_text:
@@ -266,19 +324,12 @@ async def _remote_poll_loop(interval: float = 120) -> None:
         except Exception:
             return None
 
-    def read_owner_notes(max_items: int = 50) -> list[dict]:
-        headers = {"X-GitHub-Api-Version": "2022-11-28", "accept": "application/vnd.github+json"}
+    async def read_owner_notes(max_items: int = 50) -> list[dict]:
         items: list[dict] = []
         try:
-            throttle_sync()
-            resp = requests.get(
-                "https://api.github.com/gists/89e52dbb3ca81aee82b6a3d8b51b55e2/comments",
-                headers=headers,
-                timeout=10,
-            )
-            if resp.status_code != 200:
+            status, arr = await github.get_json("https://api.github.com/gists/89e52dbb3ca81aee82b6a3d8b51b55e2/comments")
+            if status not in (200, 304) or not isinstance(arr, list):
                 return items
-            arr = resp.json() or []
             try:
                 arr = sorted(arr, key=lambda x: int(x.get("id", 0)))
             except Exception:
@@ -309,7 +360,7 @@ async def _remote_poll_loop(interval: float = 120) -> None:
             return items
     while True:
         try:
-            payload = read_cxh_descriptor()
+            payload = await read_cxh_descriptor()
             if isinstance(payload, dict):
                 try:
                     db = app.app_context.db if app.app_context else None
@@ -338,7 +389,7 @@ async def _remote_poll_loop(interval: float = 120) -> None:
                                 pass
                 except Exception:
                     pass
-            comments_payloads = read_owner_notes()
+            comments_payloads = await read_owner_notes()
             if comments_payloads:
                 for p in comments_payloads:
                     try:
@@ -379,175 +430,173 @@ async def _version_poll_loop(interval: float = 300) -> None:
     last_notified: str | None = None
     while True:
         try:
-            throttle_sync()
-            resp = requests.get(
-                "https://api.github.com/repos/exfador/starvell_api/tags?page=1",
-                headers={"accept": "application/vnd.github+json", "X-GitHub-Api-Version": "2022-11-28"},
-                timeout=10,
-            )
-            if resp.status_code == 200:
-                arr = resp.json() or []
-                tag_item = None
-                for it in arr:
-                    name = str((it or {}).get("name") or "").strip()
-                    if name and name.lower() != "api":
-                        tag_item = it
-                        break
-                if tag_item:
-                    name = str(tag_item.get("name") or "").strip()
-                    if name and name != VERSION:
-                        key = f"ver:{name}"
-                        try:
-                            db = app.app_context.db if app.app_context else None
-                            should_send = True
+            tag_item = await github.fetch_latest_tag()
+            if tag_item:
+                name = str(tag_item.get("name") or "").strip()
+                if name and name != VERSION:
+                    key = f"ver:{name}"
+                    try:
+                        db = app.app_context.db if app.app_context else None
+                        should_send = True
+                        if db:
+                            if await db.has_digest_sent(key):
+                                should_send = False
+                        if should_send and last_notified != name:
+                            await send_update_available(name, VERSION)
                             if db:
-                                if await db.has_digest_sent(key):
-                                    should_send = False
-                            if should_send and last_notified != name:
-                                await send_update_available(name, VERSION)
-                                if db:
-                                    try:
-                                        await db.mark_digest_sent(key)
-                                    except Exception:
-                                        pass
-                                last_notified = name
-                        except Exception:
-                            pass
-            else:
-                log.debug(f"version_poll_http status={resp.status_code}")
+                                try:
+                                    await db.mark_digest_sent(key)
+                                except Exception:
+                                    pass
+                            last_notified = name
+                    except Exception:
+                        pass
         except Exception as exc:
             log.warning(f"version_poll_failed error={exc}")
         await asyncio.sleep(max(10, float(interval)))
 
 
+def _build_bump_report(results: list, lots: list[Lot]) -> dict:
+    game_names: dict[int, str] = {}
+    category_names: dict[int, str] = {}
+    lots_per_category: dict[int, int] = {}
+    report_lots: list[dict] = []
+    for lot in lots:
+        if lot.bump is None:
+            continue
+        cid = lot.category_id
+        gid = lot.game_id
+        if cid is not None:
+            lots_per_category[cid] = lots_per_category.get(cid, 0) + 1
+            if lot.category_name:
+                category_names.setdefault(cid, str(lot.category_name))
+        if gid is not None and lot.game_name:
+            game_names.setdefault(gid, str(lot.game_name))
+        report_lots.append(
+            {
+                "id": lot.id,
+                "title": lot.title,
+                "url": lot.url,
+                "game_id": gid,
+                "category_id": cid,
+                "success": bool(lot.bump.get("success")),
+            }
+        )
+    games: list[dict] = []
+    for r in results:
+        if isinstance(r, Exception):
+            continue
+        req = (r or {}).get("request") or {}
+        resp = (r or {}).get("response") or {}
+        gid = req.get("gameId")
+        categories = []
+        for cid in req.get("categoryIds") or []:
+            categories.append(
+                {
+                    "category_id": cid,
+                    "name": category_names.get(cid) or f"#{cid}",
+                    "lots": lots_per_category.get(cid, 0),
+                    "success": bool(resp.get("success")),
+                    "status": resp.get("status"),
+                }
+            )
+        games.append({"game_id": gid, "name": game_names.get(gid) or f"#{gid}", "categories": categories})
+    games.sort(key=lambda g: str(g.get("name") or "").lower())
+    return {"created_at": int(time.time()), "games": games, "lots": report_lots}
+
+
 async def _run_bump_loop(
     session_cookie: str,
     sid_cookie: str,
     game_to_categories: dict[int, set[int]],
     referer: str | None,
-    lots: list[dict],
+    lots: list[Lot],
     user_obj: dict | None,
     db,
     my_games_cookie: str | None = None,
 ) -> None:
+    cfg = load_config()
+    scheduler = BumpScheduler(
+        db,
+        default_interval=float(cfg.get("BUMP_INTERVAL", 1800)),
+        retry_delay=float(cfg.get("BUMP_RETRY_DELAY", 300)),
+    )
+    refresh_interval = max(60.0, float(cfg.get("BUMP_REFRESH_INTERVAL", 1800)))
+    refresh_backoff = 30.0
+    next_refresh = 0.0
+    try:
+        await scheduler.sync(game_to_categories)
+        next_refresh = time.time() + refresh_interval
+    except Exception as exc:
+        logging.getLogger("exfador.monitor").warning(f"bump_schedule_seed_failed error={exc}")
+    current_lots = lots
+    category_url = referer
     while True:
         try:
             cfg = load_config()
             session_cookie = cfg.get("SESSION_COOKIE", session_cookie)
-            auth = await fetch_homepage_data(session_cookie)
-            if not (auth.get("authorized") and auth.get("user")):
-                await asyncio.sleep(60)
-                continue
-            user_id = (auth.get("user") or {}).get("id")
-            sid_cookie = auth.get("sid") or sid_cookie
-            lots_data = await find_user_lots(session_cookie, sid_cookie, user_id, my_games_cookie=my_games_cookie)
-            lots_current = (lots_data or {}).get("lots") or []
-            my_games_cookie = (lots_data or {}).get("my_games") or my_games_cookie
-            category_url = None
-            category_id_by_offer: dict[int, int] = {}
-            game_ids_by_offer: dict[int, int] = {}
-            if lots_current:
-                for lot in lots_current:
-                    oid = lot.get("id")
-                    if not category_url:
-                        cu = lot.get("category_url")
-                        if isinstance(cu, str) and cu.strip():
-                            category_url = cu.strip()
-                    if not isinstance(oid, int):
-                        continue
-                    cid = lot.get("category_id")
-                    gid = lot.get("game_id")
-                    if isinstance(cid, int):
-                        category_id_by_offer[oid] = cid
-                    if isinstance(gid, int):
-                        game_ids_by_offer[oid] = gid
-
-                need_details = [
-                    lot
-                    for lot in lots_current
-                    if isinstance(lot.get("id"), int)
-                    and (lot["id"] not in category_id_by_offer or lot["id"] not in game_ids_by_offer)
-                ]
-                if need_details:
-                    tasks_details = [
-                        fetch_offer_detail(session_cookie, lot.get("id"), sid_cookie, my_games_cookie=my_games_cookie)
-                        for lot in need_details
-                        if lot.get("id")
-                    ]
-                    details = await asyncio.gather(*tasks_details, return_exceptions=True)
-                    for d in details:
-                        if isinstance(d, Exception):
-                            continue
-                        page_props = (d or {}).get("pageProps", {})
-                        offer = page_props.get("offer") or {}
-                        game = offer.get("game") or {}
-                        category = offer.get("category") or {}
-                        oid = offer.get("id")
-                        cid = None
-                        if isinstance(category.get("id"), int):
-                            cid = category.get("id")
-                        elif isinstance(offer.get("categoryId"), int):
-                            cid = offer.get("categoryId")
-                        if isinstance(oid, int) and isinstance(cid, int):
-                            category_id_by_offer[oid] = cid
-                        gid = None
-                        if isinstance(offer.get("gameId"), int):
-                            gid = offer.get("gameId")
-                        elif isinstance(game.get("id"), int):
-                            gid = game.get("id")
-                        if isinstance(oid, int) and isinstance(gid, int):
-                            game_ids_by_offer[oid] = gid
-                        gslug = game.get("slug")
-                        cslug = category.get("slug")
-                        if gslug and cslug and not category_url:
-                            category_url = f"https://starvell.com/{gslug}/{cslug}/trade"
-
-            if not category_url and referer:
-                category_url = referer
-            enriched_lots = []
-            for lot in lots_current or []:
-                if isinstance(lot.get("id"), int) and lot["id"] in category_id_by_offer:
-                    new_lot = dict(lot)
-                    new_lot["category_id"] = category_id_by_offer[lot["id"]]
-                    enriched_lots.append(new_lot)
-                else:
-                    enriched_lots.append(lot)
-            game_to_categories_now: dict[int, set[int]] = {}
-            for lot in enriched_lots:
-                oid = lot.get("id")
-                cid = lot.get("category_id")
-                gid = game_ids_by_offer.get(oid) or lot.get("game_id")
-                if isinstance(gid, int) and isinstance(cid, int):
-                    game_to_categories_now.setdefault(gid, set()).add(cid)
+            if time.time() >= next_refresh:
+                next_refresh = time.time() + refresh_backoff
+                refresh_backoff = min(refresh_interval, refresh_backoff * 2)
+                auth = await fetch_homepage_data(session_cookie)
+                if not (auth.get("authorized") and auth.get("user")):
+                    session_context.invalidate()
+                    await asyncio.sleep(60)
+                    continue
+                user_id = (auth.get("user") or {}).get("id")
+                sid_cookie = auth.get("sid") or sid_cookie
+                lots_data = await find_user_lots(session_cookie, sid_cookie, user_id, my_games_cookie=my_games_cookie)
+                lots_current = parse_lots((lots_data or {}).get("lots"))
+                my_games_cookie = (lots_data or {}).get("my_games") or my_games_cookie
+                session_context.update(session_cookie, sid=sid_cookie, my_games=my_games_cookie, user_id=user_id)
+                category_id_by_offer, game_ids_by_offer, category_url = await _resolve_offer_meta(
+                    session_cookie, sid_cookie, lots_current, db, my_games_cookie=my_games_cookie
+                )
+                if not category_url and referer:
+                    category_url = referer
+                current_lots = lots_current
+                game_to_categories_now = _enrich_lots(current_lots, category_id_by_offer, game_ids_by_offer)
+                await scheduler.sync(game_to_categories_now)
+                next_refresh = time.time() + refresh_interval
+                refresh_backoff = 30.0
+            due = scheduler.due()
             tasks = []
-            for game_id, categories in game_to_categories_now.items():
-                if categories:
-                    if cfg.get("DEBUG", True):
-                        logging.getLogger("exfador.monitor").info(
-                            json.dumps(
-                                {
-                                    "bump_request": {
-                                        "gameId": game_id,
-                                        "categoryIds": sorted(categories),
-                                        "referer": category_url,
-                                        "my_games": my_games_cookie,
-                                    }
-                                },
-                                ensure_ascii=False,
-                            )
-                        )
-                    tasks.append(
-                        bump_categories(
-                            session_cookie,
-                            sid_cookie,
-                            game_id,
-                            sorted(categories),
-                            category_url,
-                            my_games_cookie=my_games_cookie,
+            for entry in due:
+                if cfg.get("DEBUG", True):
+                    logging.getLogger("exfador.monitor").info(
+                        json.dumps(
+                            {
+                                "bump_request": {
+                                    "gameId": entry["game_id"],
+                                    "categoryIds": entry["category_ids"],
+                                    "referer": category_url,
+                                    "my_games": my_games_cookie,
+                                }
+                            },
+                            ensure_ascii=False,
                         )
                     )
+                tasks.append(
+                    bump_categories(
+                        session_cookie,
+                        sid_cookie,
+                        entry["game_id"],
+                        entry["category_ids"],
+                        category_url,
+                        my_games_cookie=my_games_cookie,
+                    )
+                )
             if tasks:
+                fired_at = time.time()
                 results = await asyncio.gather(*tasks, return_exceptions=True)
+                late: list[dict] = []
+                for entry, r in zip(due, results):
+                    try:
+                        info = await scheduler.record(entry, r, fired_at)
+                        if info["late_s"] > scheduler.late_threshold:
+                            late.append(info)
+                    except Exception as exc:
+                        logging.getLogger("exfador.monitor").warning(f"bump_schedule_record_failed key={entry.get('key')} error={exc}")
                 if cfg.get("DEBUG", True):
                     try:
                         short = []
@@ -579,59 +628,59 @@ async def _run_bump_loop(
                     cat_ids = req.get("categoryIds") or []
                     for cid in cat_ids:
                         category_to_bump[cid] = resp
-                updated_lots = []
-                for lot in enriched_lots:
-                    cid = lot.get("category_id")
-                    if isinstance(cid, int) and cid in category_to_bump:
-                        nl = dict(lot)
-                        nl["bump"] = category_to_bump[cid]
-                        updated_lots.append(nl)
+                per_lot_mode = str(cfg.get("BUMP_REPORT_MODE", "digest") or "digest").strip().lower() == "lots"
+                for lot in current_lots:
+                    lot.bump = category_to_bump.get(lot.category_id) if lot.category_id is not None else None
+                    if per_lot_mode and lot.bump is not None:
                         try:
-                            success = bool((category_to_bump[cid] or {}).get("success"))
-                            if success:
-                                await send_bump_notification(nl, True)
+                            if bool(lot.bump.get("success")):
+                                await send_bump_notification(lot, True)
                         except Exception:
                             pass
-                    else:
-                        updated_lots.append(lot)
+                if not per_lot_mode:
+                    try:
+                        report = _build_bump_report(results, current_lots)
+                        if late:
+                            report["late"] = late
+                        if report.get("games"):
+                            report_id = await db.save_bump_report(report)
+                            await send_bump_digest(report, report_id)
+                    except Exception as exc:
+                        logging.getLogger("exfador.monitor").warning(f"bump_digest_failed error={exc}")
                 cfg2 = load_config()
-                if cfg2.get("DEBUG", True):
-                    logging.getLogger("exfador.monitor").info(
-                        json.dumps({"lots": updated_lots, "category_url": category_url}, ensure_ascii=False, indent=4)
+                if cfg2.get("DEBUG", True) and logging.getLogger("exfador.monitor").isEnabledFor(logging.DEBUG):
+                    logging.getLogger("exfador.monitor").debug(
+                        json.dumps({"lots": [lot.to_dict() for lot in current_lots], "category_url": category_url}, ensure_ascii=False)
                     )
         except Exception as exc:
             logging.getLogger("exfador.monitor").warning(f"bump_loop_failed error={exc}")
-        await asyncio.sleep(1800)
+        wake = scheduler.next_wakeup()
+        target = next_refresh if wake is None else min(next_refresh, wake)
+        await asyncio.sleep(min(refresh_interval, max(5.0, target - time.time())))
 
 
 async def _check_chats(
     session_cookie: str,
     db,
-    seen_messages: dict[str, set[str]] | None = None,
+    seen_messages: SeenMessages | None = None,
     user_id=None,
 ) -> int | str | None:
-    def _image_preview_url(img: dict) -> str | None:
-        try:
-            img_id = str((img or {}).get("id") or "").strip()
-            ext = str((img or {}).get("extension") or "png").strip().lstrip(".")
-            if not img_id:
-                return None
-            return f"https://cdn.starvell.com/messages/{img_id}-preview.{ext or 'png'}"
-        except Exception:
-            return None
-
     try:
         data = await fetch_chats(session_cookie)
     except Exception as exc:
         logging.getLogger("exfador.monitor").warning(f"chat_fetch_failed error={exc}")
         return user_id
     page_props = data.get("pageProps", {})
-    chats = page_props.get("chats", [])
+    chats = parse_chats(data)
     user = page_props.get("user") or {}
     fetched_user_id = user.get("id")
     if fetched_user_id is not None:
         user_id = fetched_user_id
-    user_id_norm = _normalize_id(user_id)
+    user_id_norm = norm_id(user_id)
+    try:
+        await _buyer_index(db).update_from_chats(page_props.get("chats") or [], user_id_norm)
+    except Exception as exc:
+        logging.getLogger("exfador.monitor").warning(f"buyer_index_update_failed error={exc}")
 
     cfg_now = load_config()
     welcome_enabled = bool(cfg_now.get("WELCOME_ENABLED", True))
@@ -653,39 +702,19 @@ async def _check_chats(
     except Exception:
         wm_on_global = True
         wm_text_global = "[CXH BOT]"
+    pm = app.app_context.plugin_manager if app.app_context else None
+    plugin_batch: list[dict] | None = [] if pm is not None and pm.wants_message_batches else None
 
     for chat in chats:
-        chat_id = chat.get("id")
-        if not chat_id:
+        chat_id = chat.id
+        last_message = chat.last_message
+        if last_message is None or last_message.is_auto:
             continue
-        unread = chat.get("unreadMessageCount", 0)
-        last_message = chat.get("lastMessage") or {}
-        msg_id = last_message.get("id")
-        if msg_id is not None:
-            msg_id = str(msg_id)
-        metadata = last_message.get("metadata") or {}
-        if not msg_id or metadata.get("isAuto"):
-            continue
-        processed_for_chat = seen_messages.setdefault(chat_id, set()) if seen_messages is not None else None
+        msg_id = last_message.id
+        processed_for_chat = seen_messages.for_chat(chat_id) if seen_messages is not None else None
         if processed_for_chat is not None and msg_id in processed_for_chat:
             continue
-        participants = chat.get("participants") or []
-        other_username = ""
-        interlocutor_id: int | None = None
-        participants_map: list[tuple[str | None, str]] = []
-        for participant in participants:
-            participant_id_norm = _normalize_id(participant.get("id"))
-            username_candidate = participant.get("username") or ""
-            participants_map.append((participant_id_norm, username_candidate))
-            if user_id_norm and participant_id_norm == user_id_norm:
-                continue
-            if username_candidate:
-                other_username = username_candidate
-            raw_pid = participant.get("id")
-            if isinstance(raw_pid, int) and interlocutor_id is None:
-                interlocutor_id = raw_pid
-        if not other_username and participants:
-            other_username = participants[0].get("username") or ""
+        other_username, interlocutor_id = chat.interlocutor(user_id_norm)
         stored = await db.get_last_notified_message(chat_id)
         if stored is not None:
             stored = str(stored)
@@ -693,112 +722,72 @@ async def _check_chats(
         last_msg_author_norm = None
         last_msg_from_self = False
         if stored is None:
-            if msg_id:
-                try:
-                    await db.set_last_notified_message(chat_id, msg_id)
-                except Exception:
-                    pass
+            try:
+                await db.set_last_notified_message(chat_id, msg_id)
+            except Exception:
+                pass
             if processed_for_chat is not None:
                 processed_for_chat.add(msg_id)
             continue
-        if msg_id and stored and msg_id == stored:
+        if msg_id == stored:
             if processed_for_chat is not None:
                 processed_for_chat.add(msg_id)
             continue
         try:
-            limit = max(unread, 50) if stored else max(unread, 20)
-            messages = await fetch_chat_messages(session_cookie, chat_id, limit=limit, interlocutor_id=interlocutor_id)
+            limit = max(chat.unread, 50) if stored else max(chat.unread, 20)
+            messages = parse_messages(
+                await fetch_chat_messages(session_cookie, chat_id, limit=limit, interlocutor_id=interlocutor_id)
+            )
             new_items: list[dict] = []
             for msg in messages:
-                if not isinstance(msg, dict):
-                    continue
-                mid = msg.get("id")
-                if not mid:
-                    continue
-                mid = str(mid)
+                mid = msg.id
                 if stored and mid == stored:
                     break
-                metadata = msg.get("metadata") or {}
-                if metadata.get("isAuto"):
+                if msg.is_auto:
                     continue
                 if processed_for_chat is not None and mid in processed_for_chat:
                     continue
-                author_id = msg.get("authorId")
-                if author_id is None:
-                    author = msg.get("author") or {}
-                    author_id = author.get("id")
-                author_id_norm = _normalize_id(author_id)
-                if mid == msg_id and author_id_norm is not None:
-                    last_msg_author_norm = author_id_norm
-                if author_id_norm and user_id_norm and author_id_norm == user_id_norm:
+                if mid == msg_id and msg.author_id is not None:
+                    last_msg_author_norm = msg.author_id
+                if msg.author_id and user_id_norm and msg.author_id == user_id_norm:
                     if mid == msg_id:
                         last_msg_from_self = True
                     continue
-                content_text = (msg.get("content") or "").strip()
-                images = msg.get("images") or []
-                image_url = None
-                if isinstance(images, list) and images:
-                    for im in images:
-                        if isinstance(im, dict):
-                            image_url = _image_preview_url(im)
-                            if image_url:
-                                break
-                if not content_text and not image_url:
+                if not msg.content and not msg.image_url:
                     continue
-                text_for_notify = content_text if content_text else "📷 Фото"
-                new_items.append({"id": mid, "text": text_for_notify, "image_url": image_url, "author_id": author_id_norm})
+                text_for_notify = msg.content if msg.content else "📷 Фото"
+                new_items.append({"id": mid, "text": text_for_notify, "image_url": msg.image_url, "author_id": msg.author_id})
             to_notify = list(reversed(new_items))
         except Exception as exc:
             logging.getLogger("exfador.monitor").warning(f"chat_messages_fetch_failed chat_id={chat_id} error={exc}")
-            fb_author_id = last_message.get("authorId")
-            if fb_author_id is None:
-                fb_author_data = last_message.get("author") or {}
-                fb_author_id = fb_author_data.get("id")
-            fb_author_norm = _normalize_id(fb_author_id)
+            fb_author_norm = last_message.author_id
             if fb_author_norm and user_id_norm and fb_author_norm == user_id_norm:
                 to_notify = []
+            elif last_message.content or last_message.image_url:
+                skip_plugins = fb_author_norm is None
+                to_notify = [
+                    {
+                        "id": msg_id,
+                        "text": last_message.content or "📷 Фото",
+                        "image_url": last_message.image_url,
+                        "author_id": fb_author_norm,
+                        "_skip_plugins": skip_plugins,
+                    }
+                ]
             else:
-                content = (last_message.get("content") or "").strip()
-                image_url = None
-                try:
-                    lm_images = (last_message.get("images") or [])
-                    if isinstance(lm_images, list) and lm_images:
-                        for im in lm_images:
-                            if isinstance(im, dict):
-                                image_url = _image_preview_url(im)
-                                if image_url:
-                                    break
-                except Exception:
-                    image_url = None
-                if content or image_url:
-                    skip_plugins = fb_author_norm is None
-                    to_notify = [{"id": msg_id, "text": content or "📷 Фото", "image_url": image_url, "author_id": fb_author_norm, "_skip_plugins": skip_plugins}]
-                else:
-                    to_notify = []
-        last_author_id = last_message.get("authorId")
-        if last_author_id is None:
-            last_author_data = last_message.get("author") or {}
-            last_author_id = last_author_data.get("id")
-        last_author_id_norm = _normalize_id(last_author_id)
+                to_notify = []
+        last_author_id_norm = last_message.author_id
         if last_msg_author_norm is not None:
             last_author_id_norm = last_msg_author_norm
         if last_msg_from_self:
             last_author_id_norm = user_id_norm
 
-        safe_username = (other_username or "Unknown") if other_username else "Unknown"
+        safe_username = other_username or "Unknown"
         if last_author_id_norm:
-            for pid_norm, pun in participants_map:
-                if pid_norm and pid_norm == last_author_id_norm:
-                    safe_username = pun or safe_username
-                    break
-        if stored is None and not to_notify and (user_id_norm is None or last_author_id_norm != user_id_norm):
-            content = (last_message.get("content") or "").strip()
-            if content:
-                to_notify = [{"id": msg_id, "text": content, "author_id": last_author_id_norm}]
+            safe_username = chat.username_of(last_author_id_norm) or safe_username
         if not to_notify and stored != msg_id and (user_id_norm is None or last_author_id_norm != user_id_norm):
-            content = (last_message.get("content") or "").strip()
-            if content:
-                to_notify = [{"id": msg_id, "text": content, "author_id": last_author_id_norm}]
+            if last_message.content:
+                to_notify = [{"id": msg_id, "text": last_message.content, "author_id": last_author_id_norm}]
 
         if not to_notify:
             if processed_for_chat is not None:
@@ -858,14 +847,19 @@ async def _check_chats(
                     processed_for_chat.add(mid)
                 skip_plugins = (item.get("_skip_plugins") if isinstance(item, dict) else False) or False
                 if not skip_plugins:
+                    author_id = item.get("author_id") if isinstance(item, dict) else None
+                    if plugin_batch is not None:
+                        plugin_batch.append(
+                            {"id": mid, "chat_id": chat_id, "text": safe_text, "author_id": author_id, "image_url": image_url}
+                        )
                     try:
-                        cfg_now_inner = load_config()
-                        ctx = PluginContext(session_cookie=session_cookie, db=db, config=cfg_now_inner)
-                        ctx.message_author_id = item.get("author_id") if isinstance(item, dict) else None
-                        ctx.user_id = user_id_norm
-                        pm = app.app_context.plugin_manager if app.app_context else None
                         if pm:
-                            await pm.dispatch_chat_message(safe_text, chat_id, ctx)
+                            await pm.dispatch_chat_message(
+                                safe_text,
+                                chat_id,
+                                message_author_id=author_id,
+                                user_id=user_id_norm,
+                            )
                     except Exception:
                         pass
             except Exception as exc:
@@ -878,6 +872,11 @@ async def _check_chats(
                 await db.set_chat_last_user_message_at(chat_id, last_user_ts)
             except Exception:
                 pass
+    if plugin_batch:
+        try:
+            await pm.dispatch_chat_messages(plugin_batch, user_id=user_id_norm)
+        except Exception:
+            pass
     return user_id
 
 
@@ -888,42 +887,36 @@ async def _check_orders(session_cookie: str, db) -> None:
         logging.getLogger("exfador.monitor").warning(f"orders_fetch_failed error={exc}")
         return
     page_props = data.get("pageProps", {})
-    orders = page_props.get("orders", [])
+    try:
+        await order_history.ingest_orders(db, page_props.get("orders", []))
+    except Exception as exc:
+        logging.getLogger("exfador.monitor").warning(f"orders_history_ingest_failed error={exc}")
+    orders = parse_orders(data)
+    pm = app.app_context.plugin_manager if app.app_context else None
+    plugin_batch: list[dict] | None = [] if pm is not None and pm.wants_order_batches else None
     for order in orders:
         try:
-            if not isinstance(order, dict):
-                continue
-            order_id = order.get("id")
-            status = order.get("status")
-            if not order_id or status not in ("CREATED",):
+            order_id = order.id
+            status = order.status
+            if status not in ("CREATED",):
                 continue
             notified = await db.is_order_notified(order_id)
             if notified:
                 continue
+            cfg_now = load_config()
+            if plugin_batch is not None:
+                plugin_batch.append(order.raw)
             try:
-                cfg_now = load_config()
-                ctx = PluginContext(session_cookie=session_cookie, db=db, config=cfg_now)
-                pm = app.app_context.plugin_manager if app.app_context else None
                 if pm:
-                    await pm.dispatch_order_created(order, ctx)
+                    await pm.dispatch_order_created(order.raw)
             except Exception:
                 pass
             try:
-                offer = order.get("offerDetails") or {}
-                offer_obj = offer.get("offer") or {}
-                desc_rus = ((offer.get("descriptions") or {}).get("rus") or {})
-                name = (
-                    str(desc_rus.get("briefDescription") or "").strip()
-                    or str(desc_rus.get("description") or "").strip()
-                    or str(offer_obj.get("name") or "").strip()
-                    or str(offer.get("name") or "").strip()
-                    or str(offer.get("title") or "").strip()
-                )
+                name = order.product_name
                 ad_tuple = None
                 codes: list[str] = []
-                qty = int(order.get("quantity") or 1)
                 if name:
-                    for _ in range(max(1, qty)):
+                    for _ in range(max(1, order.quantity)):
                         code = await db.pop_autodelivery_item(name)
                         if not code:
                             break
@@ -932,29 +925,11 @@ async def _check_orders(session_cookie: str, db) -> None:
                         joined = "\n".join(codes)
                         ad_tuple = (name, joined)
                         try:
-                            buyer = (order.get("user") or {}).get("id")
-                            if buyer:
-                                chats_data = await fetch_chats(session_cookie)
-                                page_props = chats_data.get("pageProps", {}) if isinstance(chats_data, dict) else {}
-                                chats = page_props.get("chats", [])
-                                chat_id = None
-                                for ch in chats:
-                                    parts = ch.get("participants") or []
-                                    for p in parts:
-                                        if (p or {}).get("id") == buyer:
-                                            chat_id = ch.get("id")
-                                            break
-                                    if chat_id:
-                                        break
+                            if order.buyer_id:
+                                chat_id = await _buyer_index(db).lookup(session_cookie, order.buyer_id)
                                 if chat_id:
-                                    from api.send_message import send_chat_message
-                                    try:
-                                        cfg_loc = load_config()
-                                        wm_on = bool(cfg_loc.get("WATERMARK_ON", True))
-                                        wm_text = str(cfg_loc.get("WATERMARK_TEXT", "[CXH BOT]"))
-                                    except Exception:
-                                        wm_on = True
-                                        wm_text = "[CXH BOT]"
+                                    wm_on = bool(cfg_now.get("WATERMARK_ON", True))
+                                    wm_text = str(cfg_now.get("WATERMARK_TEXT", "[CXH BOT]"))
                                     payload_text = f"{wm_text}\n\n{joined}" if wm_on else joined
                                     await send_chat_message(session_cookie, chat_id, payload_text)
                         except Exception:
@@ -965,21 +940,11 @@ async def _check_orders(session_cookie: str, db) -> None:
                     await send_order_notification(order, None)
                 except Exception:
                     pass
-            try:
-                user = order.get("user") or {}
-                buyer = user.get("username") or str(user.get("id") or "-")
-                total_price = order.get("basePrice") or order.get("totalPrice") or 0
-                offer = order.get("offerDetails") or {}
-                game = (offer.get("game") or {}).get("name") or "-"
-                category = (offer.get("category") or {}).get("name") or "-"
-                logging.getLogger("exfador.pretty.order").info(
-                    f"🛒 Новый заказ {order_id} | {buyer} | {game} / {category} | {total_price} ₽"
-                )
-            except Exception:
-                pass
+            logging.getLogger("exfador.pretty.order").info(
+                f"🛒 Новый заказ {order_id} | {order.buyer_label} | {order.game_name or '-'} / {order.category_name or '-'} | {order.price} ₽"
+            )
             await db.mark_order_notified(order_id)
-            cfg3 = load_config()
-            if cfg3.get("DEBUG", True):
+            if cfg_now.get("DEBUG", True):
                 logging.getLogger("exfador.monitor").info(
                     json.dumps(
                         {
@@ -991,15 +956,18 @@ async def _check_orders(session_cookie: str, db) -> None:
                     )
                 )
         except Exception as exc:
-            logging.getLogger("exfador.monitor").warning(f"order_notify_failed order_id={order.get('id')} error={exc}")
+            logging.getLogger("exfador.monitor").warning(f"order_notify_failed order_id={order.id} error={exc}")
+    if plugin_batch:
+        try:
+            await pm.dispatch_orders_created(plugin_batch)
+        except Exception:
+            pass
 
     for order in orders:
         try:
-            if not isinstance(order, dict):
-                continue
-            order_id = order.get("id")
-            status = order.get("status") or ""
-            if not order_id or status == "":
+            order_id = order.id
+            status = order.status
+            if status == "":
                 continue
             prev = await db.get_order_status(order_id)
             if prev is None:
@@ -1009,18 +977,8 @@ async def _check_orders(session_cookie: str, db) -> None:
                 await db.set_order_status(order_id, status)
                 if status == "COMPLETED":
                     await send_order_completed_notification(order)
-                    try:
-                        user = order.get("user") or {}
-                        buyer = user.get("username") or str(user.get("id") or "-")
-                        offer = order.get("offerDetails") or {}
-                        game = (offer.get("game") or {}).get("name") or "-"
-                        category = (offer.get("category") or {}).get("name") or "-"
-                        logging.getLogger("exfador.pretty.order").info(
-                            f"✅ Заказ завершён {order_id} | {buyer} | {game} / {category}"
-                        )
-                    except Exception:
-                        pass
+                    logging.getLogger("exfador.pretty.order").info(
+                        f"✅ Заказ завершён {order_id} | {order.buyer_label} | {order.game_name or '-'} / {order.category_name or '-'}"
+                    )
         except Exception as exc:
-            logging.getLogger("exfador.monitor").warning(f"order_complete_check_failed order_id={order.get('id')} error={exc}")
-
-
+            logging.getLogger("exfador.monitor").warning(f"order_complete_check_failed order_id={order.id} error={exc}")
@@ -3,8 +3,12 @@ import html
 import aiosqlite
 from aiogram import Bot
 from aiogram.client.default import DefaultBotProperties
-from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton, LinkPreviewOptions
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton, LinkPreviewOptions, BufferedInputFile
 
+import tg_bot_exfa.app as app
+from api.http_client import download_bytes
+from api.models import Lot, Order
 from tg_bot_exfa.config import load_config
 from version import VERSION
 from tg_bot_exfa.exf_langue.strings import Translations
@@ -183,15 +187,15 @@ async def send_auth_notification(success: bool, user: dict | None = None) -> Non
         await bot.session.close()
 
 
-async def send_bump_notification(lot: dict, success: bool) -> None:
+async def send_bump_notification(lot: Lot, success: bool) -> None:
     cfg = load_config()
     if not cfg.token:
         return
     bot = Bot(token=cfg.token, default=DefaultBotProperties(parse_mode="HTML"))
     try:
         recipients = await _recipients("notify_bump")
-        title = str(lot.get("title") or lot.get("url") or "Lot")
-        url = str(lot.get("url") or "")
+        title = str(lot.title or lot.url or "Lot")
+        url = str(lot.url or "")
         markup = None
         for _, lang in recipients[:1]:
             btn_text = tr.t(lang, "btn_open_link")
@@ -204,6 +208,137 @@ async def send_bump_notification(lot: dict, success: bool) -> None:
         await bot.session.close()
 
 
+BUMP_DIGEST_LINES_PER_PAGE = 30
+BUMP_DIGEST_LOTS_PER_PAGE = 20
+
+
+def render_bump_digest(report: dict, lang: str, view: str = "sum", page: int = 1) -> tuple[str, int, int]:
+    games = report.get("games") or []
+    lines_all: list[str] = []
+    if view == "lots":
+        per_page = BUMP_DIGEST_LOTS_PER_PAGE
+        for lot in report.get("lots") or []:
+            icon = "✅" if lot.get("success") else "⚠️"
+            title = html.escape(str(lot.get("title") or lot.get("url") or "Lot"))
+            url = str(lot.get("url") or "")
+            if url:
+                lines_all.append(f'{icon} <a href="{html.escape(url)}">{title}</a>')
+            else:
+                lines_all.append(f"{icon} {title}")
+        header = [tr.t(lang, "bump_digest_lots_title")]
+    else:
+        per_page = BUMP_DIGEST_LINES_PER_PAGE
+        ok = 0
+        fail = 0
+        lots_bumped = 0
+        for game in games:
+            lines_all.append(tr.t(lang, "bump_digest_game", game=html.escape(str(game.get("name") or game.get("game_id") or "-"))))
+            for cat in game.get("categories") or []:
+                success = bool(cat.get("success"))
+                if success:
+                    ok += 1
+                    lots_bumped += int(cat.get("lots") or 0)
+                else:
+                    fail += 1
+                lines_all.append(
+                    tr.t(
+                        lang,
+                        "bump_digest_category",
+                        icon="✅" if success else "⚠️",
+                        category=html.escape(str(cat.get("name") or cat.get("category_id") or "-")),
+                        lots=int(cat.get("lots") or 0),
+                    )
+                )
+        header = [tr.t(lang, "bump_digest_title"), tr.t(lang, "bump_digest_summary", ok=ok, fail=fail, lots=lots_bumped)]
+        late = report.get("late") or []
+        if late:
+            header.append(tr.t(lang, "bump_digest_late", count=len(late), late_s=max(int(x.get("late_s") or 0) for x in late)))
+    total_pages = max(1, (len(lines_all) + per_page - 1) // per_page)
+    page = max(1, min(int(page or 1), total_pages))
+    chunk = lines_all[(page - 1) * per_page : page * per_page]
+    lines = header + [""] + chunk
+    if total_pages > 1:
+        lines.append("")
+        lines.append(tr.t(lang, "templates_page", current=page, total=total_pages))
+    return "\n".join(lines), page, total_pages
+
+
+async def send_bump_digest(report: dict, report_id: int) -> None:
+    cfg = load_config()
+    if not cfg.token:
+        return
+    bot = Bot(token=cfg.token, default=DefaultBotProperties(parse_mode="HTML"))
+    try:
+        recipients = await _recipients("notify_bump")
+        if not recipients:
+            return
+        rendered: dict[str, tuple[str, InlineKeyboardMarkup]] = {}
+        for chat_id_, lang in recipients:
+            if lang not in rendered:
+                text, page, total_pages = render_bump_digest(report, lang, "sum", 1)
+                markup = kb.bump_digest(lambda k: tr.t(lang, k), report_id, "sum", page, total_pages).as_markup()
+                rendered[lang] = (text, markup)
+            text, markup = rendered[lang]
+            await bot.send_message(
+                chat_id_,
+                text,
+                reply_markup=markup,
+                link_preview_options=LinkPreviewOptions(is_disabled=True),
+            )
+    finally:
+        await bot.session.close()
+
+
+TG_FILE_CACHE_MAX = 1000
+
+
+class _ImageRelay:
+    def __init__(self, image_url: str):
+        self.image_url = image_url
+        self.file_id: str | None = None
+        self._looked_up = False
+        self._payload: bytes | None = None
+
+    async def _db_call(self, name: str, *args):
+        db = app.app_context.db if app.app_context else None
+        if db is None:
+            return None
+        try:
+            return await getattr(db, name)(*args)
+        except Exception:
+            return None
+
+    async def _upload(self, bot: Bot, chat_id: int, **kwargs):
+        if self._payload is None:
+            try:
+                self._payload, _ = await download_bytes(self.image_url)
+            except Exception:
+                self._payload = b""
+        if self._payload:
+            filename = os.path.basename(self.image_url.split("?", 1)[0]) or "image.png"
+            photo = BufferedInputFile(self._payload, filename=filename)
+        else:
+            photo = self.image_url
+        sent = await bot.send_photo(chat_id, photo, **kwargs)
+        if sent.photo:
+            self.file_id = sent.photo[-1].file_id
+            self._payload = None
+            await self._db_call("set_tg_file_id", self.image_url, self.file_id, TG_FILE_CACHE_MAX)
+        return sent
+
+    async def send(self, bot: Bot, chat_id: int, **kwargs):
+        if not self._looked_up:
+            self._looked_up = True
+            self.file_id = await self._db_call("get_tg_file_id", self.image_url)
+        if self.file_id:
+            try:
+                return await bot.send_photo(chat_id, self.file_id, **kwargs)
+            except TelegramBadRequest:
+                self.file_id = None
+                await self._db_call("delete_tg_file_id", self.image_url)
+        return await self._upload(bot, chat_id, **kwargs)
+
+
 async def send_chat_notification(username: str, text: str, chat_id: str, image_url: str | None = None) -> None:
     cfg = load_config()
     if not cfg.token:
@@ -213,15 +348,16 @@ async def send_chat_notification(username: str, text: str, chat_id: str, image_u
         recipients = await _recipients("notify_chat")
         if not recipients:
             return
+        relay = _ImageRelay(image_url) if image_url else None
         for chat_id_, lang in recipients:
             safe_username = html.escape(username)
             safe_text = html.escape(text)
             msg = tr.t(lang, "chat_notification", username=safe_username, text=safe_text)
             url = f"https://starvell.com/chat/{chat_id}"
             markup = kb.chat_notification(lambda k: tr.t(lang, k), chat_id, url).as_markup()
-            if image_url:
+            if relay is not None:
                 try:
-                    await bot.send_photo(chat_id_, image_url, caption=msg, reply_markup=markup)
+                    await relay.send(bot, chat_id_, caption=msg, reply_markup=markup)
                 except Exception:
                     await bot.send_message(chat_id_, f"{msg}\n{html.escape(image_url)}", reply_markup=markup)
             else:
@@ -230,7 +366,7 @@ async def send_chat_notification(username: str, text: str, chat_id: str, image_u
         await bot.session.close()
 
 
-async def send_order_notification(order: dict, ad: tuple[str, str] | None = None) -> None:
+async def send_order_notification(order: Order, ad: tuple[str, str] | None = None) -> None:
     cfg = load_config()
     if not cfg.token:
         return
@@ -239,9 +375,9 @@ async def send_order_notification(order: dict, ad: tuple[str, str] | None = None
         recipients = await _recipients("notify_orders")
         if not recipients:
             return
-        order_id = order.get("id")
-        qty = order.get("quantity") or 1
-        total_price = order.get("basePrice") or order.get("totalPrice") or 0
+        order_id = order.id
+        qty = order.quantity
+        total_price = order.price
         def _fmt_minor_rub(v) -> str:
             try:
                 iv = int(v)
@@ -252,42 +388,10 @@ async def send_order_notification(order: dict, ad: tuple[str, str] | None = None
                     return f"{fv/100:.2f}"
                 except Exception:
                     return "0.00"
-        user = order.get("user") or {}
-        buyer = user.get("username") or str(user.get("id") or "-")
-        offer = order.get("offerDetails") or {}
-        game = (offer.get("game") or {}).get("name") or "-"
-        category = (offer.get("category") or {}).get("name") or "-"
-        sub_category_name = ((offer.get("subCategory") or {}).get("name") or "").strip()
-        attrs = offer.get("attributes") or []
-        attr_values: list[str] = []
-        for attr in attrs:
-            try:
-                value = (attr or {}).get("value") or {}
-                name_ru = str(value.get("nameRu") or value.get("name") or "").strip()
-                if name_ru:
-                    attr_values.append(name_ru)
-            except Exception:
-                continue
-
-        product_parts: list[str] = []
-        if sub_category_name:
-            product_parts.append(sub_category_name)
-        if attr_values:
-            product_parts.append(", ".join(attr_values))
-
-        product = ", ".join(product_parts).strip()
-
-        if not product:
-            offer_obj = (offer.get("offer") or {})
-            des_rus = ((offer.get("descriptions") or {}).get("rus") or {})
-            product = (
-                str(des_rus.get("briefDescription") or "").strip()
-                or str(des_rus.get("description") or "").strip()
-                or str(offer_obj.get("name") or "").strip()
-                or str(offer.get("name") or "").strip()
-                or str(offer.get("title") or "").strip()
-                or "-"
-            )
+        buyer = order.buyer_label
+        game = order.game_name or "-"
+        category = order.category_name or "-"
+        product = order.product
         url = f"https://starvell.com/order/{order_id}"
         order_text_by_lang: dict[str, str] = {}
         for chat_id_, lang in recipients:
@@ -315,7 +419,7 @@ async def send_order_notification(order: dict, ad: tuple[str, str] | None = None
         await bot.session.close()
 
 
-async def send_order_completed_notification(order: dict) -> None:
+async def send_order_completed_notification(order: Order) -> None:
     cfg = load_config()
     if not cfg.token:
         return
@@ -324,9 +428,9 @@ async def send_order_completed_notification(order: dict) -> None:
         recipients = await _recipients("notify_chat")
         if not recipients:
             return
-        order_id = order.get("id")
-        qty = order.get("quantity") or 1
-        total_price = order.get("basePrice") or order.get("totalPrice") or 0
+        order_id = order.id
+        qty = order.quantity
+        total_price = order.price
         def _fmt_minor_rub(v) -> str:
             try:
                 iv = int(v)
@@ -337,11 +441,9 @@ async def send_order_completed_notification(order: dict) -> None:
                     return f"{fv/100:.2f}"
                 except Exception:
                     return "0.00"
-        user = order.get("user") or {}
-        buyer = user.get("username") or str(user.get("id") or "-")
-        offer = order.get("offerDetails") or {}
-        game = (offer.get("game") or {}).get("name") or "-"
-        category = (offer.get("category") or {}).get("name") or "-"
+        buyer = order.buyer_label
+        game = order.game_name or "-"
+        category = order.category_name or "-"
         url = f"https://starvell.com/order/{order_id}"
         for chat_id_, lang in recipients:
             text = tr.t(
@@ -454,10 +556,11 @@ async def sync_digest_view(payload: dict) -> None:
         text = str(payload.get("text") or "").strip()
         pin_flag = bool(payload.get("pin"))
 
+        relay = _ImageRelay(photo_url) if photo_url else None
         for chat_id_, _lang in recipients:
             try:
-                if photo_url:
-                    msg = await bot.send_photo(chat_id_, photo_url, caption=text or None, reply_markup=markup)
+                if relay is not None:
+                    msg = await relay.send(bot, chat_id_, caption=text or None, reply_markup=markup)
                 else:
                     msg = await bot.send_message(chat_id_, text or "", reply_markup=markup, link_preview_options=LinkPreviewOptions(is_disabled=True))
                 if pin_flag:
@@ -489,3 +592,23 @@ async def send_update_available(tag_name: str, current_version: str) -> None:
     finally:
         await bot.session.close()
 
+
+async def send_loop_lag_alert(lag_ms: float, p50_ms: float, p99_ms: float, stack: str | None = None) -> None:
+    cfg = load_config()
+    if not cfg.token:
+        return
+    bot = Bot(token=cfg.token, default=DefaultBotProperties(parse_mode="HTML"))
+    try:
+        recipients = await _recipients_authorized()
+        if not recipients:
+            return
+        stack_tail = ""
+        if stack:
+            stack_tail = "\n".join(stack.strip().splitlines()[-16:])[-3000:]
+        for chat_id_, lang in recipients:
+            text = tr.t(lang, "loop_lag_alert", lag_ms=int(lag_ms), p50=f"{p50_ms:.1f}", p99=f"{p99_ms:.1f}")
+            if stack_tail:
+                text = f"{text}\n<pre>{html.escape(stack_tail)}</pre>"
+            await bot.send_message(chat_id_, text)
+    finally:
+        await bot.session.close()
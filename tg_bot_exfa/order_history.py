@@ -0,0 +1,80 @@
+import logging
+from contextlib import aclosing
+from typing import Any
+
+from api.models import Order
+from api.orders import SellsPageError, iter_sells
+
+
+BACKFILL_KEY = "orders_backfill_done"
+BACKFILL_PAGE_KEY = "orders_backfill_page"
+
+
+def order_row(order: Any) -> dict[str, Any] | None:
+    if isinstance(order, dict):
+        order = Order.from_api(order)
+    if not isinstance(order, Order) or not order.status or order.created_at is None:
+        return None
+    return {
+        "order_id": order.id,
+        "status": order.status,
+        "created_at": order.created_at,
+        "price": order.total,
+        "game_id": order.game_id,
+        "game_name": order.game_name,
+        "category_id": order.category_id,
+        "category_name": order.category_name,
+        "buyer_id": order.buyer_id,
+        "buyer_name": order.buyer_name,
+    }
+
+
+async def ingest_orders(db, orders: list[Any]) -> list[tuple[dict[str, Any], str | None]]:
+    rows = [r for r in (order_row(o) for o in orders or []) if r is not None]
+    return await db.upsert_orders(rows)
+
+
+async def is_backfilled(db) -> bool:
+    return (await db.get_sync_state(BACKFILL_KEY)) == "1"
+
+
+async def sync_orders(session_cookie: str, db, max_pages: int = 200) -> int:
+    log = logging.getLogger("exfador.orders")
+    backfilled = await is_backfilled(db)
+    open_since = await db.oldest_open_order_ts() if backfilled else None
+    start_page = 1
+    if not backfilled:
+        try:
+            start_page = max(1, int(await db.get_sync_state(BACKFILL_PAGE_KEY) or 1))
+        except Exception:
+            start_page = 1
+    changed_total = 0
+    pages = 0
+    last_page = start_page - 1
+    try:
+        pager = iter_sells(session_cookie, start_page=start_page, max_pages=max_pages, prefetch=not backfilled)
+        async with aclosing(pager):
+            async for page, orders in pager:
+                pages += 1
+                last_page = page
+                changed = await ingest_orders(db, orders)
+                changed_total += len(changed)
+                if not backfilled:
+                    await db.set_sync_state(BACKFILL_PAGE_KEY, str(page + 1))
+                    continue
+                if not changed:
+                    stamps = [r["created_at"] for r in (order_row(o) for o in orders) if r is not None]
+                    oldest = min(stamps) if stamps else None
+                    if open_since is None or oldest is None or oldest <= open_since:
+                        break
+    except SellsPageError as exc:
+        log.warning(f"orders_sync_interrupted page={exc.page} pages={pages} changed={changed_total} error={exc.error}")
+        return changed_total
+    if not backfilled:
+        if last_page >= start_page + max_pages - 1:
+            log.info(f"orders_backfill_continues next_page={last_page + 1} changed={changed_total}")
+            return changed_total
+        await db.set_sync_state(BACKFILL_KEY, "1")
+        await db.set_sync_state(BACKFILL_PAGE_KEY, "1")
+    log.info(f"orders_sync pages={pages} changed={changed_total} backfill={not backfilled}")
+    return changed_total
@@ -1,3 +1,4 @@
-from .manager import PluginManager, PluginContext
-
-
+from .manager import PluginManager, PluginContext, PluginEventContext
+from .client import PluginBudget, StarvellClient
+from .kv import KVStore, PluginKV
+from .scheduler import PluginScheduler, ScheduledJob
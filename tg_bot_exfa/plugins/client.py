@@ -0,0 +1,206 @@
+import asyncio
+import time
+from typing import Any
+
+from api.bump import bump_categories
+from api.chats import fetch_chats
+from api.find_lots_user import find_user_lots
+from api.messages import fetch_chat_messages
+from api.offer_details import fetch_offer_detail
+from api.orders import fetch_sells, refund_order
+from api.send_message import send_chat_image, send_chat_message
+from tg_bot_exfa.config import get_config
+from tg_bot_exfa.session_context import session_context
+
+
+class _Abandoned(Exception):
+	pass
+
+
+_cache: dict[tuple, tuple[float, Any]] = {}
+_inflight: dict[tuple, asyncio.Future] = {}
+
+
+class PluginBudget:
+	def __init__(self, per_minute: float):
+		self.per_minute = max(1.0, float(per_minute))
+		self.capacity = max(1.0, self.per_minute / 4.0)
+		self.requests = 0
+		self.cache_hits = 0
+		self.waited_s = 0.0
+		self._tokens = self.capacity
+		self._stamp = time.monotonic()
+		self._lock = asyncio.Lock()
+
+	def _refill(self) -> None:
+		now = time.monotonic()
+		self._tokens = min(self.capacity, self._tokens + (now - self._stamp) * self.per_minute / 60.0)
+		self._stamp = now
+
+	def delay(self) -> float:
+		self._refill()
+		return 0.0 if self._tokens >= 1.0 else (1.0 - self._tokens) * 60.0 / self.per_minute
+
+	async def acquire(self) -> None:
+		async with self._lock:
+			self._refill()
+			if self._tokens < 1.0:
+				delay = (1.0 - self._tokens) * 60.0 / self.per_minute
+				self.waited_s += delay
+				await asyncio.sleep(delay)
+				self._refill()
+			self._tokens -= 1.0
+			self.requests += 1
+
+
+class StarvellClient:
+	def __init__(self, budget: PluginBudget, cache_ttl: float = 5.0):
+		self.budget = budget
+		self.cache_ttl = max(0.0, float(cache_ttl))
+
+	async def _auth(self) -> tuple[str, Any]:
+		cookie = str(get_config().get("SESSION_COOKIE", "") or "")
+		snap = await session_context.ensure(cookie) if cookie else None
+		return cookie, snap
+
+	async def _cached(self, key: tuple, factory) -> Any:
+		while True:
+			hit = _cache.get(key)
+			if hit is not None and hit[0] > time.monotonic():
+				self.budget.cache_hits += 1
+				return hit[1]
+			pending = _inflight.get(key)
+			if pending is None:
+				break
+			try:
+				value = await asyncio.shield(pending)
+			except _Abandoned:
+				continue
+			self.budget.cache_hits += 1
+			return value
+		fut = asyncio.get_running_loop().create_future()
+		_inflight[key] = fut
+		try:
+			value = await self._call(factory)
+			now = time.monotonic()
+			if len(_cache) >= 512:
+				for k in [k for k, (exp, _) in _cache.items() if exp <= now]:
+					_cache.pop(k, None)
+			_cache[key] = (now + self.cache_ttl, value)
+			fut.set_result(value)
+			return value
+		except asyncio.CancelledError:
+			fut.set_exception(_Abandoned())
+			fut.exception()
+			raise
+		except Exception as e:
+			fut.set_exception(e)
+			fut.exception()
+			raise
+		finally:
+			if _inflight.get(key) is fut:
+				_inflight.pop(key, None)
+
+	async def _call(self, factory) -> Any:
+		await self.budget.acquire()
+		return await factory()
+
+	def _forget(self, *prefixes: tuple) -> None:
+		for key in [k for k in _cache if any(k[: len(p)] == p for p in prefixes)]:
+			_cache.pop(key, None)
+
+	async def fetch_chats(self) -> dict:
+		cookie, snap = await self._auth()
+		my_games = snap.my_games if snap else None
+		return await self._cached(("chats", cookie), lambda: fetch_chats(cookie, my_games_cookie=my_games))
+
+	async def fetch_messages(self, chat_id: str, limit: int = 50, interlocutor_id: int | None = None) -> list[dict]:
+		cookie, snap = await self._auth()
+		my_games = snap.my_games if snap else None
+		return await self._cached(
+			("messages", cookie, str(chat_id), int(limit)),
+			lambda: fetch_chat_messages(cookie, chat_id, limit=limit, my_games_cookie=my_games, interlocutor_id=interlocutor_id),
+		)
+
+	async def send_message(self, chat_id: str, text: str) -> dict:
+		cookie, snap = await self._auth()
+		my_games = snap.my_games if snap else None
+		result = await self._call(lambda: send_chat_message(cookie, chat_id, text, my_games_cookie=my_games))
+		self._forget(("messages", cookie, str(chat_id)), ("chats", cookie))
+		return result
+
+	async def send_image(
+		self,
+		chat_id: str,
+		image_bytes: bytes,
+		filename: str = "image.png",
+		content_type: str = "image/png",
+		content: str | None = None,
+	) -> dict:
+		cookie, snap = await self._auth()
+		result = await self._call(
+			lambda: send_chat_image(
+				cookie,
+				chat_id,
+				image_bytes,
+				filename=filename,
+				content_type=content_type,
+				content=content,
+				sid_cookie=snap.sid if snap else None,
+				my_games_cookie=snap.my_games if snap else None,
+			)
+		)
+		self._forget(("messages", cookie, str(chat_id)), ("chats", cookie))
+		return result
+
+	async def fetch_sells(self, page: int | None = None) -> dict:
+		cookie, snap = await self._auth()
+		my_games = snap.my_games if snap else None
+		return await self._cached(("sells", cookie, page), lambda: fetch_sells(cookie, page=page, my_games_cookie=my_games))
+
+	async def fetch_offer(self, offer_id: int) -> dict:
+		cookie, snap = await self._auth()
+		return await self._cached(
+			("offer", cookie, int(offer_id)),
+			lambda: fetch_offer_detail(
+				cookie,
+				int(offer_id),
+				snap.sid if snap else None,
+				my_games_cookie=snap.my_games if snap else None,
+			),
+		)
+
+	async def find_lots(self) -> dict:
+		cookie, snap = await self._auth()
+		if snap is None or snap.user_id is None:
+			return {}
+		return await self._cached(
+			("lots", cookie),
+			lambda: find_user_lots(cookie, snap.sid or "", snap.user_id, my_games_cookie=snap.my_games),
+		)
+
+	async def bump(self, game_id: int, category_ids: list[int], referer: str | None = None) -> dict:
+		cookie, snap = await self._auth()
+		return await self._call(
+			lambda: bump_categories(
+				cookie,
+				snap.sid if snap else None,
+				game_id,
+				category_ids,
+				referer,
+				my_games_cookie=snap.my_games if snap else None,
+			)
+		)
+
+	async def refund(self, order_id: str) -> dict:
+		cookie, snap = await self._auth()
+		result = await self._call(
+			lambda: refund_order(
+				cookie,
+				order_id,
+				sid_cookie=snap.sid if snap else None,
+				my_games_cookie=snap.my_games if snap else None,
+			)
+		)
+		self._forget(("sells", cookie))
+		return result
@@ -0,0 +1,161 @@
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any
+
+
+class KVStore:
+	def __init__(self, db: Any, flush_interval: float = 1.0, cache_size: int = 4096, purge_interval: float = 600.0):
+		self.db = db
+		self.flush_interval = max(0.0, float(flush_interval))
+		self.cache_size = max(16, int(cache_size))
+		self.purge_interval = max(60.0, float(purge_interval))
+		self.hits = 0
+		self.misses = 0
+		self.writes = 0
+		self.flushes = 0
+		self._cache: OrderedDict[tuple[str, str], tuple[str | None, float | None]] = OrderedDict()
+		self._dirty: dict[tuple[str, str], tuple[str | None, float | None]] = {}
+		self._flushing: dict[tuple[str, str], tuple[str | None, float | None]] = {}
+		self._rmw = asyncio.Lock()
+		self._flush_lock = asyncio.Lock()
+		self._flush_task: asyncio.Task | None = None
+		self._purged_at = time.monotonic()
+		self._log = logging.getLogger("exfador.plugins")
+
+	def _pending(self, k: tuple[str, str]) -> tuple[str | None, float | None] | None:
+		entry = self._cache.get(k)
+		if entry is not None:
+			self._cache.move_to_end(k)
+			return entry
+		return self._dirty.get(k) or self._flushing.get(k)
+
+	def _remember(self, k: tuple[str, str], entry: tuple[str | None, float | None]) -> None:
+		self._cache[k] = entry
+		self._cache.move_to_end(k)
+		while len(self._cache) > self.cache_size:
+			self._cache.popitem(last=False)
+
+	async def _lookup(self, namespace: str, key: str) -> tuple[str, float | None] | None:
+		k = (namespace, key)
+		entry = self._pending(k)
+		if entry is None:
+			self.misses += 1
+			row = await self.db.kv_get(namespace, key)
+			entry = self._pending(k)
+			if entry is None:
+				entry = (row[0], row[1]) if row else (None, None)
+				self._remember(k, entry)
+		else:
+			self.hits += 1
+		text, expires_at = entry
+		if text is None or (expires_at is not None and expires_at <= time.time()):
+			return None
+		return text, expires_at
+
+	def _put(self, namespace: str, key: str, text: str | None, expires_at: float | None) -> None:
+		k = (namespace, key)
+		self._remember(k, (text, expires_at))
+		self._dirty[k] = (text, expires_at)
+		self.writes += 1
+		if self._flush_task is None or self._flush_task.done():
+			self._flush_task = asyncio.get_running_loop().create_task(self._flush_later())
+
+	async def _flush_later(self) -> None:
+		await asyncio.sleep(self.flush_interval)
+		await self.flush()
+
+	async def get(self, namespace: str, key: str, default: Any = None) -> Any:
+		entry = await self._lookup(namespace, key)
+		return json.loads(entry[0]) if entry else default
+
+	async def set(self, namespace: str, key: str, value: Any, ttl: float | None = None) -> None:
+		text = json.dumps(value, ensure_ascii=False)
+		self._put(namespace, key, text, time.time() + float(ttl) if ttl else None)
+
+	async def delete(self, namespace: str, key: str) -> None:
+		self._put(namespace, key, None, None)
+
+	async def incr(self, namespace: str, key: str, amount: int | float = 1, ttl: float | None = None) -> int | float:
+		async with self._rmw:
+			entry = await self._lookup(namespace, key)
+			current = json.loads(entry[0]) if entry else 0
+			if isinstance(current, bool) or not isinstance(current, (int, float)):
+				raise TypeError(f"kv value {key!r} is not a number")
+			value = current + amount
+			expires_at = time.time() + float(ttl) if ttl else (entry[1] if entry else None)
+			self._put(namespace, key, json.dumps(value), expires_at)
+			return value
+
+	async def expire(self, namespace: str, key: str, ttl: float | None) -> bool:
+		entry = await self._lookup(namespace, key)
+		if entry is None:
+			return False
+		if ttl is not None and float(ttl) <= 0:
+			self._put(namespace, key, None, None)
+		else:
+			self._put(namespace, key, entry[0], time.time() + float(ttl) if ttl else None)
+		return True
+
+	async def scan(self, namespace: str, prefix: str = "", limit: int = 100) -> list[tuple[str, Any]]:
+		await self.flush()
+		rows = await self.db.kv_scan(namespace, prefix, limit)
+		return [(key, json.loads(text)) for key, text, _ in rows]
+
+	async def flush(self) -> None:
+		async with self._flush_lock:
+			if self._dirty:
+				self._flushing, self._dirty = self._dirty, {}
+				upserts = [(ns, key, text, exp) for (ns, key), (text, exp) in self._flushing.items() if text is not None]
+				deletes = [(ns, key) for (ns, key), (text, _) in self._flushing.items() if text is None]
+				try:
+					await self.db.kv_write(upserts, deletes)
+					self.flushes += 1
+				except Exception as e:
+					for k, entry in self._flushing.items():
+						self._dirty.setdefault(k, entry)
+					self._log.warning("plugin_kv_flush_failed keys=%d error=%s", len(self._flushing), e)
+				finally:
+					self._flushing = {}
+			if time.monotonic() - self._purged_at >= self.purge_interval:
+				self._purged_at = time.monotonic()
+				try:
+					removed = await self.db.kv_purge_expired()
+					if removed:
+						self._log.info("plugin_kv_purged removed=%d", removed)
+				except Exception as e:
+					self._log.warning("plugin_kv_purge_failed error=%s", e)
+
+	async def close(self) -> None:
+		task, self._flush_task = self._flush_task, None
+		if task is not None and not task.done():
+			task.cancel()
+		await self.flush()
+
+
+class PluginKV:
+	__slots__ = ("store", "namespace")
+
+	def __init__(self, store: KVStore, namespace: str):
+		self.store = store
+		self.namespace = namespace
+
+	async def get(self, key: str, default: Any = None) -> Any:
+		return await self.store.get(self.namespace, str(key), default)
+
+	async def set(self, key: str, value: Any, ttl: float | None = None) -> None:
+		await self.store.set(self.namespace, str(key), value, ttl)
+
+	async def delete(self, key: str) -> None:
+		await self.store.delete(self.namespace, str(key))
+
+	async def incr(self, key: str, amount: int | float = 1, ttl: float | None = None) -> int | float:
+		return await self.store.incr(self.namespace, str(key), amount, ttl)
+
+	async def expire(self, key: str, ttl: float | None) -> bool:
+		return await self.store.expire(self.namespace, str(key), ttl)
+
+	async def scan(self, prefix: str = "", limit: int = 100) -> list[tuple[str, Any]]:
+		return await self.store.scan(self.namespace, str(prefix), limit)
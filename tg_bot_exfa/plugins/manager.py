@@ -1,14 +1,31 @@
 import asyncio
+import cProfile
+import functools
+import hashlib
 import importlib.util
+import io
 import json
+import multiprocessing
 import os
-from dataclasses import dataclass
+import pstats
+import threading
+import types
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
 from types import ModuleType
 from typing import Any
 import logging
 import re
 import sys
+import time
 
+from tg_bot_exfa.config import get_config
+
+from .client import PluginBudget, StarvellClient
+from .kv import KVStore, PluginKV
+from .scheduler import PluginScheduler, ScheduledJob, parse_jobs
+from .subscriptions import Subscription, SubscriptionIndex
 
 @dataclass
 class PluginMeta:
@@ -21,22 +38,231 @@ class PluginMeta:
 	module: ModuleType | None
 	enabled: bool
 	load_error: str | None = None
+	auto_disabled: str | None = None
+	deferred: bool = False
+	load_ms: float | None = None
+
+
+@dataclass(slots=True)
+class PluginStats:
+	calls: int = 0
+	errors: int = 0
+	timeouts: int = 0
+	consecutive_timeouts: int = 0
+	total_ms: float = 0.0
+	max_ms: float = 0.0
+	cpu_ms: float = 0.0
+	last_error: str | None = None
+	samples: deque = field(default_factory=lambda: deque(maxlen=512))
+
+	@property
+	def avg_ms(self) -> float:
+		return self.total_ms / self.calls if self.calls else 0.0
+
+	def percentile(self, q: float) -> float:
+		if not self.samples:
+			return 0.0
+		ordered = sorted(self.samples)
+		return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+	@property
+	def p50_ms(self) -> float:
+		return self.percentile(0.5)
+
+	@property
+	def p95_ms(self) -> float:
+		return self.percentile(0.95)
+
+
+@dataclass(slots=True)
+class ProfileCapture:
+	uuid: str
+	limit: int
+	every: int
+	seen: int = 0
+	captured: int = 0
+	profile: cProfile.Profile = field(default_factory=cProfile.Profile)
+	lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+def _measured(fn, capture: ProfileCapture | None, *args, **kwargs):
+	prof = capture.profile if capture is not None and capture.lock.acquire(blocking=False) else None
+	started = time.thread_time()
+	try:
+		if prof is not None:
+			capture.captured += 1
+			prof.enable()
+		try:
+			result = fn(*args, **kwargs)
+		finally:
+			if prof is not None:
+				prof.disable()
+	finally:
+		if prof is not None:
+			capture.lock.release()
+	return result, time.thread_time() - started
+
+
+@types.coroutine
+def _profiled(coro, capture: ProfileCapture):
+	if not capture.lock.acquire(blocking=False):
+		return (yield from coro.__await__())
+	capture.captured += 1
+	value, error = None, None
+	try:
+		while True:
+			capture.profile.enable()
+			try:
+				yielded = coro.throw(error) if error is not None else coro.send(value)
+			except StopIteration as e:
+				return e.value
+			finally:
+				capture.profile.disable()
+			try:
+				value, error = (yield yielded), None
+			except BaseException as e:
+				value, error = None, e
+	finally:
+		capture.lock.release()
 
 
 class PluginContext:
-	def __init__(self, session_cookie: str, db: Any, config: dict[str, Any]):
-		self.session_cookie = session_cookie
+	def __init__(
+		self,
+		session_cookie: str | None = None,
+		db: Any = None,
+		config: dict[str, Any] | None = None,
+		uuid: str | None = None,
+		api: StarvellClient | None = None,
+		kv: PluginKV | None = None,
+		scheduler: PluginScheduler | None = None,
+	):
+		self._session_cookie = session_cookie
+		self._config = config
 		self.db = db
-		self.config = config
+		self.uuid = uuid
+		self.api = api
+		self.kv = kv
+		self.scheduler = scheduler
+
+	@property
+	def config(self) -> Any:
+		return self._config if self._config is not None else get_config()
+
+	@config.setter
+	def config(self, value: Any) -> None:
+		self._config = value
+
+	@property
+	def session_cookie(self) -> str:
+		if self._session_cookie is not None:
+			return self._session_cookie
+		return str(self.config.get("SESSION_COOKIE", "") or "")
+
+	@session_cookie.setter
+	def session_cookie(self, value: str | None) -> None:
+		self._session_cookie = value
+
+	def schedule(
+		self,
+		interval: float,
+		fn: Any,
+		jitter: float = 0.0,
+		priority: int = 0,
+		name: str | None = None,
+	) -> ScheduledJob:
+		if self.scheduler is None or self.uuid is None:
+			raise RuntimeError("scheduler is not available")
+		return self.scheduler.add(self.uuid, fn, interval, jitter=jitter, priority=priority, name=name)
+
+	def unschedule(self, job: ScheduledJob) -> None:
+		if self.scheduler is not None:
+			self.scheduler.cancel(job)
+
+	def __getstate__(self) -> dict[str, Any]:
+		state = dict(self.__dict__)
+		state["db"] = None
+		state["api"] = None
+		state["kv"] = None
+		state["scheduler"] = None
+		state["_session_cookie"] = self.session_cookie
+		try:
+			state["_config"] = dict(self.config or {})
+		except Exception:
+			state["_config"] = {}
+		return state
+
+	def __setstate__(self, state: dict[str, Any]) -> None:
+		self.__dict__.update(state)
+
+
+class PluginEventContext:
+	def __init__(self, base: PluginContext, **extras: Any):
+		self._base = base
+		self.__dict__.update(extras)
+
+	def __getattr__(self, name: str) -> Any:
+		if name.startswith("__") or name == "_base":
+			raise AttributeError(name)
+		return getattr(self._base, name)
 
 
 class PluginManager:
-	def __init__(self, root_dir: str, state_path: str):
+	def __init__(
+		self,
+		root_dir: str,
+		state_path: str,
+		timeout: float = 15.0,
+		breaker_threshold: int = 3,
+		background: bool = False,
+		thread_workers: int = 8,
+		max_concurrency: int = 4,
+		process_workers: int = 2,
+		api_per_minute: float = 20,
+		api_budgets: dict[str, Any] | None = None,
+		profile_calls: int = 20,
+		profile_every: int = 1,
+		kv_flush_interval: float = 1.0,
+		kv_cache_size: int = 4096,
+		scheduler_concurrency: int = 4,
+		parallel_import: bool = False,
+	):
 		self.root_dir = root_dir
 		self.state_path = state_path
+		self.timeout = max(0.1, float(timeout))
+		self.breaker_threshold = max(1, int(breaker_threshold))
+		self.background = bool(background)
+		self.max_concurrency = max(1, int(max_concurrency))
+		self.process_workers = max(1, int(process_workers))
+		self.parallel_import = bool(parallel_import)
+		self._executor = ThreadPoolExecutor(max_workers=max(1, int(thread_workers)), thread_name_prefix="plugin")
+		self._process_executor: ProcessPoolExecutor | None = None
+		self.process_capable = multiprocessing.get_start_method() == "fork"
+		self._semaphores: dict[str, asyncio.Semaphore] = {}
+		self.api_per_minute = api_per_minute
+		self.api_budgets = dict(api_budgets or {})
+		self.db: Any = None
+		self.kv: KVStore | None = None
+		self.kv_flush_interval = kv_flush_interval
+		self.kv_cache_size = kv_cache_size
+		self.scheduler = PluginScheduler(self._run_job, budget_for=self._budget_for, concurrency=scheduler_concurrency)
+		self._contexts: dict[str, PluginContext] = {}
+		self._mtimes: dict[str, tuple[int, int]] = {}
+		self.stats: dict[str, PluginStats] = {}
+		self.profile_calls = max(1, int(profile_calls))
+		self.profile_every = max(1, int(profile_every))
+		self.profiling: ProfileCapture | None = None
+		self.profile_reports: dict[str, str] = {}
+		self._background_tasks: set[asyncio.Task] = set()
 		self.plugins: dict[str, PluginMeta] = {}
 		self.order_handlers: list[tuple[str, Any]] = []
 		self.message_handlers: list[tuple[str, Any]] = []
+		self.subscriptions = SubscriptionIndex()
+		self._order_by_uuid: dict[str, list[Any]] = {}
+		self._message_by_uuid: dict[str, list[Any]] = {}
+		self._order_batch_by_uuid: dict[str, list[Any]] = {}
+		self._message_batch_by_uuid: dict[str, list[Any]] = {}
+		self._seq: dict[str, int] = {}
 		self.disabled: set[str] = set()
 		self.commands: dict[str, dict[str, Any]] = {}
 		self._logger = logging.getLogger("exfador.plugins")
@@ -50,6 +276,10 @@ class PluginManager:
 			abs_plugins = os.path.abspath(self.root_dir)
 			if abs_plugins not in sys.path:
 				sys.path.insert(0, abs_plugins)
+			if "plugins" not in sys.modules:
+				_pkg = types.ModuleType("plugins")
+				_pkg.__path__ = [abs_plugins]
+				sys.modules["plugins"] = _pkg
 		except Exception:
 			pass
 
@@ -75,20 +305,6 @@ class PluginManager:
 		os.replace(tmp_path, self.state_path)
 
 	def _import_module_from_file(self, file_path: str) -> ModuleType:
-		try:
-			plugin_dir = os.path.abspath(os.path.dirname(file_path))
-			if plugin_dir and plugin_dir not in sys.path:
-				sys.path.insert(0, plugin_dir)
-			abs_plugins = os.path.abspath(self.root_dir)
-			if abs_plugins not in sys.path:
-				sys.path.insert(0, abs_plugins)
-			if "plugins" not in sys.modules:
-				import types as _types
-				_pkg = _types.ModuleType("plugins")
-				_pkg.__path__ = [abs_plugins]
-				sys.modules["plugins"] = _pkg
-		except Exception:
-			pass
 		stem = os.path.splitext(os.path.basename(file_path))[0]
 		mod_name = f"plugins.{stem}"
 		spec = importlib.util.spec_from_file_location(mod_name, file_path)
@@ -99,21 +315,71 @@ class PluginManager:
 		spec.loader.exec_module(module)
 		return module
 
-	def _extract_meta_text(self, file_path: str) -> dict[str, str]:
+	def _extract_meta_text(self, file_path: str) -> dict[str, Any]:
 		try:
 			with open(file_path, "r", encoding="utf-8") as f:
 				text = f.read(10000)
 		except Exception:
 			return {}
 		pat = re.compile(r'^\s*(NAME|UUID|VERSION|DESCRIPTION|CREDITS)\s*=\s*[\'"](.+?)[\'"]\s*$', re.MULTILINE)
-		data: dict[str, str] = {}
+		data: dict[str, Any] = {}
 		for m in pat.finditer(text):
 			k = m.group(1)
 			v = m.group(2)
 			if k and v:
 				data[k] = v
+		flag = re.search(r"^\s*PARALLEL_IMPORT\s*=\s*(True|False)\s*$", text, re.MULTILINE)
+		if flag:
+			data["parallel_import"] = flag.group(1) == "True"
 		return data
 
+	@property
+	def manifest_path(self) -> str:
+		return os.path.join(os.path.dirname(self.state_path) or ".", "manifest.json")
+
+	def _load_manifest(self) -> dict[str, dict[str, Any]]:
+		try:
+			with open(self.manifest_path, "r", encoding="utf-8") as f:
+				data = json.load(f) or {}
+			return data if isinstance(data, dict) else {}
+		except Exception:
+			return {}
+
+	def _save_manifest(self, data: dict[str, dict[str, Any]]) -> None:
+		try:
+			tmp_path = self.manifest_path + ".tmp"
+			with open(tmp_path, "w", encoding="utf-8") as f:
+				json.dump(data, f, ensure_ascii=False, indent=2)
+			os.replace(tmp_path, self.manifest_path)
+		except Exception as e:
+			self._logger.warning("plugin_manifest_save_failed error=%s", e)
+
+	def _scan_meta(self, file_path: str, manifest: dict[str, dict[str, Any]]) -> dict[str, Any]:
+		sig = self._file_sig(file_path)
+		entry = manifest.get(file_path)
+		if entry and sig is not None and (entry.get("mtime_ns"), entry.get("size")) == sig:
+			return entry
+		try:
+			with open(file_path, "rb") as f:
+				digest = hashlib.sha1(f.read()).hexdigest()
+		except Exception:
+			digest = None
+		if entry and digest and entry.get("sha1") == digest:
+			entry = dict(entry)
+		else:
+			entry = {"sha1": digest, **self._extract_meta_text(file_path)}
+		if sig is not None:
+			entry["mtime_ns"], entry["size"] = sig
+		return entry
+
+	def _timed_import(self, file_path: str) -> tuple[ModuleType | None, Exception | None, float]:
+		started = time.perf_counter()
+		try:
+			module = self._import_module_from_file(file_path)
+			return module, None, (time.perf_counter() - started) * 1000.0
+		except Exception as e:
+			return None, e, (time.perf_counter() - started) * 1000.0
+
 	def _validate_module(self, module: ModuleType) -> tuple[str, str, str, str, str | None]:
 		name = getattr(module, "NAME", None)
 		uuid = getattr(module, "UUID", None)
@@ -205,6 +471,7 @@ class PluginManager:
 				for fn in bind_orders:
 					if callable(fn):
 						self.order_handlers.append((uuid, fn))
+						self._order_by_uuid.setdefault(uuid, []).append(fn)
 		except Exception:
 			pass
 		try:
@@ -213,79 +480,241 @@ class PluginManager:
 				for fn in bind_messages:
 					if callable(fn):
 						self.message_handlers.append((uuid, fn))
+						self._message_by_uuid.setdefault(uuid, []).append(fn)
 		except Exception:
 			pass
+		for attr, target in (
+			("NEW_ORDERS_BATCH_CXH", self._order_batch_by_uuid),
+			("NEW_MESSAGES_BATCH_CXH", self._message_batch_by_uuid),
+		):
+			bind_batch = getattr(module, attr, None)
+			if isinstance(bind_batch, (list, tuple)):
+				for fn in bind_batch:
+					if callable(fn):
+						target.setdefault(uuid, []).append(fn)
+		try:
+			specs = parse_jobs(getattr(module, "SCHEDULED_CXH", None))
+			if specs and uuid in self.disabled:
+				self.scheduler.pause(uuid)
+			for spec in specs:
+				self.scheduler.add(
+					uuid,
+					spec["fn"],
+					spec.get("interval", 60),
+					jitter=spec.get("jitter", 0),
+					priority=spec.get("priority", 0),
+					name=spec.get("name"),
+				)
+		except Exception as e:
+			self._logger.warning("plugin_jobs_invalid uuid=%s error=%s", uuid, e)
+		self._seq.setdefault(uuid, len(self._seq))
+		try:
+			sub = Subscription.from_module(module)
+		except Exception as e:
+			self._logger.warning("plugin_subscriptions_invalid uuid=%s error=%s", uuid, e)
+			sub = Subscription()
+		self.subscriptions.add(uuid, sub)
 
 	def _unregister_handlers_by_uuid(self, uuid: str) -> None:
 		self.order_handlers = [(u, fn) for (u, fn) in self.order_handlers if u != uuid]
 		self.message_handlers = [(u, fn) for (u, fn) in self.message_handlers if u != uuid]
+		self._order_by_uuid.pop(uuid, None)
+		self._message_by_uuid.pop(uuid, None)
+		self._order_batch_by_uuid.pop(uuid, None)
+		self._message_batch_by_uuid.pop(uuid, None)
+		self.subscriptions.remove(uuid)
+		self.scheduler.remove_plugin(uuid)
+
+	def _ordered(self, uuids: set[str]) -> list[str]:
+		return sorted(uuids, key=lambda u: self._seq.get(u, 0))
+
+	def _enabled_with(self, uuids: set[str], attr: str) -> list[tuple[str, Any]]:
+		found = []
+		for uuid in self._ordered(uuids):
+			meta = self.plugins.get(uuid)
+			if not meta or not meta.enabled or not meta.module:
+				continue
+			fn = getattr(meta.module, attr, None)
+			if callable(fn):
+				found.append((uuid, fn))
+		return found
+
+	def wants_callback(self, data: str | None) -> bool:
+		return bool(self._enabled_with(self.subscriptions.callback_targets(data), "handle_callback"))
+
+	def wants_state(self, state_name: str | None) -> bool:
+		return bool(self._enabled_with(self.subscriptions.state_targets(state_name), "handle_message"))
 
-	async def dispatch_command(self, name: str, message: Any, args: list[str], ctx: Any) -> Any:
+	async def dispatch_command(self, name: str, message: Any, args: list[str], ctx: Any = None) -> Any:
 		meta = self.commands.get(name.lower())
 		if not meta:
 			return None
-		handler = meta.get("handler")
-		try:
-			if asyncio.iscoroutinefunction(handler):
-				return await handler(message, args, ctx)
-			res = handler(message, args, ctx)
-			if asyncio.iscoroutine(res):
-				return await res
-			return res
-		except Exception:
-			return None
+		uuid = meta.get("uuid")
+		return await self._call(uuid, meta.get("handler"), message, args, self._event_ctx(uuid, ctx, {}))
 
 	def load_all(self) -> None:
 		self._load_state()
 		self.plugins.clear()
 		self.order_handlers.clear()
 		self.message_handlers.clear()
+		self._order_by_uuid.clear()
+		self._message_by_uuid.clear()
+		self._order_batch_by_uuid.clear()
+		self._message_batch_by_uuid.clear()
+		for uuid in list(self.scheduler.jobs):
+			self.scheduler.remove_plugin(uuid)
+		self.subscriptions = SubscriptionIndex()
+		self._seq.clear()
 		self.commands.clear()
 		if not os.path.exists(self.root_dir):
 			return
-		for file in os.listdir(self.root_dir):
+		started = time.perf_counter()
+		files = []
+		for file in sorted(os.listdir(self.root_dir)):
 			lower = file.lower()
-			if not (lower.endswith(".py") or lower.endswith(".pyc")):
+			if lower.endswith(".py") or lower.endswith(".pyc"):
+				files.append(os.path.join(self.root_dir, file))
+		manifest = self._load_manifest()
+		entries = {full: self._scan_meta(full, manifest) for full in files}
+		for full, entry in entries.items():
+			if "mtime_ns" in entry:
+				self._mtimes[full] = (entry["mtime_ns"], entry["size"])
+		deferred = {full for full in files if entries[full].get("UUID") in self.disabled}
+		parallel = [full for full in files if full not in deferred and self._parallel_ok(entries[full])]
+		results: dict[str, tuple[ModuleType | None, Exception | None, float]] = {}
+		if len(parallel) > 1:
+			with ThreadPoolExecutor(max_workers=min(8, len(parallel)), thread_name_prefix="plugin-load") as pool:
+				for full, res in zip(parallel, pool.map(self._timed_import, parallel)):
+					results[full] = res
+		for full in files:
+			if full in deferred:
+				self._register_deferred(full, entries[full])
 				continue
-			full = os.path.join(self.root_dir, file)
-			try:
-				module = self._import_module_from_file(full)
-				name, uuid, version, description, credits = self._validate_module(module)
-				if uuid in self.plugins:
-					try:
-						existing = self.plugins[uuid]
-						self._logger.error("duplicate_uuid uuid=%s skip_file=%s kept=%s", uuid, full, existing.path)
-					except Exception:
-						self._logger.error("duplicate_uuid uuid=%s skip_file=%s", uuid, full)
-					continue
-				enabled = uuid not in self.disabled
-				self.plugins[uuid] = PluginMeta(name, uuid, version, description, credits, full, module, enabled, None)
-				self._register_commands_for_module(module, uuid)
-				self._register_handlers_for_module(module, uuid)
-				try:
-					self._logger.info("plugin_loaded name=%s version=%s uuid=%s enabled=%s path=%s", name, version, uuid, enabled, full)
-				except Exception:
-					pass
-			except Exception as e:
-				meta_guess = self._extract_meta_text(full)
-				name = meta_guess.get("NAME") or os.path.basename(full)
-				uuid = meta_guess.get("UUID") or f"invalid:{full}"
-				version = meta_guess.get("VERSION") or "unknown"
-				description = meta_guess.get("DESCRIPTION") or ""
-				credits = meta_guess.get("CREDITS")
-				if uuid in self.plugins:
-					continue
-				enabled = uuid not in self.disabled
-				self.plugins[uuid] = PluginMeta(name, uuid, version, description, credits, full, None, enabled, str(e))
-				try:
-					self._logger.warning("plugin_load_failed name=%s uuid=%s path=%s error=%s", name, uuid, full, e)
-				except Exception:
-					pass
+			module, error, ms = results.get(full) or self._timed_import(full)
+			self._register_loaded(full, module, error, ms, entries[full])
+		self._save_manifest(entries)
+		self._logger.info(
+			"plugins_loaded count=%d imported=%d deferred=%d parallel=%d ms=%.1f",
+			len(self.plugins),
+			len(files) - len(deferred),
+			len(deferred),
+			len(parallel) if len(parallel) > 1 else 0,
+			(time.perf_counter() - started) * 1000.0,
+		)
+
+	def _parallel_ok(self, entry: dict[str, Any]) -> bool:
+		flag = entry.get("parallel_import")
+		return self.parallel_import if flag is None else bool(flag)
+
+	def _register_deferred(self, file_path: str, entry: dict[str, Any]) -> None:
+		uuid = str(entry.get("UUID"))
+		if uuid in self.plugins:
+			return
+		self.plugins[uuid] = PluginMeta(
+			entry.get("NAME") or os.path.basename(file_path),
+			uuid,
+			entry.get("VERSION") or "unknown",
+			entry.get("DESCRIPTION") or "",
+			entry.get("CREDITS"),
+			file_path,
+			None,
+			False,
+			None,
+			deferred=True,
+		)
+		self._logger.info("plugin_deferred name=%s uuid=%s path=%s", self.plugins[uuid].name, uuid, file_path)
+
+	def _register_loaded(
+		self,
+		file_path: str,
+		module: ModuleType | None,
+		error: Exception | None,
+		ms: float,
+		entry: dict[str, Any],
+	) -> None:
+		try:
+			if error is not None:
+				raise error
+			name, uuid, version, description, credits = self._validate_module(module)
+		except Exception as e:
+			name = entry.get("NAME") or os.path.basename(file_path)
+			uuid = entry.get("UUID") or f"invalid:{file_path}"
+			if uuid in self.plugins:
+				return
+			meta = PluginMeta(
+				name,
+				uuid,
+				entry.get("VERSION") or "unknown",
+				entry.get("DESCRIPTION") or "",
+				entry.get("CREDITS"),
+				file_path,
+				None,
+				uuid not in self.disabled,
+				str(e),
+				load_ms=ms,
+			)
+			self.plugins[uuid] = meta
+			self._logger.warning("plugin_load_failed name=%s uuid=%s path=%s ms=%.1f error=%s", name, uuid, file_path, ms, e)
+			return
+		if uuid in self.plugins:
+			self._logger.error("duplicate_uuid uuid=%s skip_file=%s kept=%s", uuid, file_path, self.plugins[uuid].path)
+			return
+		enabled = uuid not in self.disabled
+		self.plugins[uuid] = PluginMeta(name, uuid, version, description, credits, file_path, module, enabled, None, load_ms=ms)
+		if enabled:
+			self._register_commands_for_module(module, uuid)
+		self._register_handlers_for_module(module, uuid)
+		flag = getattr(module, "PARALLEL_IMPORT", None)
+		entry.pop("parallel", None)
+		entry.update(
+			{
+				"NAME": name,
+				"UUID": uuid,
+				"VERSION": version,
+				"DESCRIPTION": description,
+				"CREDITS": credits,
+				"parallel_import": None if flag is None else bool(flag),
+			}
+		)
+		self._logger.info(
+			"plugin_loaded name=%s version=%s uuid=%s enabled=%s ms=%.1f path=%s",
+			name,
+			version,
+			uuid,
+			enabled,
+			ms,
+			file_path,
+		)
+		mode = getattr(module, "EXECUTOR", None)
+		if isinstance(mode, str) and mode.strip().lower() == "process" and not self.process_capable:
+			self._logger.warning(
+				"plugin_process_unsupported uuid=%s start_method=%s fallback=thread",
+				uuid,
+				multiprocessing.get_start_method(),
+			)
+
+	def _activate_deferred(self, uuid: str) -> None:
+		meta = self.plugins.get(uuid)
+		if not meta or not meta.deferred:
+			return
+		module, error, ms = self._timed_import(meta.path)
+		self.plugins.pop(uuid, None)
+		entry = {"NAME": meta.name, "UUID": uuid, "VERSION": meta.version, "DESCRIPTION": meta.description, "CREDITS": meta.credits}
+		self._register_loaded(meta.path, module, error, ms, entry)
+		if uuid not in self.plugins:
+			meta.deferred = False
+			meta.load_error = "UUID changed, restart required"
+			self.plugins[uuid] = meta
 
 	def load_one(self, file_path: str) -> PluginMeta:
 		self._load_state()
+		sig = self._file_sig(file_path)
+		if sig is not None:
+			self._mtimes[file_path] = sig
+		module, error, ms = self._timed_import(file_path)
 		try:
-			module = self._import_module_from_file(file_path)
+			if error is not None:
+				raise error
 			name, uuid, version, description, credits = self._validate_module(module)
 		except Exception as e:
 			meta_guess = self._extract_meta_text(file_path)
@@ -297,22 +726,22 @@ class PluginManager:
 			if uuid in self.plugins:
 				raise ValueError(f"Duplicate UUID: {uuid}")
 			enabled = uuid not in self.disabled
-			meta = PluginMeta(name, uuid, version, description, credits, file_path, None, enabled, str(e))
+			meta = PluginMeta(name, uuid, version, description, credits, file_path, None, enabled, str(e), load_ms=ms)
 			self.plugins[uuid] = meta
 			try:
-				self._logger.warning("plugin_load_failed name=%s uuid=%s path=%s error=%s", name, uuid, file_path, e)
+				self._logger.warning("plugin_load_failed name=%s uuid=%s path=%s ms=%.1f error=%s", name, uuid, file_path, ms, e)
 			except Exception:
 				pass
 			return meta
 		if uuid in self.plugins:
 			raise ValueError(f"Duplicate UUID: {uuid}")
 		enabled = uuid not in self.disabled
-		meta = PluginMeta(name, uuid, version, description, credits, file_path, module, enabled, None)
+		meta = PluginMeta(name, uuid, version, description, credits, file_path, module, enabled, None, load_ms=ms)
 		self.plugins[uuid] = meta
 		self._register_commands_for_module(module, uuid)
 		self._register_handlers_for_module(module, uuid)
 		try:
-			self._logger.info("plugin_loaded name=%s version=%s uuid=%s enabled=%s path=%s", name, version, uuid, enabled, file_path)
+			self._logger.info("plugin_loaded name=%s version=%s uuid=%s enabled=%s ms=%.1f path=%s", name, version, uuid, enabled, ms, file_path)
 		except Exception:
 			pass
 		return meta
@@ -321,8 +750,13 @@ class PluginManager:
 		if uuid in self.disabled:
 			self.disabled.remove(uuid)
 			self._save_state()
+		if uuid in self.plugins and self.plugins[uuid].deferred:
+			self._activate_deferred(uuid)
 		if uuid in self.plugins:
 			self.plugins[uuid].enabled = True
+			self.plugins[uuid].auto_disabled = None
+			self.scheduler.resume(uuid)
+			self.stats_for(uuid).consecutive_timeouts = 0
 			try:
 				self._register_commands_for_module(self.plugins[uuid].module, uuid)
 			except Exception:
@@ -341,6 +775,7 @@ class PluginManager:
 		if uuid in self.plugins:
 			self.plugins[uuid].enabled = False
 			self._unregister_commands_by_uuid(uuid)
+			self.scheduler.pause(uuid)
 			try:
 				meta = self.plugins[uuid]
 				self._logger.info("plugin_disabled name=%s version=%s uuid=%s", meta.name, meta.version, uuid)
@@ -349,15 +784,27 @@ class PluginManager:
 			return True
 		return False
 
+	def unload(self, uuid: str) -> None:
+		if uuid in self.plugins:
+			self._unregister_handlers_by_uuid(uuid)
+			self.plugins.pop(uuid, None)
+		self.stats.pop(uuid, None)
+		self._semaphores.pop(uuid, None)
+		self._contexts.pop(uuid, None)
+		self.profile_reports.pop(uuid, None)
+		if self.profiling is not None and self.profiling.uuid == uuid:
+			self.profiling = None
+		self._unregister_commands_by_uuid(uuid)
+
 	def remove(self, uuid: str) -> bool:
 		if uuid in self.plugins:
+			path = self.plugins[uuid].path
 			try:
-				os.remove(self.plugins[uuid].path)
+				os.remove(path)
 			except Exception:
 				pass
-			self._unregister_handlers_by_uuid(uuid)
-			self.plugins.pop(uuid, None)
-		self._unregister_commands_by_uuid(uuid)
+			self._mtimes.pop(path, None)
+		self.unload(uuid)
 		if uuid in self.disabled:
 			self.disabled.remove(uuid)
 			self._save_state()
@@ -367,68 +814,510 @@ class PluginManager:
 			pass
 		return True
 
-	async def _maybe_call(self, fn, *args, **kwargs):
+	def _file_sig(self, path: str) -> tuple[int, int] | None:
+		try:
+			st = os.stat(path)
+		except OSError:
+			return None
+		return st.st_mtime_ns, st.st_size
+
+	def _scan_files(self) -> dict[str, tuple[int, int]]:
+		found: dict[str, tuple[int, int]] = {}
+		if not os.path.isdir(self.root_dir):
+			return found
+		for file in os.listdir(self.root_dir):
+			lower = file.lower()
+			if not (lower.endswith(".py") or lower.endswith(".pyc")):
+				continue
+			full = os.path.join(self.root_dir, file)
+			sig = self._file_sig(full)
+			if sig is not None:
+				found[full] = sig
+		return found
+
+	def _owner_of(self, path: str) -> str | None:
+		for uuid, meta in self.plugins.items():
+			if meta.path == path:
+				return uuid
+		return None
+
+	async def init_plugin(self, uuid: str) -> None:
+		meta = self.plugins.get(uuid)
+		if not meta or not meta.enabled or not meta.module:
+			return
+		fn = getattr(meta.module, "on_init", None)
+		if callable(fn):
+			await self._call(uuid, fn, self._event_ctx(uuid, None, {}), bounded=False, offload=False)
+
+	async def reload(self, uuid: str) -> str | None:
+		meta = self.plugins.get(uuid)
+		if not meta:
+			return None
+		if meta.deferred:
+			return uuid
+		mod_name = f"plugins.{os.path.splitext(os.path.basename(meta.path))[0]}"
+		previous = sys.modules.get(mod_name)
+		started = time.perf_counter()
+		try:
+			module = self._import_module_from_file(meta.path)
+			name, new_uuid, version, description, credits = self._validate_module(module)
+			if new_uuid != uuid and new_uuid in self.plugins:
+				raise ValueError(f"Duplicate UUID: {new_uuid}")
+		except Exception as e:
+			if previous is not None:
+				sys.modules[mod_name] = previous
+			else:
+				sys.modules.pop(mod_name, None)
+			self._logger.warning(
+				"plugin_reload_failed name=%s uuid=%s path=%s rolled_back=%s error=%s",
+				meta.name,
+				uuid,
+				meta.path,
+				meta.module is not None,
+				e,
+			)
+			return None
+		unload_fn = getattr(meta.module, "on_unload", None) if meta.module else None
+		if callable(unload_fn):
+			await self._call(uuid, unload_fn, self._event_ctx(uuid, None, {}))
+		self._unregister_handlers_by_uuid(uuid)
+		self._unregister_commands_by_uuid(uuid)
+		self._semaphores.pop(uuid, None)
+		if new_uuid != uuid:
+			self.plugins.pop(uuid, None)
+			self.stats.pop(uuid, None)
+			self._contexts.pop(uuid, None)
+		enabled = new_uuid not in self.disabled
+		self.plugins[new_uuid] = PluginMeta(name, new_uuid, version, description, credits, meta.path, module, enabled, None)
+		if enabled:
+			self._register_commands_for_module(module, new_uuid)
+		self._register_handlers_for_module(module, new_uuid)
+		self._logger.info(
+			"plugin_reloaded name=%s version=%s uuid=%s ms=%.1f",
+			name,
+			version,
+			new_uuid,
+			(time.perf_counter() - started) * 1000.0,
+		)
+		return new_uuid
+
+	async def watch(self, interval: float = 2.0, on_change=None) -> None:
+		interval = max(0.5, float(interval))
+		pending: dict[str, tuple[int, int]] = {}
+		while True:
+			await asyncio.sleep(interval)
+			try:
+				current = self._scan_files()
+				changed: list[str] = []
+				for path, sig in current.items():
+					if self._mtimes.get(path) == sig:
+						pending.pop(path, None)
+						continue
+					if pending.get(path) != sig:
+						pending[path] = sig
+						continue
+					pending.pop(path, None)
+					self._mtimes[path] = sig
+					changed.append(path)
+				removed = [path for path in self._mtimes if path not in current]
+				for path in removed:
+					self._mtimes.pop(path, None)
+					uuid = self._owner_of(path)
+					if uuid:
+						self.unload(uuid)
+						self._logger.info("plugin_unloaded uuid=%s path=%s", uuid, path)
+				for path in changed:
+					uuid = self._owner_of(path)
+					if uuid:
+						uuid = await self.reload(uuid)
+					else:
+						try:
+							uuid = self.load_one(path).uuid
+						except Exception as e:
+							self._logger.warning("plugin_load_failed path=%s error=%s", path, e)
+							uuid = None
+					if uuid:
+						await self.init_plugin(uuid)
+				if (changed or removed) and on_change is not None:
+					await on_change()
+			except asyncio.CancelledError:
+				raise
+			except Exception as e:
+				self._logger.warning("plugin_watch_failed error=%s", e)
+
+	def bind(self, db: Any) -> None:
+		self.db = db
+		self.kv = KVStore(db, flush_interval=self.kv_flush_interval, cache_size=self.kv_cache_size) if db is not None else None
+		for uuid, ctx in self._contexts.items():
+			ctx.db = db
+			ctx.kv = PluginKV(self.kv, uuid) if self.kv is not None else None
+
+	def context_for(self, uuid: str) -> PluginContext:
+		ctx = self._contexts.get(uuid)
+		if ctx is None:
+			try:
+				limit = float(self.api_budgets.get(uuid, self.api_per_minute))
+			except Exception:
+				limit = float(self.api_per_minute)
+			ctx = PluginContext(
+				db=self.db,
+				uuid=uuid,
+				api=StarvellClient(PluginBudget(limit)),
+				kv=PluginKV(self.kv, uuid) if self.kv is not None else None,
+				scheduler=self.scheduler,
+			)
+			self._contexts[uuid] = ctx
+		return ctx
+
+	def _event_ctx(self, uuid: str, ctx: Any, extras: dict[str, Any]) -> Any:
+		if ctx is not None:
+			return ctx
+		base = self.context_for(uuid)
+		return PluginEventContext(base, **extras) if extras else base
+
+	def _executor_mode(self, uuid: str | None) -> str:
+		meta = self.plugins.get(uuid) if uuid else None
+		mode = getattr(meta.module, "EXECUTOR", None) if meta and meta.module else None
+		if isinstance(mode, str) and mode.strip().lower() in ("thread", "process", "inline"):
+			mode = mode.strip().lower()
+			return "thread" if mode == "process" and not self.process_capable else mode
+		return "thread"
+
+	def _semaphore_for(self, uuid: str) -> asyncio.Semaphore:
+		sem = self._semaphores.get(uuid)
+		if sem is None:
+			meta = self.plugins.get(uuid)
+			limit = getattr(meta.module, "MAX_CONCURRENCY", None) if meta and meta.module else None
+			try:
+				limit = max(1, int(limit)) if limit is not None else self.max_concurrency
+			except Exception:
+				limit = self.max_concurrency
+			sem = asyncio.Semaphore(limit)
+			self._semaphores[uuid] = sem
+		return sem
+
+	def _process_pool(self) -> ProcessPoolExecutor:
+		if self._process_executor is None:
+			self._process_executor = ProcessPoolExecutor(max_workers=self.process_workers)
+		return self._process_executor
+
+	async def _run_sync(self, uuid: str, fn, mode: str, *args, _capture: ProfileCapture | None = None, **kwargs):
+		sem = self._semaphore_for(uuid)
+		await sem.acquire()
+		loop = asyncio.get_running_loop()
+		executor = self._process_pool() if mode == "process" else self._executor
+		stats = self.stats_for(uuid)
+		try:
+			fut = loop.run_in_executor(executor, functools.partial(_measured, fn, _capture, *args, **kwargs))
+		except Exception:
+			sem.release()
+			raise
+
+		def _done(f: asyncio.Future) -> None:
+			sem.release()
+			if not f.cancelled() and f.exception() is None:
+				stats.cpu_ms += f.result()[1] * 1000.0
+
+		fut.add_done_callback(_done)
+		res, _ = await asyncio.shield(fut)
+		return res
+
+	async def _maybe_call(
+		self,
+		fn,
+		*args,
+		_uuid: str | None = None,
+		_offload: bool = True,
+		_process_ok: bool = False,
+		_capture: ProfileCapture | None = None,
+		**kwargs,
+	):
+		if asyncio.iscoroutinefunction(fn) or asyncio.iscoroutinefunction(getattr(fn, "__call__", None)):
+			if _capture is not None:
+				return await _profiled(fn(*args, **kwargs), _capture)
+			return await fn(*args, **kwargs)
+		mode = self._executor_mode(_uuid)
+		if mode == "process" and (not _process_ok or _capture is not None):
+			mode = "thread"
+		if mode == "inline" or not _offload or _uuid is None:
+			res, cpu_s = _measured(fn, _capture, *args, **kwargs)
+			if _uuid is not None:
+				self.stats_for(_uuid).cpu_ms += cpu_s * 1000.0
+		else:
+			res = await self._run_sync(_uuid, fn, mode, *args, _capture=_capture, **kwargs)
+		if asyncio.iscoroutine(res):
+			if _capture is not None:
+				return await _profiled(res, _capture)
+			return await res
+		return res
+
+	def shutdown(self) -> None:
+		self.scheduler.stop()
+		try:
+			self._executor.shutdown(wait=False, cancel_futures=True)
+		except Exception:
+			pass
+		if self._process_executor is not None:
+			try:
+				self._process_executor.shutdown(wait=False, cancel_futures=True)
+			except Exception:
+				pass
+			self._process_executor = None
+
+	def stats_for(self, uuid: str) -> PluginStats:
+		stats = self.stats.get(uuid)
+		if stats is None:
+			stats = PluginStats()
+			self.stats[uuid] = stats
+		return stats
+
+	def api_usage(self, uuid: str) -> tuple[int, int]:
+		ctx = self._contexts.get(uuid)
+		budget = getattr(getattr(ctx, "api", None), "budget", None)
+		if budget is None:
+			return 0, 0
+		return budget.requests, budget.cache_hits
+
+	def start_profile(self, uuid: str, calls: int | None = None, every: int | None = None) -> ProfileCapture:
+		if self.profiling is not None:
+			self.stop_profile()
+		self.profiling = ProfileCapture(
+			uuid,
+			max(1, int(calls or self.profile_calls)),
+			max(1, int(every or self.profile_every)),
+		)
+		self._logger.info("plugin_profile_started uuid=%s calls=%d every=%d", uuid, self.profiling.limit, self.profiling.every)
+		return self.profiling
+
+	def stop_profile(self) -> str | None:
+		capture = self.profiling
+		if capture is None:
+			return None
+		if not capture.lock.acquire(blocking=False):
+			capture.limit = capture.captured
+			return None
+		self.profiling = None
+		out = io.StringIO()
+		try:
+			if not capture.captured:
+				self._logger.info("plugin_profile_empty uuid=%s", capture.uuid)
+				return None
+			stats = pstats.Stats(capture.profile, stream=out)
+			stats.strip_dirs().sort_stats("cumulative").print_stats(20)
+		except Exception as e:
+			self._logger.warning("plugin_profile_failed uuid=%s error=%s", capture.uuid, e)
+			return None
+		finally:
+			capture.lock.release()
+		path = os.path.join(os.path.dirname(self.state_path) or ".", "profiles", f"{capture.uuid}.prof")
+		try:
+			os.makedirs(os.path.dirname(path), exist_ok=True)
+			stats.dump_stats(path)
+		except Exception:
+			path = None
+		report = out.getvalue().strip()
+		self.profile_reports[capture.uuid] = report
+		self._logger.info("plugin_profile_saved uuid=%s calls=%d path=%s", capture.uuid, capture.captured, path)
+		return report
+
+	def _sample(self, uuid: str) -> ProfileCapture | None:
+		capture = self.profiling
+		if capture is None or capture.uuid != uuid or capture.captured >= capture.limit:
+			return None
+		capture.seen += 1
+		if (capture.seen - 1) % capture.every:
+			return None
+		return capture
+
+	def _budget_for(self, uuid: str) -> PluginBudget | None:
+		api = self.context_for(uuid).api
+		return api.budget if api is not None else None
+
+	async def _run_job(self, job: ScheduledJob) -> None:
+		meta = self.plugins.get(job.uuid)
+		if not meta or not meta.enabled or meta.module is None:
+			return
+		await self._call(job.uuid, job.fn, self._event_ctx(job.uuid, None, {"job": job}))
+
+	def _timeout_for(self, uuid: str) -> float | None:
+		meta = self.plugins.get(uuid)
+		value = getattr(meta.module, "TIMEOUT", None) if meta and meta.module else None
+		if value is None:
+			return self.timeout
 		try:
-			if asyncio.iscoroutinefunction(fn):
-				return await fn(*args, **kwargs)
-			res = fn(*args, **kwargs)
-			if asyncio.iscoroutine(res):
-				return await res
-			return res
+			value = float(value)
 		except Exception:
+			return self.timeout
+		return value if value > 0 else None
+
+	def _is_background(self, uuid: str) -> bool:
+		meta = self.plugins.get(uuid)
+		mode = getattr(meta.module, "DISPATCH_MODE", None) if meta and meta.module else None
+		if isinstance(mode, str) and mode.strip():
+			return mode.strip().lower() == "background"
+		return self.background
+
+	def _trip(self, uuid: str, stats: PluginStats) -> None:
+		meta = self.plugins.get(uuid)
+		if not meta or not meta.enabled:
+			return
+		self.disable(uuid)
+		meta.auto_disabled = f"timeouts={stats.consecutive_timeouts}"
+		self._logger.error(
+			"plugin_auto_disabled name=%s uuid=%s consecutive_timeouts=%d",
+			meta.name,
+			uuid,
+			stats.consecutive_timeouts,
+		)
+
+	async def _call(
+		self,
+		uuid: str,
+		fn,
+		*args,
+		bounded: bool = True,
+		offload: bool = True,
+		process_ok: bool = False,
+		**kwargs,
+	):
+		stats = self.stats_for(uuid)
+		limit = self._timeout_for(uuid) if bounded else None
+		capture = self._sample(uuid)
+		started = time.perf_counter()
+		call = self._maybe_call(fn, *args, _uuid=uuid, _offload=offload, _process_ok=process_ok, _capture=capture, **kwargs)
+		try:
+			if limit is None:
+				result = await call
+			else:
+				result = await asyncio.wait_for(call, limit)
+			stats.consecutive_timeouts = 0
+			return result
+		except asyncio.TimeoutError:
+			stats.timeouts += 1
+			stats.consecutive_timeouts += 1
+			stats.last_error = f"timeout {limit}s"
+			self._logger.warning(
+				"plugin_timeout uuid=%s handler=%s timeout_s=%s consecutive=%d",
+				uuid,
+				getattr(fn, "__name__", "?"),
+				limit,
+				stats.consecutive_timeouts,
+			)
+			if stats.consecutive_timeouts >= self.breaker_threshold:
+				self._trip(uuid, stats)
+			return None
+		except asyncio.CancelledError:
+			raise
+		except Exception as e:
+			stats.errors += 1
+			stats.last_error = f"{type(e).__name__}: {e}"
+			self._logger.warning("plugin_error uuid=%s handler=%s error=%s", uuid, getattr(fn, "__name__", "?"), stats.last_error)
 			return None
+		finally:
+			elapsed_ms = (time.perf_counter() - started) * 1000.0
+			stats.calls += 1
+			stats.total_ms += elapsed_ms
+			stats.samples.append(elapsed_ms)
+			if elapsed_ms > stats.max_ms:
+				stats.max_ms = elapsed_ms
+			if self.profiling is not None and self.profiling.uuid == uuid and self.profiling.captured >= self.profiling.limit:
+				self.stop_profile()
+
+	def _spawn(self, coro) -> None:
+		task = asyncio.create_task(coro)
+		self._background_tasks.add(task)
+		task.add_done_callback(self._background_tasks.discard)
 
-	async def dispatch_init(self, ctx: PluginContext) -> None:
+	async def _fan_out(self, calls: list[tuple[str, Any, tuple]]) -> None:
+		tasks = []
+		for uuid, fn, args in calls:
+			if self._is_background(uuid):
+				self._spawn(self._call(uuid, fn, *args, process_ok=True))
+			else:
+				tasks.append(self._call(uuid, fn, *args, process_ok=True))
+		if tasks:
+			await asyncio.gather(*tasks, return_exceptions=True)
+
+	async def dispatch_init(self, ctx: PluginContext | None = None) -> None:
+		self.scheduler.start()
 		tasks = []
 		for meta in list(self.plugins.values()):
 			if not meta.enabled:
 				continue
 			fn = getattr(meta.module, "on_init", None)
 			if callable(fn):
-				tasks.append(self._maybe_call(fn, ctx))
+				tasks.append(self._call(meta.uuid, fn, self._event_ctx(meta.uuid, ctx, {}), bounded=False, offload=False))
 		if tasks:
 			await asyncio.gather(*tasks, return_exceptions=True)
 
-	async def dispatch_order_created(self, order: dict, ctx: PluginContext) -> None:
-		tasks = []
-		for uuid, fn in list(self.order_handlers):
+	async def dispatch_order_created(self, order: dict, ctx: PluginContext | None = None, **extras: Any) -> None:
+		calls = []
+		for uuid in self._ordered(self.subscriptions.order_targets(order)):
 			meta = self.plugins.get(uuid)
 			if not meta or not meta.enabled:
 				continue
-			tasks.append(self._maybe_call(fn, order, ctx))
-		if tasks:
-			await asyncio.gather(*tasks, return_exceptions=True)
+			for fn in self._order_by_uuid.get(uuid, ()):
+				calls.append((uuid, fn, (order, self._event_ctx(uuid, ctx, extras))))
+		await self._fan_out(calls)
 
-	async def dispatch_chat_message(self, text: str, chat_id: str, ctx: PluginContext) -> None:
-		tasks = []
-		for uuid, fn in list(self.message_handlers):
+	async def dispatch_chat_message(self, text: str, chat_id: str, ctx: PluginContext | None = None, **extras: Any) -> None:
+		if not self._message_by_uuid:
+			return
+		calls = []
+		for uuid in self._ordered(self.subscriptions.message_targets(text, chat_id)):
 			meta = self.plugins.get(uuid)
 			if not meta or not meta.enabled:
 				continue
-			tasks.append(self._maybe_call(fn, text, chat_id, ctx))
-		if tasks:
-			await asyncio.gather(*tasks, return_exceptions=True)
+			for fn in self._message_by_uuid.get(uuid, ()):
+				calls.append((uuid, fn, (text, chat_id, self._event_ctx(uuid, ctx, extras))))
+		await self._fan_out(calls)
 
-	async def dispatch_callback(self, callback: Any, state: Any, ctx: PluginContext) -> None:
-		for uuid, meta in self.plugins.items():
-			if not meta.enabled or not meta.module:
-				continue
-			fn = getattr(meta.module, "handle_callback", None)
-			if callable(fn):
-				try:
-					await self._maybe_call(fn, callback, state, ctx)
-				except Exception:
-					pass
+	@property
+	def wants_message_batches(self) -> bool:
+		return bool(self._message_batch_by_uuid)
 
-	async def dispatch_message(self, message: Any, state: Any, ctx: PluginContext) -> None:
-		for uuid, meta in self.plugins.items():
-			if not meta.enabled or not meta.module:
+	@property
+	def wants_order_batches(self) -> bool:
+		return bool(self._order_batch_by_uuid)
+
+	async def _dispatch_batch(self, handlers: dict[str, list[Any]], items: list, route, ctx: Any, extras: dict[str, Any]) -> None:
+		if not items or not handlers:
+			return
+		per_uuid: dict[str, list] = {}
+		for item in items:
+			for uuid in route(item):
+				if uuid in handlers:
+					per_uuid.setdefault(uuid, []).append(item)
+		calls = []
+		for uuid in self._ordered(set(per_uuid)):
+			meta = self.plugins.get(uuid)
+			if not meta or not meta.enabled:
 				continue
-			fn = getattr(meta.module, "handle_message", None)
-			if callable(fn):
-				try:
-					await self._maybe_call(fn, message, state, ctx)
-				except Exception:
-					pass
+			for fn in handlers.get(uuid, ()):
+				calls.append((uuid, fn, (per_uuid[uuid], self._event_ctx(uuid, ctx, extras))))
+		await self._fan_out(calls)
+
+	async def dispatch_chat_messages(self, messages: list[dict], ctx: PluginContext | None = None, **extras: Any) -> None:
+		await self._dispatch_batch(
+			self._message_batch_by_uuid,
+			messages,
+			lambda m: self.subscriptions.message_targets(m.get("text") or "", m.get("chat_id")),
+			ctx,
+			extras,
+		)
 
+	async def dispatch_orders_created(self, orders: list[dict], ctx: PluginContext | None = None, **extras: Any) -> None:
+		await self._dispatch_batch(self._order_batch_by_uuid, orders, self.subscriptions.order_targets, ctx, extras)
 
+	async def dispatch_callback(self, callback: Any, state: Any, ctx: PluginContext | None = None) -> None:
+		targets = self.subscriptions.callback_targets(getattr(callback, "data", None))
+		for uuid, fn in self._enabled_with(targets, "handle_callback"):
+			await self._call(uuid, fn, callback, state, self._event_ctx(uuid, ctx, {}))
+
+	async def dispatch_message(self, message: Any, state: Any, ctx: PluginContext | None = None) -> None:
+		try:
+			state_name = await state.get_state()
+		except Exception:
+			state_name = None
+		for uuid, fn in self._enabled_with(self.subscriptions.state_targets(state_name), "handle_message"):
+			await self._call(uuid, fn, message, state, self._event_ctx(uuid, ctx, {}))
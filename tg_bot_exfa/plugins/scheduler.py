@@ -0,0 +1,225 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+
+@dataclass(slots=True, eq=False)
+class ScheduledJob:
+	uuid: str
+	fn: Any
+	interval: float
+	jitter: float = 0.0
+	priority: int = 0
+	name: str = ""
+	next_at: float = 0.0
+	paused: bool = False
+	cancelled: bool = False
+	runs: int = 0
+	skipped: int = 0
+	paced: int = 0
+	last_run: float | None = None
+	task: asyncio.Task | None = field(default=None, repr=False)
+
+	@property
+	def running(self) -> bool:
+		return self.task is not None and not self.task.done()
+
+
+def parse_jobs(value: Any) -> list[dict[str, Any]]:
+	if not isinstance(value, (list, tuple)):
+		return []
+	specs: list[dict[str, Any]] = []
+	for item in value:
+		if isinstance(item, dict):
+			spec = dict(item)
+		elif isinstance(item, (list, tuple)) and len(item) >= 2:
+			spec = {"interval": item[0], "fn": item[1]}
+			if len(item) > 2:
+				spec["jitter"] = item[2]
+			if len(item) > 3:
+				spec["priority"] = item[3]
+		else:
+			continue
+		if callable(spec.get("fn")):
+			specs.append(spec)
+	return specs
+
+
+class PluginScheduler:
+	def __init__(self, runner, budget_for=None, concurrency: int = 4, min_interval: float = 1.0):
+		self.runner = runner
+		self.budget_for = budget_for
+		self.concurrency = max(1, int(concurrency))
+		self.min_interval = max(0.1, float(min_interval))
+		self.jobs: dict[str, list[ScheduledJob]] = {}
+		self.paused: set[str] = set()
+		self._heap: list[tuple[float, int, ScheduledJob]] = []
+		self._ready: list[ScheduledJob] = []
+		self._seq = itertools.count()
+		self._wake = asyncio.Event()
+		self._task: asyncio.Task | None = None
+		self._log = logging.getLogger("exfador.plugins")
+
+	def _push(self, job: ScheduledJob) -> None:
+		heapq.heappush(self._heap, (job.next_at, next(self._seq), job))
+		self._wake.set()
+		self.start()
+
+	def _next_delay(self, job: ScheduledJob) -> float:
+		return job.interval + (random.uniform(0.0, job.jitter) if job.jitter > 0 else 0.0)
+
+	def add(
+		self,
+		uuid: str,
+		fn: Any,
+		interval: float,
+		jitter: float = 0.0,
+		priority: int = 0,
+		name: str | None = None,
+		paused: bool = False,
+	) -> ScheduledJob:
+		if not callable(fn):
+			raise TypeError("scheduled job must be callable")
+		job = ScheduledJob(
+			uuid=uuid,
+			fn=fn,
+			interval=max(self.min_interval, float(interval)),
+			jitter=max(0.0, float(jitter or 0)),
+			priority=int(priority or 0),
+			name=str(name or getattr(fn, "__name__", "job")),
+			paused=paused or uuid in self.paused,
+		)
+		job.next_at = time.monotonic() + (random.uniform(0.0, job.jitter) if job.jitter > 0 else 0.0)
+		self.jobs.setdefault(uuid, []).append(job)
+		if not job.paused:
+			self._push(job)
+		self._log.info(
+			"plugin_job_scheduled uuid=%s job=%s interval_s=%s jitter_s=%s priority=%d",
+			uuid,
+			job.name,
+			job.interval,
+			job.jitter,
+			job.priority,
+		)
+		return job
+
+	def cancel(self, job: ScheduledJob) -> None:
+		job.cancelled = True
+		jobs = self.jobs.get(job.uuid)
+		if jobs and job in jobs:
+			jobs.remove(job)
+			if not jobs:
+				self.jobs.pop(job.uuid, None)
+		if job.running:
+			job.task.cancel()
+		self._wake.set()
+
+	def remove_plugin(self, uuid: str) -> None:
+		self.paused.discard(uuid)
+		for job in list(self.jobs.get(uuid, ())):
+			self.cancel(job)
+
+	def pause(self, uuid: str) -> None:
+		self.paused.add(uuid)
+		for job in self.jobs.get(uuid, ()):
+			job.paused = True
+			if job.running:
+				job.task.cancel()
+		self._wake.set()
+
+	def resume(self, uuid: str) -> None:
+		self.paused.discard(uuid)
+		now = time.monotonic()
+		for job in self.jobs.get(uuid, ()):
+			if not job.paused:
+				continue
+			job.paused = False
+			job.next_at = now + (random.uniform(0.0, job.jitter) if job.jitter > 0 else 0.0)
+			self._push(job)
+
+	def start(self) -> None:
+		if self._task is not None and not self._task.done():
+			return
+		try:
+			self._task = asyncio.get_running_loop().create_task(self._loop())
+		except RuntimeError:
+			self._task = None
+
+	def stop(self) -> None:
+		if self._task is not None:
+			self._task.cancel()
+			self._task = None
+		for jobs in self.jobs.values():
+			for job in jobs:
+				if job.running:
+					job.task.cancel()
+
+	def _pacing_delay(self, job: ScheduledJob) -> float:
+		if self.budget_for is None:
+			return 0.0
+		try:
+			budget = self.budget_for(job.uuid)
+			return budget.delay() if budget is not None else 0.0
+		except Exception:
+			return 0.0
+
+	def _collect_due(self, now: float) -> None:
+		while self._heap and self._heap[0][0] <= now:
+			at, _, job = heapq.heappop(self._heap)
+			if at != job.next_at or job.cancelled or job.paused or job in self._ready:
+				continue
+			if job.running:
+				job.skipped += 1
+				job.next_at = now + self._next_delay(job)
+				heapq.heappush(self._heap, (job.next_at, next(self._seq), job))
+				continue
+			delay = self._pacing_delay(job)
+			if delay > 0:
+				job.paced += 1
+				job.next_at = now + delay
+				heapq.heappush(self._heap, (job.next_at, next(self._seq), job))
+				continue
+			self._ready.append(job)
+
+	def _running_count(self) -> int:
+		return sum(1 for jobs in self.jobs.values() for job in jobs if job.running)
+
+	def _launch(self, job: ScheduledJob, now: float) -> None:
+		job.last_run = time.time()
+		job.next_at = now + self._next_delay(job)
+		heapq.heappush(self._heap, (job.next_at, next(self._seq), job))
+		job.task = asyncio.get_running_loop().create_task(self._execute(job))
+
+	async def _execute(self, job: ScheduledJob) -> None:
+		try:
+			await self.runner(job)
+		except asyncio.CancelledError:
+			pass
+		except Exception as e:
+			self._log.warning("plugin_job_failed uuid=%s job=%s error=%s", job.uuid, job.name, e)
+		finally:
+			job.runs += 1
+			self._wake.set()
+
+	async def _loop(self) -> None:
+		while True:
+			now = time.monotonic()
+			self._collect_due(now)
+			if self._ready:
+				self._ready = [j for j in self._ready if not j.cancelled and not j.paused]
+				self._ready.sort(key=lambda j: -j.priority)
+				free = self.concurrency - self._running_count()
+				while self._ready and free > 0:
+					self._launch(self._ready.pop(0), now)
+					free -= 1
+			timeout = max(0.0, self._heap[0][0] - time.monotonic()) if self._heap else None
+			self._wake.clear()
+			try:
+				await asyncio.wait_for(self._wake.wait(), timeout)
+			except asyncio.TimeoutError:
+				pass
@@ -0,0 +1,155 @@
+import re
+from dataclasses import dataclass, field
+from typing import Any
+
+
+LEGACY_CALLBACK_PREFIXES = ("stars:",)
+LEGACY_STATES = ("StarsState", "GiftStarsState")
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _as_list(value: Any) -> list[Any]:
+	if value is None:
+		return []
+	if isinstance(value, (str, int)):
+		return [value]
+	if isinstance(value, (list, tuple, set, frozenset)):
+		return list(value)
+	return []
+
+
+def _as_ids(value: Any) -> set[str]:
+	return {str(v).strip() for v in _as_list(value) if str(v).strip()}
+
+
+@dataclass(slots=True)
+class Subscription:
+	patterns: tuple[str, ...] = ()
+	regex: re.Pattern | None = None
+	keywords: frozenset[str] = frozenset()
+	chats: frozenset[str] = frozenset()
+	games: frozenset[str] = frozenset()
+	categories: frozenset[str] = frozenset()
+	callbacks: tuple[str, ...] = LEGACY_CALLBACK_PREFIXES
+	states: tuple[str, ...] = LEGACY_STATES
+
+	@classmethod
+	def from_module(cls, module: Any) -> "Subscription":
+		spec = getattr(module, "SUBSCRIPTIONS", None)
+		if not isinstance(spec, dict):
+			return cls()
+		patterns: list[str] = []
+		for p in _as_list(spec.get("text")):
+			if isinstance(p, re.Pattern):
+				p = p.pattern
+			if isinstance(p, str) and p:
+				re.compile(p)
+				patterns.append(p)
+		regex = re.compile("|".join(f"(?:{p})" for p in patterns), re.IGNORECASE) if patterns else None
+		callbacks = tuple(str(c) for c in _as_list(spec.get("callbacks")) if str(c))
+		states = tuple(str(s) for s in _as_list(spec.get("states")) if str(s))
+		return cls(
+			patterns=tuple(patterns),
+			regex=regex,
+			keywords=frozenset(str(k).strip().lower() for k in _as_list(spec.get("keywords")) if str(k).strip()),
+			chats=frozenset(_as_ids(spec.get("chats"))),
+			games=frozenset(_as_ids(spec.get("games"))),
+			categories=frozenset(_as_ids(spec.get("categories"))),
+			callbacks=callbacks if "callbacks" in spec else LEGACY_CALLBACK_PREFIXES,
+			states=states if "states" in spec else LEGACY_STATES,
+		)
+
+
+@dataclass(slots=True)
+class SubscriptionIndex:
+	subs: dict[str, Subscription] = field(default_factory=dict)
+	open_text: set[str] = field(default_factory=set)
+	open_chat: set[str] = field(default_factory=set)
+	open_game: set[str] = field(default_factory=set)
+	open_category: set[str] = field(default_factory=set)
+	by_keyword: dict[str, set[str]] = field(default_factory=dict)
+	by_chat: dict[str, set[str]] = field(default_factory=dict)
+	by_game: dict[str, set[str]] = field(default_factory=dict)
+	by_category: dict[str, set[str]] = field(default_factory=dict)
+	by_callback: dict[str, list[tuple[str, str]]] = field(default_factory=dict)
+	loose_callbacks: list[tuple[str, str]] = field(default_factory=list)
+	by_state: dict[str, set[str]] = field(default_factory=dict)
+	regex_owners: list[str] = field(default_factory=list)
+	prefilter: re.Pattern | None = None
+
+	def add(self, uuid: str, sub: Subscription) -> None:
+		self.subs[uuid] = sub
+		self._rebuild()
+
+	def remove(self, uuid: str) -> None:
+		if self.subs.pop(uuid, None) is not None:
+			self._rebuild()
+
+	def _rebuild(self) -> None:
+		self.open_text, self.open_chat, self.open_game, self.open_category = set(), set(), set(), set()
+		self.by_keyword, self.by_chat, self.by_game, self.by_category = {}, {}, {}, {}
+		self.by_callback, self.loose_callbacks, self.by_state = {}, [], {}
+		self.regex_owners = []
+		patterns: list[str] = []
+		for uuid, sub in self.subs.items():
+			if sub.regex is None and not sub.keywords:
+				self.open_text.add(uuid)
+			if sub.regex is not None:
+				self.regex_owners.append(uuid)
+				patterns.extend(sub.patterns)
+			for kw in sub.keywords:
+				self.by_keyword.setdefault(kw, set()).add(uuid)
+			for target, opened, ids in (
+				(self.by_chat, self.open_chat, sub.chats),
+				(self.by_game, self.open_game, sub.games),
+				(self.by_category, self.open_category, sub.categories),
+			):
+				if not ids:
+					opened.add(uuid)
+				for i in ids:
+					target.setdefault(i, set()).add(uuid)
+			for prefix in sub.callbacks:
+				head, sep, _ = prefix.partition(":")
+				if sep:
+					self.by_callback.setdefault(head, []).append((prefix, uuid))
+				else:
+					self.loose_callbacks.append((prefix, uuid))
+			for state in sub.states:
+				self.by_state.setdefault(state, set()).add(uuid)
+		self.prefilter = re.compile("|".join(f"(?:{p})" for p in patterns), re.IGNORECASE) if patterns else None
+
+	def message_targets(self, text: str, chat_id: Any) -> set[str]:
+		text = text or ""
+		by_text = set(self.open_text)
+		if self.by_keyword:
+			for word in set(_WORD_RE.findall(text.lower())):
+				hit = self.by_keyword.get(word)
+				if hit:
+					by_text |= hit
+		if self.prefilter is not None and self.prefilter.search(text):
+			for uuid in self.regex_owners:
+				if uuid not in by_text and self.subs[uuid].regex.search(text):
+					by_text.add(uuid)
+		by_chat = self.open_chat | self.by_chat.get(str(chat_id), set())
+		return by_text & by_chat
+
+	def order_targets(self, order: Any) -> set[str]:
+		offer = (order or {}).get("offerDetails") or {} if isinstance(order, dict) else {}
+		game_id = str((offer.get("game") or {}).get("id") or "")
+		category_id = str((offer.get("category") or {}).get("id") or "")
+		by_game = self.open_game | self.by_game.get(game_id, set())
+		by_category = self.open_category | self.by_category.get(category_id, set())
+		return by_game & by_category
+
+	def callback_targets(self, data: str | None) -> set[str]:
+		data = data or ""
+		targets = {uuid for prefix, uuid in self.by_callback.get(data.partition(":")[0], ()) if data.startswith(prefix)}
+		for prefix, uuid in self.loose_callbacks:
+			if data.startswith(prefix):
+				targets.add(uuid)
+		return targets
+
+	def state_targets(self, state_name: str | None) -> set[str]:
+		if not state_name:
+			return set()
+		return self.by_state.get(state_name, set()) | self.by_state.get(state_name.partition(":")[0], set())
@@ -0,0 +1,63 @@
+import time
+from collections import OrderedDict, deque
+
+
+class _ChatSeen:
+    __slots__ = ("_ids", "_order", "last_used")
+
+    def __init__(self, limit: int):
+        self._ids: set[str] = set()
+        self._order: deque[str] = deque(maxlen=limit)
+        self.last_used = time.monotonic()
+
+    def __contains__(self, message_id: str) -> bool:
+        return message_id in self._ids
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def add(self, message_id: str) -> None:
+        if message_id in self._ids:
+            return
+        if len(self._order) == self._order.maxlen:
+            self._ids.discard(self._order[0])
+        self._order.append(message_id)
+        self._ids.add(message_id)
+
+
+class SeenMessages:
+    def __init__(self, per_chat: int = 200, idle_ttl: float = 7 * 86400, max_chats: int = 5000):
+        self.per_chat = max(1, int(per_chat))
+        self.idle_ttl = max(60.0, float(idle_ttl))
+        self.max_chats = max(1, int(max_chats))
+        self._chats: OrderedDict[str, _ChatSeen] = OrderedDict()
+        self.evicted = 0
+
+    def for_chat(self, chat_id: str) -> _ChatSeen:
+        entry = self._chats.get(chat_id)
+        if entry is None:
+            entry = _ChatSeen(self.per_chat)
+            self._chats[chat_id] = entry
+        else:
+            self._chats.move_to_end(chat_id)
+        entry.last_used = time.monotonic()
+        return entry
+
+    def evict(self) -> int:
+        removed = 0
+        deadline = time.monotonic() - self.idle_ttl
+        while self._chats:
+            chat_id, entry = next(iter(self._chats.items()))
+            if len(self._chats) <= self.max_chats and entry.last_used >= deadline:
+                break
+            del self._chats[chat_id]
+            removed += 1
+        self.evicted += removed
+        return removed
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "chats": len(self._chats),
+            "ids": sum(len(e) for e in self._chats.values()),
+            "evicted": self.evicted,
+        }
@@ -0,0 +1,105 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, replace
+
+from api.auth import fetch_homepage_data
+from api.find_lots_user import find_user_lots
+
+
+@dataclass(frozen=True)
+class SessionSnapshot:
+    session_cookie: str
+    sid: str | None = None
+    my_games: str | None = None
+    user_id: int | None = None
+    updated_at: float = 0.0
+
+
+class SessionContext:
+    def __init__(self, ttl: float = 900):
+        self.ttl = max(30.0, float(ttl))
+        self._snapshot: SessionSnapshot | None = None
+        self._refreshing: asyncio.Task | None = None
+        self._log = logging.getLogger("exfador.session")
+
+    def get(self, session_cookie: str, allow_stale: bool = True) -> SessionSnapshot | None:
+        snap = self._snapshot
+        if snap is None or snap.session_cookie != session_cookie:
+            return None
+        if time.time() - snap.updated_at > self.ttl:
+            self.refresh_in_background(session_cookie)
+            if not allow_stale:
+                return None
+        return snap
+
+    def update(
+        self,
+        session_cookie: str,
+        sid: str | None = None,
+        my_games: str | None = None,
+        user_id: int | None = None,
+    ) -> SessionSnapshot:
+        snap = self._snapshot
+        if snap is None or snap.session_cookie != session_cookie:
+            snap = SessionSnapshot(session_cookie=session_cookie)
+        snap = replace(
+            snap,
+            sid=sid or snap.sid,
+            my_games=my_games or snap.my_games,
+            user_id=user_id if user_id is not None else snap.user_id,
+            updated_at=time.time(),
+        )
+        self._snapshot = snap
+        return snap
+
+    def invalidate(self) -> None:
+        self._snapshot = None
+
+    async def refresh(self, session_cookie: str) -> SessionSnapshot | None:
+        auth = await fetch_homepage_data(session_cookie)
+        if not ((auth or {}).get("authorized") and (auth or {}).get("user")):
+            self.invalidate()
+            self._log.warning("session_refresh_unauthorized")
+            return None
+        sid = auth.get("sid")
+        my_games = auth.get("my_games")
+        try:
+            user_id = int((auth.get("user") or {}).get("id"))
+        except Exception:
+            user_id = None
+        if not my_games:
+            cached = self._snapshot
+            if cached is not None and cached.session_cookie == session_cookie:
+                my_games = cached.my_games
+        if not my_games and user_id:
+            lots_data = await find_user_lots(session_cookie, sid or "", user_id)
+            my_games = (lots_data or {}).get("my_games")
+        return self.update(session_cookie, sid=sid, my_games=my_games, user_id=user_id)
+
+    def refresh_in_background(self, session_cookie: str) -> None:
+        if self._refreshing is not None and not self._refreshing.done():
+            return
+        try:
+            self._refreshing = asyncio.get_running_loop().create_task(self._safe_refresh(session_cookie))
+        except RuntimeError:
+            self._refreshing = None
+
+    async def _safe_refresh(self, session_cookie: str) -> None:
+        try:
+            await self.refresh(session_cookie)
+        except Exception as exc:
+            self._log.warning(f"session_refresh_failed error={exc}")
+
+    async def ensure(self, session_cookie: str) -> SessionSnapshot | None:
+        snap = self.get(session_cookie)
+        if snap is not None:
+            return snap
+        try:
+            return await self.refresh(session_cookie)
+        except Exception as exc:
+            self._log.warning(f"session_refresh_failed error={exc}")
+            return None
+
+
+session_context = SessionContext()
@@ -1,14 +1,43 @@
 import asyncio
+import json
 import time
 import aiosqlite
 from typing import Any
 
 
+SALES_TZ_OFFSET = 3 * 3600
+
+
+def _sales_bucket(ts: int, granularity: str, offset: int = SALES_TZ_OFFSET) -> int:
+    size = 3600 if granularity == "h" else 86400
+    return ((int(ts) + offset) // size) * size - offset
+
+
+def _sales_deltas(row: dict[str, Any], sign: int, offset: int = SALES_TZ_OFFSET) -> list[tuple]:
+    return [
+        (
+            gran,
+            _sales_bucket(row["created_at"], gran, offset),
+            row["status"],
+            row.get("game_id") or 0,
+            row.get("category_id") or 0,
+            row.get("game_name"),
+            sign,
+            sign * int(row.get("price") or 0),
+        )
+        for gran in ("h", "d")
+    ]
+
+
 class Database:
-    def __init__(self, path: str):
+    def __init__(self, path: str, sales_tz_offset: int = SALES_TZ_OFFSET):
         self.path = path
+        self.sales_tz_offset = int(sales_tz_offset)
         self._lock = asyncio.Lock()
 
+    def sales_bucket(self, ts: int, granularity: str) -> int:
+        return _sales_bucket(ts, granularity, self.sales_tz_offset)
+
     async def init(self) -> None:
         async with aiosqlite.connect(self.path) as db:
             await db.execute(
@@ -94,6 +123,137 @@ class Database:
                 )
                 """
             )
+            await db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS tg_file_cache (
+                    key TEXT PRIMARY KEY,
+                    file_id TEXT NOT NULL,
+                    last_used INTEGER DEFAULT 0
+                )
+                """
+            )
+            await db.execute("CREATE INDEX IF NOT EXISTS idx_tg_file_cache_last_used ON tg_file_cache(last_used)")
+            await db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS bump_reports (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    payload TEXT NOT NULL,
+                    created_at INTEGER DEFAULT 0
+                )
+                """
+            )
+            await db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS orders (
+                    order_id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    created_at INTEGER NOT NULL,
+                    price INTEGER DEFAULT 0,
+                    game_id INTEGER,
+                    game_name TEXT,
+                    category_id INTEGER,
+                    category_name TEXT,
+                    buyer_id INTEGER,
+                    buyer_name TEXT,
+                    updated_at INTEGER DEFAULT 0
+                )
+                """
+            )
+            await db.execute("CREATE INDEX IF NOT EXISTS idx_orders_created_at ON orders(created_at)")
+            await db.execute("CREATE INDEX IF NOT EXISTS idx_orders_status ON orders(status)")
+            await db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS sync_state (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                )
+                """
+            )
+            await db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS sales_buckets (
+                    granularity TEXT NOT NULL,
+                    bucket INTEGER NOT NULL,
+                    status TEXT NOT NULL,
+                    game_id INTEGER NOT NULL DEFAULT 0,
+                    category_id INTEGER NOT NULL DEFAULT 0,
+                    game_name TEXT,
+                    orders INTEGER DEFAULT 0,
+                    revenue INTEGER DEFAULT 0,
+                    PRIMARY KEY (granularity, bucket, status, game_id, category_id)
+                )
+                """
+            )
+            await db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS offer_meta (
+                    offer_id INTEGER PRIMARY KEY,
+                    game_id INTEGER,
+                    category_id INTEGER,
+                    game_slug TEXT,
+                    category_slug TEXT,
+                    title TEXT,
+                    updated_at INTEGER DEFAULT 0
+                )
+                """
+            )
+            await db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS bump_schedule (
+                    key TEXT PRIMARY KEY,
+                    game_id INTEGER NOT NULL,
+                    category_ids TEXT NOT NULL,
+                    next_at REAL DEFAULT 0,
+                    interval REAL DEFAULT 1800,
+                    last_bump_at REAL,
+                    last_status TEXT,
+                    late_count INTEGER DEFAULT 0,
+                    missed_count INTEGER DEFAULT 0
+                )
+                """
+            )
+            await db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS buyer_chats (
+                    buyer_id TEXT PRIMARY KEY,
+                    chat_id TEXT NOT NULL,
+                    updated_at INTEGER DEFAULT 0
+                )
+                """
+            )
+            await db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS plugin_kv (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    expires_at REAL,
+                    PRIMARY KEY(namespace, key)
+                )
+                """
+            )
+            await db.execute("CREATE INDEX IF NOT EXISTS idx_plugin_kv_expires_at ON plugin_kv(expires_at)")
+            cur = await db.execute("SELECT value FROM sync_state WHERE key='sales_buckets_built'")
+            built = await cur.fetchone()
+            await cur.close()
+            offset = self.sales_tz_offset
+            if not built or built[0] != str(offset):
+                await db.execute("DELETE FROM sales_buckets")
+                for gran, size in (("h", 3600), ("d", 86400)):
+                    await db.execute(
+                        f"""
+                        INSERT INTO sales_buckets(granularity, bucket, status, game_id, category_id, game_name, orders, revenue)
+                        SELECT ?, ((created_at + {offset}) / {size}) * {size} - {offset}, status,
+                               COALESCE(game_id, 0), COALESCE(category_id, 0), MAX(game_name), COUNT(*), COALESCE(SUM(price), 0)
+                        FROM orders
+                        GROUP BY 2, status, COALESCE(game_id, 0), COALESCE(category_id, 0)
+                        """,
+                        (gran,),
+                    )
+                await db.execute(
+                    "INSERT INTO sync_state(key, value) VALUES('sales_buckets_built', ?) ON CONFLICT(key) DO UPDATE SET value=excluded.value",
+                    (str(offset),),
+                )
             await db.commit()
 
     async def get_user(self, user_id: int) -> dict[str, Any]:
@@ -392,4 +552,393 @@ class Database:
                 await db.commit()
                 return to_del
 
+    async def save_bump_report(self, payload: dict[str, Any], keep_last: int = 50) -> int:
+        async with self._lock:
+            async with aiosqlite.connect(self.path) as db:
+                created_at = int(time.time())
+                cur = await db.execute(
+                    "INSERT INTO bump_reports(payload, created_at) VALUES(?, ?)",
+                    (json.dumps(payload, ensure_ascii=False), created_at),
+                )
+                report_id = int(cur.lastrowid)
+                await db.execute("DELETE FROM bump_reports WHERE id<=?", (report_id - max(1, keep_last),))
+                await db.commit()
+                return report_id
+
+    async def get_bump_report(self, report_id: int) -> dict[str, Any] | None:
+        async with self._lock:
+            async with aiosqlite.connect(self.path) as db:
+                cur = await db.execute("SELECT payload FROM bump_reports WHERE id=?", (report_id,))
+                row = await cur.fetchone()
+                await cur.close()
+                if not row:
+                    return None
+                try:
+                    return json.loads(row[0])
+                except Exception:
+                    return None
+
+    async def get_tg_file_id(self, key: str) -> str | None:
+        async with self._lock:
+            async with aiosqlite.connect(self.path) as db:
+                cur = await db.execute("SELECT file_id FROM tg_file_cache WHERE key=?", (key,))
+                row = await cur.fetchone()
+                await cur.close()
+                if not row:
+                    return None
+                await db.execute("UPDATE tg_file_cache SET last_used=? WHERE key=?", (int(time.time()), key))
+                await db.commit()
+                return str(row[0])
+
+    async def set_tg_file_id(self, key: str, file_id: str, max_items: int = 1000) -> None:
+        async with self._lock:
+            async with aiosqlite.connect(self.path) as db:
+                await db.execute(
+                    "INSERT INTO tg_file_cache(key, file_id, last_used) VALUES(?, ?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET file_id=excluded.file_id, last_used=excluded.last_used",
+                    (key, file_id, int(time.time())),
+                )
+                await db.execute(
+                    "DELETE FROM tg_file_cache WHERE key NOT IN (SELECT key FROM tg_file_cache ORDER BY last_used DESC LIMIT ?)",
+                    (max(1, max_items),),
+                )
+                await db.commit()
+
+    async def delete_tg_file_id(self, key: str) -> None:
+        async with self._lock:
+            async with aiosqlite.connect(self.path) as db:
+                await db.execute("DELETE FROM tg_file_cache WHERE key=?", (key,))
+                await db.commit()
+
+    async def upsert_orders(self, rows: list[dict[str, Any]]) -> list[tuple[dict[str, Any], str | None]]:
+        if not rows:
+            return []
+        async with self._lock:
+            async with aiosqlite.connect(self.path) as db:
+                known: dict[str, dict[str, Any]] = {}
+                ids = [r["order_id"] for r in rows]
+                for i in range(0, len(ids), 500):
+                    chunk = ids[i:i + 500]
+                    cur = await db.execute(
+                        f"SELECT order_id, status, price, created_at, game_id, game_name, category_id FROM orders WHERE order_id IN ({','.join('?' * len(chunk))})",
+                        chunk,
+                    )
+                    for order_id, status, price, created_at, game_id, game_name, category_id in await cur.fetchall():
+                        known[str(order_id)] = {
+                            "status": str(status),
+                            "price": price,
+                            "created_at": created_at,
+                            "game_id": game_id,
+                            "game_name": game_name,
+                            "category_id": category_id,
+                        }
+                    await cur.close()
+                changed: list[tuple[dict[str, Any], str | None]] = []
+                deltas: list[tuple] = []
+                now = int(time.time())
+                for r in rows:
+                    prev = known.get(r["order_id"])
+                    if prev is not None and prev["status"] == r["status"]:
+                        continue
+                    changed.append((r, prev["status"] if prev is not None else None))
+                    if prev is not None:
+                        deltas.extend(_sales_deltas(prev, -1, self.sales_tz_offset))
+                    deltas.extend(_sales_deltas(r, 1, self.sales_tz_offset))
+                    known[r["order_id"]] = dict(r)
+                if changed:
+                    await db.executemany(
+                        """
+                        INSERT INTO orders(order_id, status, created_at, price, game_id, game_name, category_id, category_name, buyer_id, buyer_name, updated_at)
+                        VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                        ON CONFLICT(order_id) DO UPDATE SET status=excluded.status, price=excluded.price, updated_at=excluded.updated_at
+                        """,
+                        [
+                            (
+                                r["order_id"],
+                                r["status"],
+                                r["created_at"],
+                                r["price"],
+                                r.get("game_id"),
+                                r.get("game_name"),
+                                r.get("category_id"),
+                                r.get("category_name"),
+                                r.get("buyer_id"),
+                                r.get("buyer_name"),
+                                now,
+                            )
+                            for r, _ in changed
+                        ],
+                    )
+                    await db.executemany(
+                        """
+                        INSERT INTO sales_buckets(granularity, bucket, status, game_id, category_id, game_name, orders, revenue)
+                        VALUES(?, ?, ?, ?, ?, ?, ?, ?)
+                        ON CONFLICT(granularity, bucket, status, game_id, category_id) DO UPDATE SET
+                            orders=orders+excluded.orders,
+                            revenue=revenue+excluded.revenue,
+                            game_name=COALESCE(excluded.game_name, game_name)
+                        """,
+                        deltas,
+                    )
+                    await db.commit()
+                return changed
+
+    async def sales_totals(self, since_ts: int = 0, granularity: str = "h") -> dict[str, tuple[int, int]]:
+        async with self._lock:
+            async with aiosqlite.connect(self.path) as db:
+                cur = await db.execute(
+                    "SELECT status, SUM(orders), SUM(revenue) FROM sales_buckets WHERE granularity=? AND bucket>=? GROUP BY status",
+                    (granularity, self.sales_bucket(since_ts, granularity)),
+                )
+                rows = await cur.fetchall()
+                await cur.close()
+                return {str(status): (int(cnt or 0), int(total or 0)) for status, cnt, total in rows}
+
+    async def sales_by_game(self, since_ts: int = 0, status: str = "COMPLETED", limit: int = 15) -> list[dict[str, Any]]:
+        async with self._lock:
+            async with aiosqlite.connect(self.path) as db:
+                cur = await db.execute(
+                    """
+                    SELECT game_id, MAX(game_name), SUM(orders), SUM(revenue)
+                    FROM sales_buckets
+                    WHERE granularity='d' AND bucket>=? AND status=?
+                    GROUP BY game_id
+                    HAVING SUM(orders) > 0
+                    ORDER BY SUM(revenue) DESC
+                    LIMIT ?
+                    """,
+                    (self.sales_bucket(since_ts, "d"), status, limit),
+                )
+                rows = await cur.fetchall()
+                await cur.close()
+                return [
+                    {"game_id": int(gid or 0), "game_name": name, "orders": int(cnt or 0), "revenue": int(total or 0)}
+                    for gid, name, cnt, total in rows
+                ]
+
+    async def sales_daily(self, since_ts: int, status: str = "COMPLETED") -> dict[int, tuple[int, int]]:
+        async with self._lock:
+            async with aiosqlite.connect(self.path) as db:
+                cur = await db.execute(
+                    "SELECT bucket, SUM(orders), SUM(revenue) FROM sales_buckets WHERE granularity='d' AND bucket>=? AND status=? GROUP BY bucket",
+                    (self.sales_bucket(since_ts, "d"), status),
+                )
+                rows = await cur.fetchall()
+                await cur.close()
+                return {int(bucket): (int(cnt or 0), int(total or 0)) for bucket, cnt, total in rows}
+
+    async def oldest_open_order_ts(self, statuses: tuple[str, ...] = ("CREATED",)) -> int | None:
+        async with self._lock:
+            async with aiosqlite.connect(self.path) as db:
+                cur = await db.execute(
+                    f"SELECT MIN(created_at) FROM orders WHERE status IN ({','.join('?' * len(statuses))})",
+                    statuses,
+                )
+                row = await cur.fetchone()
+                await cur.close()
+                return int(row[0]) if row and row[0] is not None else None
+
+    async def get_sync_state(self, key: str) -> str | None:
+        async with self._lock:
+            async with aiosqlite.connect(self.path) as db:
+                cur = await db.execute("SELECT value FROM sync_state WHERE key=?", (key,))
+                row = await cur.fetchone()
+                await cur.close()
+                return str(row[0]) if row and row[0] is not None else None
+
+    async def set_sync_state(self, key: str, value: str) -> None:
+        async with self._lock:
+            async with aiosqlite.connect(self.path) as db:
+                await db.execute(
+                    "INSERT INTO sync_state(key, value) VALUES(?, ?) ON CONFLICT(key) DO UPDATE SET value=excluded.value",
+                    (key, value),
+                )
+                await db.commit()
+
+    async def get_offer_meta(self, offer_ids: list[int]) -> dict[int, dict[str, Any]]:
+        if not offer_ids:
+            return {}
+        async with self._lock:
+            async with aiosqlite.connect(self.path) as db:
+                result: dict[int, dict[str, Any]] = {}
+                for i in range(0, len(offer_ids), 500):
+                    chunk = offer_ids[i:i + 500]
+                    cur = await db.execute(
+                        f"SELECT offer_id, game_id, category_id, game_slug, category_slug, title FROM offer_meta WHERE offer_id IN ({','.join('?' * len(chunk))})",
+                        chunk,
+                    )
+                    for offer_id, game_id, category_id, game_slug, category_slug, title in await cur.fetchall():
+                        result[int(offer_id)] = {
+                            "game_id": game_id,
+                            "category_id": category_id,
+                            "game_slug": game_slug,
+                            "category_slug": category_slug,
+                            "title": title,
+                        }
+                    await cur.close()
+                return result
+
+    async def set_offer_meta(self, items: dict[int, dict[str, Any]]) -> None:
+        if not items:
+            return
+        async with self._lock:
+            async with aiosqlite.connect(self.path) as db:
+                now = int(time.time())
+                await db.executemany(
+                    """
+                    INSERT INTO offer_meta(offer_id, game_id, category_id, game_slug, category_slug, title, updated_at)
+                    VALUES(?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(offer_id) DO UPDATE SET
+                        game_id=excluded.game_id,
+                        category_id=excluded.category_id,
+                        game_slug=excluded.game_slug,
+                        category_slug=excluded.category_slug,
+                        title=excluded.title,
+                        updated_at=excluded.updated_at
+                    """,
+                    [
+                        (oid, m.get("game_id"), m.get("category_id"), m.get("game_slug"), m.get("category_slug"), m.get("title"), now)
+                        for oid, m in items.items()
+                    ],
+                )
+                await db.commit()
+
+    async def list_bump_schedule(self) -> list[dict[str, Any]]:
+        async with self._lock:
+            async with aiosqlite.connect(self.path) as db:
+                cur = await db.execute(
+                    "SELECT key, game_id, category_ids, next_at, interval, last_bump_at, last_status, late_count, missed_count FROM bump_schedule"
+                )
+                rows = await cur.fetchall()
+                await cur.close()
+                result: list[dict[str, Any]] = []
+                for key, game_id, category_ids, next_at, interval, last_bump_at, last_status, late_count, missed_count in rows:
+                    try:
+                        cats = [int(c) for c in json.loads(category_ids)]
+                    except Exception:
+                        continue
+                    result.append(
+                        {
+                            "key": str(key),
+                            "game_id": int(game_id),
+                            "category_ids": cats,
+                            "next_at": float(next_at or 0),
+                            "interval": float(interval or 1800),
+                            "last_bump_at": last_bump_at,
+                            "last_status": last_status,
+                            "late_count": int(late_count or 0),
+                            "missed_count": int(missed_count or 0),
+                        }
+                    )
+                return result
+
+    async def save_bump_schedule(self, entries: list[dict[str, Any]]) -> None:
+        if not entries:
+            return
+        async with self._lock:
+            async with aiosqlite.connect(self.path) as db:
+                await db.executemany(
+                    """
+                    INSERT INTO bump_schedule(key, game_id, category_ids, next_at, interval, last_bump_at, last_status, late_count, missed_count)
+                    VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(key) DO UPDATE SET
+                        next_at=excluded.next_at,
+                        interval=excluded.interval,
+                        last_bump_at=excluded.last_bump_at,
+                        last_status=excluded.last_status,
+                        late_count=excluded.late_count,
+                        missed_count=excluded.missed_count
+                    """,
+                    [
+                        (
+                            e["key"],
+                            int(e["game_id"]),
+                            json.dumps(list(e["category_ids"])),
+                            float(e.get("next_at") or 0),
+                            float(e.get("interval") or 1800),
+                            e.get("last_bump_at"),
+                            e.get("last_status"),
+                            int(e.get("late_count") or 0),
+                            int(e.get("missed_count") or 0),
+                        )
+                        for e in entries
+                    ],
+                )
+                await db.commit()
 
+    async def delete_bump_schedule(self, keys: list[str]) -> None:
+        if not keys:
+            return
+        async with self._lock:
+            async with aiosqlite.connect(self.path) as db:
+                await db.executemany("DELETE FROM bump_schedule WHERE key=?", [(k,) for k in keys])
+                await db.commit()
+
+    async def load_buyer_chats(self) -> dict[str, str]:
+        async with self._lock:
+            async with aiosqlite.connect(self.path) as db:
+                cur = await db.execute("SELECT buyer_id, chat_id FROM buyer_chats")
+                rows = await cur.fetchall()
+                await cur.close()
+                return {str(buyer_id): str(chat_id) for buyer_id, chat_id in rows}
+
+    async def save_buyer_chats(self, items: dict[str, str]) -> None:
+        if not items:
+            return
+        async with self._lock:
+            async with aiosqlite.connect(self.path) as db:
+                now = int(time.time())
+                await db.executemany(
+                    "INSERT INTO buyer_chats(buyer_id, chat_id, updated_at) VALUES(?, ?, ?) ON CONFLICT(buyer_id) DO UPDATE SET chat_id=excluded.chat_id, updated_at=excluded.updated_at",
+                    [(buyer_id, chat_id, now) for buyer_id, chat_id in items.items()],
+                )
+                await db.commit()
+
+    async def kv_get(self, namespace: str, key: str) -> tuple[str, float | None] | None:
+        async with self._lock:
+            async with aiosqlite.connect(self.path) as db:
+                cur = await db.execute(
+                    "SELECT value, expires_at FROM plugin_kv WHERE namespace=? AND key=? AND (expires_at IS NULL OR expires_at > ?)",
+                    (namespace, key, time.time()),
+                )
+                row = await cur.fetchone()
+                await cur.close()
+                return (str(row[0]), row[1]) if row else None
+
+    async def kv_scan(self, namespace: str, prefix: str = "", limit: int = 100) -> list[tuple[str, str, float | None]]:
+        async with self._lock:
+            async with aiosqlite.connect(self.path) as db:
+                cur = await db.execute(
+                    "SELECT key, value, expires_at FROM plugin_kv WHERE namespace=? AND key >= ? AND key < ? AND (expires_at IS NULL OR expires_at > ?) ORDER BY key LIMIT ?",
+                    (namespace, prefix, prefix + "\U0010ffff", time.time(), int(limit)),
+                )
+                rows = await cur.fetchall()
+                await cur.close()
+                return [(str(k), str(v), exp) for k, v, exp in rows]
+
+    async def kv_write(
+        self,
+        upserts: list[tuple[str, str, str, float | None]],
+        deletes: list[tuple[str, str]],
+    ) -> None:
+        if not upserts and not deletes:
+            return
+        async with self._lock:
+            async with aiosqlite.connect(self.path) as db:
+                if upserts:
+                    await db.executemany(
+                        "INSERT INTO plugin_kv(namespace, key, value, expires_at) VALUES(?, ?, ?, ?) ON CONFLICT(namespace, key) DO UPDATE SET value=excluded.value, expires_at=excluded.expires_at",
+                        upserts,
+                    )
+                if deletes:
+                    await db.executemany("DELETE FROM plugin_kv WHERE namespace=? AND key=?", deletes)
+                await db.commit()
+
+    async def kv_purge_expired(self) -> int:
+        async with self._lock:
+            async with aiosqlite.connect(self.path) as db:
+                cur = await db.execute("DELETE FROM plugin_kv WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),))
+                removed = cur.rowcount or 0
+                await cur.close()
+                await db.commit()
+                return int(removed)
@@ -0,0 +1,55 @@
+from typing import Any
+
+import aiohttp
+
+from api.http_client import get_session
+
+
+GITHUB_HEADERS = {"accept": "application/vnd.github+json", "X-GitHub-Api-Version": "2022-11-28"}
+TAGS_URL = "https://api.github.com/repos/exfador/starvell_api/tags?page=1"
+
+_conditional_cache: dict[str, tuple[str, Any]] = {}
+
+
+async def _conditional_get(url: str, as_json: bool, headers: dict[str, str] | None = None, timeout: float = 10) -> tuple[int, Any]:
+    req_headers = dict(headers or {})
+    cached = _conditional_cache.get(url)
+    if cached is not None:
+        req_headers["If-None-Match"] = cached[0]
+    session = get_session()
+    async with session.get(url, headers=req_headers, timeout=aiohttp.ClientTimeout(total=timeout)) as resp:
+        if resp.status == 304 and cached is not None:
+            return 304, cached[1]
+        if resp.status != 200:
+            return resp.status, None
+        if as_json:
+            body = await resp.json(content_type=None)
+        else:
+            body = await resp.text()
+        etag = resp.headers.get("ETag")
+        if etag:
+            _conditional_cache[url] = (etag, body)
+        return 200, body
+
+
+async def get_json(url: str, timeout: float = 10) -> tuple[int, Any]:
+    return await _conditional_get(url, True, GITHUB_HEADERS, timeout)
+
+
+async def get_text(url: str, timeout: float = 10) -> tuple[int, str | None]:
+    return await _conditional_get(url, False, None, timeout)
+
+
+async def fetch_tags() -> list[dict]:
+    status, data = await get_json(TAGS_URL)
+    if status not in (200, 304) or not isinstance(data, list):
+        return []
+    return data
+
+
+async def fetch_latest_tag() -> dict | None:
+    for it in await fetch_tags():
+        name = str((it or {}).get("name") or "").strip()
+        if name and name.lower() != "api":
+            return it
+    return None